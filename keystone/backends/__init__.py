@@ -15,6 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import logging
 
 from keystone.cfg import NoSuchOptError
@@ -44,10 +45,82 @@ class GroupConf(CONF.__class__):
             return None
 
 
+# Bumped on each configure_backends(), so that holders of backend APIs can
+# tell they are stale
+GENERATION = 0
+
+# The configuration the backends were last configured from
+_CONFIGURED_WITH = None
+
+
+def _current_configuration():
+    return repr(sorted(CONF.to_dict().items()))
+
+
 def configure_backends():
     """Load backends given in the 'backends' option."""
+    global GENERATION, _CONFIGURED_WITH  # pylint: disable=W0603
     backend_names = CONF.backends or DEFAULT_BACKENDS
     for module_name in backend_names.split(","):
         backend_module = utils.import_module(module_name)
         backend_conf = GroupConf(module_name)
         backend_module.configure_backend(backend_conf)
+    GENERATION += 1
+    _CONFIGURED_WITH = _current_configuration()
+
+
+def configure_backends_once():
+    """Load backends, unless already loaded from the current configuration.
+
+    Building a backend creates its engine or connection pool and checks the
+    schema, so this is what code that merely needs the backends calls.
+    """
+    if _CONFIGURED_WITH != _current_configuration():
+        configure_backends()
+
+
+def forget_configuration():
+    """Make the next configure_backends_once() load the backends again.
+
+    For backends tearing down their state.
+    """
+    global _CONFIGURED_WITH  # pylint: disable=W0603
+    _CONFIGURED_WITH = None
+
+
+@contextlib.contextmanager
+def request_scope():
+    """Lets the backends share state across the calls made for one request
+
+    Enters request_session() of each configured backend that has one; the
+    sqlalchemy backend uses it to run all the calls in one session.
+    """
+    backend_names = CONF.backends or DEFAULT_BACKENDS
+    scopes = []
+    for module_name in backend_names.split(","):
+        backend_module = utils.import_module(module_name)
+        scope = getattr(backend_module, 'request_session', None)
+        if scope is not None:
+            scopes.append(scope())
+    entered = []
+    try:
+        for scope in scopes:
+            scope.__enter__()
+            entered.append(scope)
+        yield
+    finally:
+        for scope in reversed(entered):
+            scope.__exit__(None, None, None)
+
+
+def reset_after_fork():
+    """Drops connections and caches a forked worker inherited
+
+    Calls reset_after_fork() on each configured backend that has one.
+    """
+    backend_names = CONF.backends or DEFAULT_BACKENDS
+    for module_name in backend_names.split(","):
+        backend_module = utils.import_module(module_name)
+        reset = getattr(backend_module, 'reset_after_fork', None)
+        if reset is not None:
+            reset()
@@ -48,6 +48,15 @@ class BaseUserAPI(object):
         """
         raise NotImplementedError
 
+    def get_many(self, ids):
+        """ Get the users with any of the given IDs in one lookup
+
+        :param ids: list of IDs; unknown ones are skipped
+        :returns: list of models.User, in no particular order
+
+        """
+        raise NotImplementedError
+
     def get_by_name(self, name):
         """ Get a user by username
 
@@ -92,6 +101,15 @@ class BaseUserAPI(object):
         """
         raise NotImplementedError
 
+    def delete_cascade(self, id):
+        """ Delete a user along with its role grants and credentials
+
+        :param id: string - the user id
+        :returns: dict of the number of records removed, by kind
+
+        """
+        raise NotImplementedError
+
     def get_by_tenant(self, user_id, tenant_id):
         """ Gets a user for a tenant
 
@@ -159,6 +177,15 @@ class BaseTokenAPI(object):
     def get(self, id):
         raise NotImplementedError
 
+    def get_many(self, ids):
+        """ Get the tokens with any of the given IDs in one lookup
+
+        :param ids: list of IDs; unknown ones are skipped
+        :returns: list of models.Token, in no particular order
+
+        """
+        raise NotImplementedError
+
     def delete(self, id):
         raise NotImplementedError
 
@@ -171,6 +198,53 @@ class BaseTokenAPI(object):
     def get_all(self):
         raise NotImplementedError
 
+    def delete_expired(self, expires_before, limit):
+        """ Deletes up to `limit` tokens that expired before the given time
+
+        :returns: the number of tokens deleted
+        """
+        raise NotImplementedError
+
+    def fetch_live_ids(self, created_after=None):
+        """ Lists the live tokens created at or after the given time, or
+        all the tokens that have not expired
+
+        Not named get_* or list_*, so that it is not sent to a read replica
+        that may lag behind.
+
+        :returns: list of (token id, created) tuples; created is None for
+                  tokens created before it was recorded
+        """
+        raise NotImplementedError
+
+
+class BaseTokenRevocationAPI(object):
+    def __init__(self, *args, **kw):
+        pass
+
+    def create(self, token_id, expires):
+        """ Records that a token was deleted before it expired
+
+        :returns: the marker of the revocation
+        """
+        raise NotImplementedError
+
+    def get_since(self, marker, limit):
+        """ Lists the revocations recorded after `marker` (None for all)
+        whose tokens have not yet expired, oldest first
+
+        :returns: up to `limit` (marker, token id, expires) tuples
+        """
+        raise NotImplementedError
+
+    def delete_expired(self, expires_before, limit):
+        """ Deletes up to `limit` revocations of tokens that expired before
+        the given time
+
+        :returns: the number of revocations deleted
+        """
+        raise NotImplementedError
+
 
 class BaseTenantAPI(object):
     def __init__(self, *args, **kw):
@@ -182,6 +256,15 @@ class BaseTenantAPI(object):
     def get(self, id):
         raise NotImplementedError
 
+    def get_many(self, ids):
+        """ Get the tenants with any of the given IDs in one lookup
+
+        :param ids: list of IDs; unknown ones are skipped
+        :returns: list of models.Tenant, in no particular order
+
+        """
+        raise NotImplementedError
+
     def get_by_name(self, name):
         raise NotImplementedError
 
@@ -206,6 +289,15 @@ class BaseTenantAPI(object):
     def delete(self, id):
         raise NotImplementedError
 
+    def delete_cascade(self, id):
+        """ Delete an empty tenant along with its endpoints
+
+        :param id: string - the tenant id
+        :returns: dict of the number of records removed, by kind
+
+        """
+        raise NotImplementedError
+
     def get_all_endpoints(self, tenant_id):
         raise NotImplementedError
 
@@ -226,9 +318,27 @@ class BaseRoleAPI(object):
     def delete(self, id):
         raise NotImplementedError
 
+    def delete_cascade(self, id):
+        """ Delete a role along with all its grants
+
+        :param id: string - the role id
+        :returns: dict of the number of records removed, by kind
+
+        """
+        raise NotImplementedError
+
     def get(self, id):
         raise NotImplementedError
 
+    def get_many(self, ids):
+        """ Get the roles with any of the given IDs in one lookup
+
+        :param ids: list of IDs; unknown ones are skipped
+        :returns: list of models.Role, in no particular order
+
+        """
+        raise NotImplementedError
+
     def get_by_name(self, name):
         raise NotImplementedError
 
@@ -287,6 +397,33 @@ class BaseRoleAPI(object):
         """
         raise NotImplementedError
 
+    def list_resolved_roles_for_user(self, user_id, tenant_id=None):
+        """ Get the roles granted to this user, with role details resolved.
+
+        Returns the roles granted to the user on the given tenant (if any)
+        followed by the user's global roles. Backends should resolve these
+        with a constant number of queries, regardless of grant count.
+
+        :param user_id: string - id of user
+        :param tenant_id: string - id of tenant (optional)
+        :returns: list of models.Role with id, name, description and
+                  tenant_id (None for global grants) populated
+
+        """
+        raise NotImplementedError
+
+    def list_resolved_roles_for_users(self, user_tenant_pairs):
+        """ Get the resolved roles of several users at once.
+
+        Same as list_resolved_roles_for_user for each pair, but backends
+        should use a constant number of queries for the whole list.
+
+        :param user_tenant_pairs: list of (user id, tenant id or None)
+        :returns: dict of list of models.Role, keyed by the pairs
+
+        """
+        raise NotImplementedError
+
     def rolegrant_get_page(self, marker, limit, user_id, tenant_id):
         raise NotImplementedError
 
@@ -310,6 +447,15 @@ class BaseEndpointTemplateAPI(object):
     def get(self, id):
         raise NotImplementedError
 
+    def get_many(self, ids):
+        """ Get the endpoint templates with any of the given IDs in one lookup
+
+        :param ids: list of IDs; unknown ones are skipped
+        :returns: list of models.EndpointTemplate, in no particular order
+
+        """
+        raise NotImplementedError
+
     def get_all(self):
         raise NotImplementedError
 
@@ -361,6 +507,15 @@ class BaseServiceAPI(object):
     def get(self, id):
         raise NotImplementedError
 
+    def get_many(self, ids):
+        """ Get the services with any of the given IDs in one lookup
+
+        :param ids: list of IDs; unknown ones are skipped
+        :returns: list of models.Service, in no particular order
+
+        """
+        raise NotImplementedError
+
     def get_by_name(self, name):
         raise NotImplementedError
 
@@ -379,6 +534,16 @@ class BaseServiceAPI(object):
     def delete(self, id):
         raise NotImplementedError
 
+    def delete_cascade(self, id):
+        """ Delete a service along with its roles, endpoint templates and
+        everything referring to those
+
+        :param id: string - the service id
+        :returns: dict of the number of records removed, by kind
+
+        """
+        raise NotImplementedError
+
 
 class BaseCredentialsAPI(object):
     def __init__(self, *args, **kw):
@@ -409,6 +574,7 @@ ENDPOINT_TEMPLATE = BaseEndpointTemplateAPI()
 ROLE = BaseRoleAPI()
 TENANT = BaseTenantAPI()
 TOKEN = BaseTokenAPI()
+TOKEN_REVOCATION = BaseTokenRevocationAPI()
 USER = BaseUserAPI()
 SERVICE = BaseServiceAPI()
 CREDENTIALS = BaseCredentialsAPI()
@@ -428,6 +594,9 @@ def set_value(variable_name, value):
     elif variable_name == 'token':
         global TOKEN
         TOKEN = value
+    elif variable_name == 'token_revocation':
+        global TOKEN_REVOCATION
+        TOKEN_REVOCATION = value
     elif variable_name == 'user':
         global USER
         USER = value
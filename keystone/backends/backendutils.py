@@ -1,8 +1,17 @@
 import logging
+import multiprocessing
+from multiprocessing import pool as mp_pool
+import os
+import threading
+
+from eventlet import tpool
+
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
+from keystone import config
 from keystone.backends import models
 import keystone.backends as backends
+from keystone.logic.types import fault
 # pylint: disable=E0611
 try:
     from passlib.hash import sha512_crypt as sc
@@ -39,7 +48,7 @@ def check_password(raw_password, enc_password):
     if not raw_password:
         return False
     if backends.SHOULD_HASH_PASSWORD:
-        return sc.verify(raw_password, enc_password)
+        return get_executor().run(_verify, raw_password, enc_password)
     else:
         return enc_password == raw_password
 
@@ -57,4 +66,127 @@ def __make_password(raw_password):
 #Refer http://packages.python.org/passlib/lib/passlib.hash.sha512_crypt.html
 #Using the default properties as of now.Salt gets generated automatically.
 def __get_hexdigest(raw_password):
+    return get_executor().run(_encrypt, raw_password)
+
+
+# Module level, so that worker processes can unpickle them
+def _encrypt(raw_password):
     return sc.encrypt(raw_password)
+
+
+def _verify(raw_password, enc_password):
+    return sc.verify(raw_password, enc_password)
+
+
+class InlineExecutor(object):
+    """
+    Hashes passwords in the calling greenthread, blocking all others.
+    """
+    def run(self, func, *args):  # pylint: disable=R0201
+        return func(*args)
+
+    def close(self):
+        pass
+
+
+class PoolExecutor(InlineExecutor):
+    """
+    Hashes passwords on a pool of `workers` threads or processes.
+
+    The calling greenthread waits from one of eventlet's native threads, so
+    the hub keeps serving other requests. At most `queue_size` calls wait
+    for a free worker; beyond that, calls are refused with a
+    ServiceUnavailableFault rather than piling up behind the hashing.
+    """
+    pool_class = None
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def _get_pool(self):
+        # pools do not survive a fork, so each process starts its own
+        if self._pool is None or self._pid != os.getpid():
+            self._pool = self.pool_class(self.workers)  # pylint: disable=E1102
+            self._pid = os.getpid()
+        return self._pool
+
+    def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.workers + self.queue_size:
+                raise fault.ServiceUnavailableFault(
+                    "Too many password checks in progress")
+            self.pending += 1
+            pool = self._get_pool()
+        try:
+            return tpool.execute(pool.apply, func, args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def close(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.terminate()
+        self._pool = None
+
+
+class ThreadExecutor(PoolExecutor):
+    """
+    Hashes passwords on native threads; the hashing still holds the GIL.
+    """
+    pool_class = mp_pool.ThreadPool
+
+
+class ProcessExecutor(PoolExecutor):
+    """
+    Hashes passwords in worker processes, using every core.
+    """
+    pool_class = mp_pool.Pool
+
+
+EXECUTORS = {
+    'inline': InlineExecutor,
+    'threads': ThreadExecutor,
+    'processes': ProcessExecutor,
+}
+DEFAULT_QUEUE_SIZE = 100
+
+_EXECUTOR = None
+
+
+def configure_executor(kind=None, workers=None, queue_size=None):
+    """
+    Sets up the executor that password hashing runs on.
+
+    `kind` is one of EXECUTORS; the defaults come from the
+    password_hash_executor, password_hash_workers and
+    password_hash_queue_size options.
+    """
+    global _EXECUTOR  # pylint: disable=W0603
+    conf = config.CONF
+    kind = kind or conf.password_hash_executor or 'inline'
+    if kind not in EXECUTORS:
+        raise ValueError("Unknown password_hash_executor: %s (expected %s)" %
+                         (kind, ', '.join(sorted(EXECUTORS))))
+    if _EXECUTOR is not None:
+        _EXECUTOR.close()
+    if kind == 'inline':
+        _EXECUTOR = InlineExecutor()
+    else:
+        _EXECUTOR = EXECUTORS[kind](
+            int(workers or conf.password_hash_workers or
+                multiprocessing.cpu_count()),
+            int(queue_size or conf.password_hash_queue_size or
+                DEFAULT_QUEUE_SIZE))
+    logger.debug("Hashing passwords with %s" % type(_EXECUTOR).__name__)
+    return _EXECUTOR
+
+
+def get_executor():
+    if _EXECUTOR is None:
+        return configure_executor()
+    return _EXECUTOR
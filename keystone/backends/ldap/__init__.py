@@ -25,9 +25,18 @@ from . import api
 from . import models
 
 
+_API = None
+
+
 def configure_backend(conf):
-    api_obj = api.API(conf)
+    global _API  # pylint: disable=W0603
+    _API = api_obj = api.API(conf)
     for name in api_obj.apis:
         top_api.set_value(name, getattr(api_obj, name))
     for model_name in models.__all__:
         top_models.set_value(model_name, getattr(models, model_name))
+
+
+def reset_after_fork():
+    if _API is not None:
+        _API.pool.reset()
@@ -2,12 +2,37 @@ import ldap
 import logging
 
 from .. import fakeldap
+from . import pool
 from .tenant import TenantAPI
 from .user import UserAPI
 from .role import RoleAPI
 
 LOG = logging.getLogger('keystone.backends.ldap.api')
 
+DEFAULT_PAGE_SIZE = 100
+
+_PAGING_CONTROLS = []
+
+
+def paging_controls():
+    """Returns the SSSRequestControl and SimplePagedResultsControl classes
+
+    They need python-ldap 2.4 and pyasn1; without them this returns None and
+    sorted searches are sorted locally.
+    """
+    if not _PAGING_CONTROLS:
+        try:
+            from ldap.controls import SimplePagedResultsControl
+            from ldap.controls.sss import SSSRequestControl
+            _PAGING_CONTROLS.append((SSSRequestControl,
+                                     SimplePagedResultsControl))
+        except ImportError:
+            LOG.warn("python-ldap cannot send sorted paged searches "
+                     "(it needs version 2.4 and pyasn1), sorting all "
+                     "results locally")
+            _PAGING_CONTROLS.append(None)
+    return _PAGING_CONTROLS[0]
+
 
 def py2ldap(val):
     if isinstance(val, str):
@@ -46,14 +71,24 @@ def safe_iter(attrs):
 
 
 class LDAPWrapper(object):
-    def __init__(self, url):
+    def __init__(self, url, timeout=None):
         LOG.debug("LDAP init: url=%s", url)
         self.conn = ldap.initialize(url)
+        if timeout:
+            self.conn.set_option(ldap.OPT_NETWORK_TIMEOUT, timeout)
+            self.conn.set_option(ldap.OPT_TIMEOUT, timeout)
 
     def simple_bind_s(self, user, password):
         LOG.debug("LDAP bind: dn=%s", user)
         return self.conn.simple_bind_s(user, password)
 
+    def unbind_s(self):
+        LOG.debug("LDAP unbind")
+        return self.conn.unbind_s()
+
+    def whoami_s(self):
+        return self.conn.whoami_s()
+
     def add_s(self, dn, attrs):
         ldap_attrs = [(typ, map(py2ldap, safe_iter(values)))
                       for typ, values in attrs]
@@ -68,10 +103,66 @@ class LDAPWrapper(object):
             LOG.debug("LDAP search: dn=%s, scope=%s, query=%s", dn,
                         fakeldap.scope_names[scope], query)
         res = self.conn.search_s(dn, scope, query)
+        return self._convert_results(res)
+
+    def _convert_results(self, res):
         return [(dn, dict([(typ, map(ldap2py, values))
                            for typ, values in attrs.iteritems()]))
                 for dn, attrs in res]
 
+    def search_sorted_s(self, dn, scope, query, sort_attr, limit,
+                        marker=None, reverse=False, include_marker=False,
+                        page_size=DEFAULT_PAGE_SIZE):
+        """Returns up to `limit` entries sorted on sort_attr after marker
+
+        The server sorts the results and hands them over page_size entries at
+        a time, and the search is abandoned once the window is full, so only
+        the entries up to the end of the window leave the directory.
+        Directory id attributes have no ordering rule to filter on, so the
+        entries up to the marker are skipped here, keeping the server's
+        order.
+        """
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("LDAP sorted search: dn=%s, scope=%s, query=%s, "
+                      "sort=%s, marker=%s, limit=%s", dn,
+                      fakeldap.scope_names[scope], query, sort_attr, marker,
+                      limit)
+        controls = paging_controls()
+        if controls is None:
+            return fakeldap.sorted_window(
+                self.search_s(dn, scope, query), limit, marker=marker,
+                reverse=reverse, include_marker=include_marker)
+        sort_control, paged_control = controls
+        sort = sort_control(criticality=True, ordering_rules=[
+            '%s%s' % ('-' if reverse else '', sort_attr)])
+        cookie = ''
+        window = []
+        while True:
+            paging = paged_control(True, size=page_size, cookie=cookie)
+            try:
+                msgid = self.conn.search_ext(dn, scope, query,
+                                             serverctrls=[sort, paging])
+                _rtype, res, _msgid, ctrls = self.conn.result3(msgid)
+            except ldap.UNAVAILABLE_CRITICAL_EXTENSION:
+                LOG.warn("LDAP server does not support sorted paged "
+                         "searches, sorting all results locally")
+                return fakeldap.sorted_window(
+                    self.search_s(dn, scope, query), limit, marker=marker,
+                    reverse=reverse, include_marker=include_marker)
+            window += fakeldap.sorted_window(res, limit - len(window),
+                marker=marker, reverse=reverse,
+                include_marker=include_marker, presorted=True)
+            cookie = ''.join(c.cookie for c in ctrls
+                if c.controlType == paged_control.controlType)
+            if not cookie or len(window) >= limit:
+                break
+        if cookie:
+            # tell the server we are done with the rest of the results
+            paging = paged_control(True, size=0, cookie=cookie)
+            self.conn.result3(self.conn.search_ext(dn, scope, query,
+                                                   serverctrls=[sort, paging]))
+        return self._convert_results(window)
+
     def modify_s(self, dn, modlist):
         ldap_modlist = [(op, typ, None if values is None else
                          map(py2ldap, safe_iter(values)))
@@ -94,15 +185,33 @@ class API(object):
         self.LDAP_URL = conf.ldap_url
         self.LDAP_USER = conf.ldap_user
         self.LDAP_PASSWORD = conf.ldap_password
+        self.LDAP_TIMEOUT = float(conf.ldap_timeout or 0) or None
+        self.LDAP_PAGE_SIZE = int(conf.ldap_page_size or DEFAULT_PAGE_SIZE)
+        self.pool = pool.ConnectionPool(self._connect,
+            size=int(conf.ldap_pool_size or pool.DEFAULT_SIZE),
+            check_interval=float(conf.ldap_pool_check_interval or
+                                 pool.DEFAULT_CHECK_INTERVAL),
+            lifetime=float(conf.ldap_pool_connection_lifetime or
+                           pool.DEFAULT_CONNECTION_LIFETIME))
         self.tenant = TenantAPI(self, conf)
         self.user = UserAPI(self, conf)
         self.role = RoleAPI(self, conf)
 
     def get_connection(self, user=None, password=None):
+        """Returns a connection bound as `user`, or as the admin user
+
+        Admin connections come from the pool; each operation on the returned
+        object borrows a bound connection for its duration.
+        """
+        if user is None and password is None:
+            return pool.PooledConnection(self.pool)
+        return self._connect(user, password)
+
+    def _connect(self, user=None, password=None):
         if self.LDAP_URL.startswith('fake://'):
             conn = fakeldap.initialize(self.LDAP_URL)
         else:
-            conn = LDAPWrapper(self.LDAP_URL)
+            conn = LDAPWrapper(self.LDAP_URL, timeout=self.LDAP_TIMEOUT)
         if user is None:
             user = self.LDAP_USER
         if password is None:
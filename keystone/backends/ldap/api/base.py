@@ -1,5 +1,6 @@
 import ast
 import ldap
+import ldap.filter
 from itertools import izip, count
 
 
@@ -115,11 +116,60 @@ class BaseLdapAPI(object):
     def get_all(self, filter=None):
         return map(self._ldap_res_to_model, self._ldap_get_all(filter))
 
+    def get_many(self, ids):
+        """Returns the entries with any of the given ids, in one search"""
+        ids = set(ids)
+        if not ids:
+            return []
+        query = '(|%s)' % ''.join('(%s=%s)' % (self.id_attr,
+            ldap.filter.escape_filter_chars(str(id))) for id in ids)
+        return self.get_all(query)
+
+    def _ldap_get_sorted(self, limit, marker=None, reverse=False,
+                         include_marker=False):
+        """Returns up to limit entries following marker in id order"""
+        conn = self.api.get_connection()
+        query = '(objectClass=%s)' % (self.object_class,)
+        try:
+            return conn.search_sorted_s(self.tree_dn, ldap.SCOPE_ONELEVEL,
+                query, self.id_attr, limit, marker=marker, reverse=reverse,
+                include_marker=include_marker,
+                page_size=self.api.LDAP_PAGE_SIZE)
+        except ldap.NO_SUCH_OBJECT:
+            return []
+
+    # pylint: disable=W0141
     def get_page(self, marker, limit):
-        return self._get_page(marker, limit, self.get_all())
+        return map(self._ldap_res_to_model,
+                   self._ldap_get_sorted(limit, marker or None))
 
     def get_page_markers(self, marker, limit):
-        return self._get_page_markers(marker, limit, self.get_all())
+        """Same markers as _get_page_markers(marker, limit, self.get_all())
+
+        Only the entries within limit + 2 of the marker are fetched.
+        """
+        if marker is None:
+            first = self._ldap_get_sorted(limit + 2)
+            if len(first) <= limit + 1:
+                return (None, None)
+            return (None, self._dn_to_id(first[limit][0]))
+
+        after = self._ldap_get_sorted(limit + 2, marker, include_marker=True)
+        before = self._ldap_get_sorted(limit + 2, marker, reverse=True)
+        if len(before) + len(after) < limit:
+            return (None, None)
+        if not after:
+            # a marker past the end counts as the last entry
+            before, after = before[1:], before[:1]
+        if len(before) <= limit:
+            prv = None
+        else:
+            prv = self._dn_to_id(before[limit - 1][0])
+        if len(after) <= limit + 1:
+            nxt = None
+        else:
+            nxt = self._dn_to_id(after[limit][0])
+        return (prv, nxt)
 
     # pylint: disable=W0141
     @staticmethod
@@ -0,0 +1,121 @@
+"""Pool of bound LDAP connections shared by the LDAP backend APIs
+
+Connecting and binding to the directory costs several round trips, so the
+backend keeps a bounded set of connections bound as the configured admin user
+and borrows one for each operation.
+"""
+
+from collections import deque
+import logging
+import time
+
+from eventlet import semaphore
+import ldap
+
+LOG = logging.getLogger('keystone.backends.ldap.api.pool')
+
+DEFAULT_SIZE = 10
+DEFAULT_CHECK_INTERVAL = 60
+DEFAULT_CONNECTION_LIFETIME = 600
+
+
+class ConnectionPool(object):
+    """Bounded pool of LDAP connections created by `connect`
+
+    At most `size` operations run at a time; further callers wait for a free
+    connection. A connection idle for more than `check_interval` seconds is
+    checked with a whoami request before reuse, and one older than `lifetime`
+    seconds is replaced. An operation that fails with SERVER_DOWN is retried
+    once on a new connection.
+    """
+
+    def __init__(self, connect, size=DEFAULT_SIZE,
+                 check_interval=DEFAULT_CHECK_INTERVAL,
+                 lifetime=DEFAULT_CONNECTION_LIFETIME):
+        self.connect = connect
+        self.size = size
+        self.check_interval = check_interval
+        self.lifetime = lifetime
+        self._idle = deque()  # (connection, created, last used)
+        self._limit = semaphore.Semaphore(size)
+
+    def __len__(self):
+        return len(self._idle)
+
+    def _new(self):
+        return (self.connect(), time.time())
+
+    def _acquire(self):
+        """Returns a healthy idle connection, or a new one"""
+        while self._idle:
+            conn, created, last_used = self._idle.pop()
+            now = time.time()
+            if now - created > self.lifetime:
+                self._discard(conn)
+                continue
+            if now - last_used > self.check_interval:
+                try:
+                    conn.whoami_s()
+                except ldap.LDAPError:
+                    LOG.debug("Discarding unhealthy LDAP connection")
+                    self._discard(conn)
+                    continue
+            return conn, created
+        return self._new()
+
+    def _release(self, conn, created):
+        self._idle.append((conn, created, time.time()))
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.unbind_s()
+        except ldap.LDAPError:
+            pass
+
+    def call(self, name, *args, **kwargs):
+        """Runs conn.<name>(*args, **kwargs) on a pooled connection"""
+        with self._limit:
+            conn, created = self._acquire()
+            for retry in (True, False):
+                try:
+                    result = getattr(conn, name)(*args, **kwargs)
+                except ldap.SERVER_DOWN:
+                    self._discard(conn)
+                    if not retry:
+                        raise
+                    LOG.warn("LDAP server down during %s, reconnecting" %
+                             name)
+                    conn, created = self._new()
+                except:  # pylint: disable=W0702
+                    self._release(conn, created)
+                    raise
+                else:
+                    self._release(conn, created)
+                    return result
+
+    def reset(self):
+        """Forgets idle connections without closing them
+
+        For use after a fork, where they are still the parent's.
+        """
+        self._idle.clear()
+        self._limit = semaphore.Semaphore(self.size)
+
+    def clear(self):
+        """Closes all idle connections"""
+        while self._idle:
+            conn, _created, _last_used = self._idle.pop()
+            self._discard(conn)
+
+
+class PooledConnection(object):
+    """Stands in for a bound connection, using the pool for each operation"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __getattr__(self, name):
+        def operation(*args, **kwargs):
+            return self.pool.call(name, *args, **kwargs)
+        return operation
@@ -50,6 +50,35 @@ class RoleAPI(BaseLdapAPI, BaseTenantAPI):
             model['name'] = model['id']
         return model
 
+    def get_many(self, ids):
+        roles = super(RoleAPI, self).get_many(ids)
+        for role in roles:
+            role['name'] = role['id']
+        return roles
+
+    def delete_cascade(self, id):
+        """Deletes the role entry, whose members are the global grants, and
+        the tenant role entries holding its tenant grants"""
+        conn = self.api.get_connection()
+        query = '(&(objectClass=keystoneTenantRole)(keystoneRole=%s))' % (
+            ldap.filter.escape_filter_chars(self._id_to_dn(id)),)
+        try:
+            tenant_roles = conn.search_s(self.api.tenant.tree_dn,
+                                         ldap.SCOPE_SUBTREE, query)
+        except ldap.NO_SUCH_OBJECT:
+            tenant_roles = []
+        role = self._ldap_get(id)
+        entries = tenant_roles + ([role] if role is not None else [])
+
+        grants = 0
+        for _, attrs in entries:
+            grants += len([user_dn for user_dn in attrs.get('member', [])
+                           if not (self.use_dumb_member and
+                                   user_dn == self.DUMB_MEMBER_DN)])
+        for role_dn, _ in entries:
+            conn.delete_s(role_dn)
+        return {'role_grants': grants, 'roles': 1 if role else 0}
+
     def create(self, values):
         values['id'] = values['name']
         delattr(values, 'name')
@@ -169,6 +198,43 @@ class RoleAPI(BaseLdapAPI, BaseTenantAPI):
                        tenant_id=tenant_id))
             return res
 
+    def list_resolved_roles_for_user(self, user_id, tenant_id=None):
+        """ Returns tenant (if requested) and global roles for a user
+
+        Needs at most three searches: the tenant grants, the global grants
+        and one OR-filtered lookup of role entries not already fetched.
+        """
+        tenant_grants = []
+        if tenant_id is not None:
+            tenant_grants = self.list_tenant_roles_for_user(user_id,
+                                                            tenant_id)
+        user_dn = self.api.user._id_to_dn(user_id)
+        global_roles = self.get_all('(member=%s)' % (user_dn,))
+
+        roles_by_id = dict((role.id, role) for role in global_roles)
+        missing = set(grant.role_id for grant in tenant_grants
+                      if grant.role_id not in roles_by_id)
+        for role in self.get_many(missing):
+            roles_by_id[role.id] = role
+
+        res = []
+        for grant in tenant_grants:
+            role = roles_by_id.get(grant.role_id)
+            res.append(models.Role(id=grant.role_id, name=grant.role_id,
+                description=role.description if role else None,
+                service_id=role.service_id if role else None,
+                tenant_id=tenant_id))
+        for role in global_roles:
+            res.append(models.Role(id=role.id, name=role.id,
+                description=role.description, service_id=role.service_id))
+        return res
+
+    def list_resolved_roles_for_users(self, user_tenant_pairs):
+        """ Returns list_resolved_roles_for_user for each (user, tenant)
+        pair, keyed by the pair """
+        return dict((pair, self.list_resolved_roles_for_user(*pair))
+                    for pair in set(user_tenant_pairs))
+
     def rolegrant_get(self, id):
         role_id, tenant_id, user_id = self._explode_ref(id)
         user_dn = self.api.user._id_to_dn(user_id)
@@ -5,6 +5,7 @@ from keystone.backends.api import BaseTenantAPI
 from keystone.backends.sqlalchemy.api.tenant import TenantAPI as SQLTenantAPI
 
 from keystone import models
+from keystone.logic.types import fault
 from .base import  BaseLdapAPI, add_redirects
 
 
@@ -107,3 +108,20 @@ class TenantAPI(BaseLdapAPI, BaseTenantAPI):  # pylint: disable=W0223
             raise fault.ForbiddenFault("You may not delete a tenant that "
                                        "contains users")
         super(TenantAPI, self).delete(id)
+
+    def delete_cascade(self, id):
+        if not self.is_empty(id):
+            raise fault.ForbiddenFault("You may not delete a tenant that "
+                                       "contains users")
+        # revoking grants leaves the tenant role entries behind, and an
+        # entry with children cannot be deleted
+        conn = self.api.get_connection()
+        try:
+            tenant_roles = conn.search_s(self._id_to_dn(id),
+                ldap.SCOPE_ONELEVEL, '(objectClass=keystoneTenantRole)')
+        except ldap.NO_SUCH_OBJECT:
+            tenant_roles = []
+        for role_dn, _ in tenant_roles:
+            conn.delete_s(role_dn)
+        super(TenantAPI, self).delete(id)
+        return {'tenants': 1}
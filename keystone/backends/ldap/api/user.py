@@ -64,14 +64,18 @@ class UserAPI(BaseLdapAPI, BaseUserAPI):
         super(UserAPI, self).update(id, values, old_obj)
 
     def delete(self, id):
+        self.delete_cascade(id)
+
+    def delete_cascade(self, id):
         user = self.get(id)
         if user.tenant_id:
             self.api.tenant.remove_user(user.tenant_id, id)
         super(UserAPI, self).delete(id)
-        for ref in self.api.role.list_global_roles_for_user(id):
-            self.api.role.rolegrant_delete(ref.id)
-        for ref in self.api.role.list_tenant_roles_for_user(id):
+        grants = (self.api.role.list_global_roles_for_user(id) +
+                  self.api.role.list_tenant_roles_for_user(id))
+        for ref in grants:
             self.api.role.rolegrant_delete(ref.id)
+        return {'role_grants': len(grants), 'users': 1}
 
     def get_by_email(self, email):
         users = self.get_all('(mail=%s)' % \
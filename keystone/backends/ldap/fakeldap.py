@@ -55,12 +55,10 @@ def _match_query(query, attrs):
     inner = query[1:-1]
     if inner.startswith('&'):
         # cut off the &
-        l, r = _paren_groups(inner[1:])
-        return _match_query(l, attrs) and _match_query(r, attrs)
+        return all(_match_query(q, attrs) for q in _paren_groups(inner[1:]))
     if inner.startswith('|'):
         # cut off the |
-        l, r = _paren_groups(inner[1:])
-        return _match_query(l, attrs) or _match_query(r, attrs)
+        return any(_match_query(q, attrs) for q in _paren_groups(inner[1:]))
     if inner.startswith('!'):
         # cut off the ! and the nested parentheses
         return not _match_query(query[2:-1], attrs)
@@ -126,6 +124,37 @@ def _subs(value):
     return [value]
 
 
+def dn_to_id(dn):
+    """Returns the value of the first RDN, which the backend uses as id."""
+    return ldap.dn.str2dn(dn)[0][0][1]
+
+
+def sorted_window(entries, limit, marker=None, reverse=False,
+                  include_marker=False, presorted=False):
+    """Sorts search results by id and returns the ones following marker.
+
+    At most `limit` entries are returned, in descending order if `reverse`.
+    This is how a sorted, paged search is answered when the server cannot
+    sort. Ids are compared ignoring case, like the ordering rule of cn;
+    `presorted` entries, such as a page the server sorted, keep their order.
+    """
+    def sort_key(entry):
+        return dn_to_id(entry[0]).lower()
+
+    def past_marker(entry):
+        key = sort_key(entry)
+        if key == folded_marker:
+            return include_marker
+        return (key < folded_marker) if reverse else (key > folded_marker)
+
+    if not presorted:
+        entries = sorted(entries, key=sort_key, reverse=reverse)
+    if marker is not None:
+        folded_marker = marker.lower()
+        entries = [e for e in entries if past_marker(e)]
+    return entries[:limit]
+
+
 server_fail = False
 
 
@@ -147,6 +176,7 @@ class FakeLDAP(object):
 
     def __init__(self, url):
         LOG.debug("FakeLDAP initialize url=%s" % (url,))
+        self.bound_dn = None
         if url == 'fake://memory':
             self.db = FakeShelve.get_instance()
         else:
@@ -158,6 +188,7 @@ class FakeLDAP(object):
             raise ldap.SERVER_DOWN
         LOG.debug("FakeLDAP bind dn=%s" % (dn,))
         if dn == 'cn=Admin' and password == 'password':
+            self.bound_dn = dn
             return
         try:
             attrs = self.db["%s%s" % (self.__prefix, dn)]
@@ -174,11 +205,19 @@ class FakeLDAP(object):
             LOG.error("FakeLDAP bind fail: password for dn=%s does not match" %
                 dn)
             raise ldap.INVALID_CREDENTIALS
+        self.bound_dn = dn
 
     def unbind_s(self):
         """This method is ignored, but provided for compatibility."""
         if server_fail:
             raise ldap.SERVER_DOWN
+        self.bound_dn = None
+
+    def whoami_s(self):
+        """Returns the authzId of the bound user, as used to check health."""
+        if server_fail:
+            raise ldap.SERVER_DOWN
+        return 'dn:%s' % self.bound_dn if self.bound_dn else ''
 
     def add_s(self, dn, attrs):
         """Add an object with the specified attributes at dn."""
@@ -191,8 +230,12 @@ class FakeLDAP(object):
             LOG.error(
                 "FakeLDAP add item failed: dn '%s' is already in store." % dn)
             raise ldap.ALREADY_EXISTS(dn)
-        self.db[key] = dict([(k, v if isinstance(v, list) else [v])
-                             for k, v in attrs])
+        item = dict([(k, v if isinstance(v, list) else [v])
+                     for k, v in attrs])
+        # like a real server, store the naming attribute of the entry too
+        rdn_attr, rdn_value = ldap.dn.str2dn(dn)[0][0][:2]
+        item.setdefault(rdn_attr, [rdn_value])
+        self.db[key] = item
         self.db.sync()
 
     def delete_s(self, dn):
@@ -309,6 +352,20 @@ class FakeLDAP(object):
         LOG.debug("FakeLDAP search result: %s" % (objects,))
         return objects
 
+    # pylint: disable=W0613
+    def search_sorted_s(self, dn, scope, query, sort_attr, limit,
+                        marker=None, reverse=False, include_marker=False,
+                        page_size=None):
+        """Search like search_s, returning one window of the results.
+
+        Entries are ordered by id; see sorted_window() for the meaning of
+        the remaining arguments. page_size is accepted for compatibility
+        with LDAPWrapper and ignored.
+        """
+        return sorted_window(self.search_s(dn, scope, query), limit,
+                             marker=marker, reverse=reverse,
+                             include_marker=include_marker)
+
     @property
     def __prefix(self):  # pylint: disable=R0201
         """Get the prefix to use for all keys."""
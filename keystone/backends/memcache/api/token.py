@@ -40,6 +40,13 @@ class TokenAPI(BaseTokenAPI):
             token.tenant_id = None
         return token
 
+    def get_many(self, ids):
+        tokens = MEMCACHE_SERVER.get_multi(list(set(ids))).values()
+        for token in tokens:
+            if not hasattr(token, 'tenant_id'):
+                token.tenant_id = None
+        return tokens
+
     # pylint: disable=E1103
     def delete(self, id):
         token = self.get(id)
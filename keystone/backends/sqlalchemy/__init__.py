@@ -20,11 +20,14 @@
 from sqlalchemy.orm import joinedload, aliased, sessionmaker
 
 import ast
+import contextlib
 import logging
 import os
 import sys
 
+from eventlet import corolocal
 from sqlalchemy import create_engine
+from sqlalchemy import exc
 from sqlalchemy.pool import StaticPool
 
 try:
@@ -36,6 +39,10 @@ except ImportError:
 from keystone import utils
 from keystone.backends.sqlalchemy import models
 from keystone.backends.sqlalchemy import migration
+from keystone.backends.sqlalchemy import identity_cache
+from keystone.backends.sqlalchemy import replicas
+from keystone.backends.sqlalchemy import threadpool
+import keystone.backends as top_backends
 import keystone.backends.api as top_api
 import keystone.backends.models as top_models
 
@@ -43,13 +50,41 @@ logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
 _DRIVER = None
 
+# The connections of the request being served by the current greenthread
+_REQUEST = corolocal.local()
+
 
 class Driver():
     def __init__(self, conf):
         self.session = None
         self._engine = None
         self.connection_str = conf.sql_connection
+        self.execution_mode = conf.sql_execution_mode or threadpool.INLINE
+        if self.execution_mode not in threadpool.EXECUTION_MODES:
+            raise ValueError("Unknown sql_execution_mode: %s (expected %s)" %
+                (self.execution_mode, ', '.join(threadpool.EXECUTION_MODES)))
+        self.pool_size = int(conf.sql_thread_pool_size or
+                             threadpool.DEFAULT_POOL_SIZE)
+        self.read_connection_strs = [connection_str.strip() for
+            connection_str in (conf.sql_read_connections or '').split(',')
+            if connection_str.strip()]
+        self.replicas = replicas.ReplicaSet([])
+        self.engine_pool_args = {}
+        for option, name in (('sql_pool_size', 'pool_size'),
+                             ('sql_max_overflow', 'max_overflow'),
+                             ('sql_pool_timeout', 'pool_timeout')):
+            value = getattr(conf, option)
+            if value not in (None, ''):
+                self.engine_pool_args[name] = int(value)
         model_list = ast.literal_eval(conf.backend_entities)
+        self.model_list = model_list
+        identity_cache.configure(conf.identity_cache_size)
+        if self.execution_mode == threadpool.THREADPOOL:
+            if self.connection_str == "sqlite://":
+                # the in-memory database is a single connection, which
+                # cannot be used from several threads at once
+                self.pool_size = 1
+            threadpool.configure(self.pool_size)
         self._init_engine(model_list)
         self._init_models(model_list)
         self._init_session_maker()
@@ -70,12 +105,27 @@ class Driver():
             self._init_tables(model_list)
         else:
             # initialize a "real" database
-            self._engine = create_engine(
-                self.connection_str,
-                pool_recycle=3600)
+            self._engine = self._create_engine(self.connection_str)
             self._init_version_control()
             self._init_tables(model_list)
 
+        if self.read_connection_strs:
+            logger.info("Routing reads to replicas: %s" %
+                        ', '.join(self.read_connection_strs))
+            self.replicas = replicas.ReplicaSet(
+                replicas.Replica(connection_str,
+                                 self._create_engine(connection_str))
+                for connection_str in self.read_connection_strs)
+
+    def _create_engine(self, connection_str):
+        engine_args = {'pool_recycle': 3600}
+        if not connection_str.startswith('sqlite'):
+            if self.execution_mode == threadpool.THREADPOOL:
+                # one connection for each thread running backend calls
+                engine_args.update(pool_size=self.pool_size, max_overflow=0)
+            engine_args.update(self.engine_pool_args)
+        return create_engine(connection_str, **engine_args)
+
     def _init_version_control(self):
         """Verify the state of the database"""
         repo_path = migration.get_migrate_repo_path()
@@ -98,8 +148,7 @@ class Driver():
                 (self.connection_str))
             logging.warning(msg)
 
-    @staticmethod
-    def _init_models(model_list):
+    def _init_models(self, model_list):
         for model in model_list:
             model_class = getattr(models, model)
             top_models.set_value(model, model_class)
@@ -109,7 +158,12 @@ class Driver():
                 api_module = sys.modules.get(api_path)
                 if api_module is None:
                     api_module = utils.import_module(api_path)
-                top_api.set_value(model_class.__api__, api_module.get())
+                backend_api = api_module.get()
+                if self.read_connection_strs:
+                    backend_api = replicas.ReadRoutingAPI(backend_api)
+                if self.execution_mode == threadpool.THREADPOOL:
+                    backend_api = threadpool.ThreadPoolAPI(backend_api)
+                top_api.set_value(model_class.__api__, backend_api)
 
     def _init_tables(self, model_list):
         tables = []
@@ -135,9 +189,59 @@ class Driver():
             expire_on_commit=False)
 
     def get_session(self):
-        """Creates a pre-configured database session"""
+        """Creates a pre-configured database session
+
+        It is bound to a read replica when the backend call being made is a
+        read, and to the connection of the request within
+        request_session().
+        """
+        if replicas.reading() and len(self.replicas):
+            session = self._get_replica_session()
+            if session is not None:
+                return session
+        connection = self._request_connection(self._engine)
+        if connection is not None:
+            return self.session(bind=connection)
         return self.session()
 
+    def _get_replica_session(self):
+        for replica in self.replicas.candidates():
+            try:
+                connection = self._request_connection(replica.engine)
+            except exc.DBAPIError, e:
+                replica.mark_down(e)
+                continue
+            replicas.serving(replica)
+            # outside a request, each query checks out a pooled connection
+            return self.session(bind=connection or replica.engine)
+        return None
+
+    @staticmethod
+    def _request_connection(engine):
+        """Returns the request's connection to the engine, if in a request
+
+        It is checked out on first use, and kept until the request ends.
+        """
+        connections = getattr(_REQUEST, 'connections', None)
+        if connections is None:
+            return None
+        if engine not in connections:
+            connections[engine] = engine.connect()
+        return connections[engine]
+
+    def request_scope_supported(self):
+        """In threadpool mode, the calls of a request run on any free pool
+        thread, and a connection must not move between threads."""
+        return self.execution_mode != threadpool.THREADPOOL
+
+    def reset_after_fork(self):
+        """Drops the connections and caches inherited by a forked worker"""
+        if self._engine is not None and self.connection_str != "sqlite://":
+            # (an in-memory database lives in its only connection)
+            self._engine.dispose()
+        self.replicas.dispose()
+        identity_cache.configure()
+
     def reset(self):
         """Unregister models and reset DB engine.
 
@@ -151,6 +255,9 @@ class Driver():
         if self._engine is not None:
             models.Base.metadata.drop_all(self._engine)
             self._engine = None
+        self.replicas.dispose()
+        self.replicas = replicas.ReplicaSet([])
+        identity_cache.configure()
 
 
 def configure_backend(conf):
@@ -163,7 +270,43 @@ def get_session():
     return _DRIVER.get_session()
 
 
+def manages(model_name):
+    """Whether the given model is stored by this backend"""
+    return _DRIVER is not None and model_name in _DRIVER.model_list
+
+
+@contextlib.contextmanager
+def request_session():
+    """Makes the backend calls made within share their database connections
+
+    Each call still gets its own session, as the APIs modify the objects
+    they load when converting them to Keystone models; the sessions are
+    bound to one connection per engine, checked out on first use. Nested
+    uses share the outermost connections, which are returned to the pool
+    on the way out.
+    """
+    if (_DRIVER is None or not _DRIVER.request_scope_supported() or
+            getattr(_REQUEST, 'connections', None) is not None):
+        yield
+        return
+    _REQUEST.connections = {}
+    try:
+        yield
+    finally:
+        connections = _REQUEST.connections
+        _REQUEST.connections = None
+        for connection in connections.values():
+            connection.close()
+
+
+def reset_after_fork():
+    global _DRIVER
+    if _DRIVER:
+        _DRIVER.reset_after_fork()
+
+
 def unregister_models():
     global _DRIVER
+    top_backends.forget_configuration()
     if _DRIVER:
         return _DRIVER.reset()
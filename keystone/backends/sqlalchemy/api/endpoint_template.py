@@ -69,6 +69,15 @@ class EndpointTemplateAPI(api.BaseEndpointTemplateAPI):
         return session.query(models.EndpointTemplates).\
             filter_by(id=id).first()
 
+    def get_many(self, ids, session=None):
+        if not ids:
+            return []
+
+        session = session or get_session()
+
+        return session.query(models.EndpointTemplates).\
+            filter(models.EndpointTemplates.id.in_(set(ids))).all()
+
     def get_all(self, session=None):
         if not session:
             session = get_session()
@@ -15,7 +15,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from keystone.backends.sqlalchemy import get_session, models
+from sqlalchemy import or_
+
+from keystone.backends.sqlalchemy import get_session, models, aliased
 from keystone.backends import api
 from keystone.models import Role, UserRoleAssociation
 
@@ -76,6 +78,18 @@ class RoleAPI(api.BaseRoleAPI):
             role = session.query(models.Role).filter_by(id=id).first()
             session.delete(role)
 
+    def delete_cascade(self, id, session=None):
+        if not session:
+            session = get_session()
+        with session.begin():
+            grants = session.query(models.UserRoleAssociation).\
+                filter_by(role_id=id).\
+                delete(synchronize_session=False)
+            roles = session.query(models.Role).\
+                filter_by(id=id).\
+                delete(synchronize_session=False)
+        return {'role_grants': grants, 'roles': roles}
+
     @staticmethod
     def update(id, values, session=None):
         if not session:
@@ -96,6 +110,15 @@ class RoleAPI(api.BaseRoleAPI):
         return RoleAPI.to_model(
             session.query(models.Role).filter_by(id=id).first())
 
+    def get_many(self, ids, session=None):
+        if not ids:
+            return []
+
+        session = session or get_session()
+        return RoleAPI.to_model_list(session.query(models.Role).
+                                     filter(models.Role.id.in_(set(ids))).
+                                     all())
+
     def get_by_name(self, name, session=None):
         if not session:
             session = get_session()
@@ -414,6 +437,79 @@ class RoleAPI(api.BaseRoleAPI):
 
         return RoleAPI.to_ura_model_list(results)
 
+    def list_resolved_roles_for_user(self, user_id, tenant_id=None,
+                                     session=None):
+        """ Returns tenant (if requested) and global roles for a user
+
+        Grants, roles and tenant UIDs are resolved in a single joined query,
+        so the cost does not grow with the number of grants.
+        """
+        pair = (user_id, tenant_id)
+        return self.list_resolved_roles_for_users([pair], session)[pair]
+
+    def list_resolved_roles_for_users(self, user_tenant_pairs, session=None):
+        """ Returns list_resolved_roles_for_user for each (user, tenant)
+        pair, keyed by the pair, from a single joined query """
+        pairs = set(user_tenant_pairs)
+        if not pairs:
+            return {}
+        session = session or get_session()
+
+        ura = aliased(models.UserRoleAssociation)
+        role = aliased(models.Role)
+        user = aliased(models.User)
+        tenant = aliased(models.Tenant)
+
+        user_ids = set(user_id for user_id, _tenant_id in pairs)
+        if hasattr(api.USER, 'uid_to_id'):
+            user_key = user.uid
+            user_ids = set(str(user_id) for user_id in user_ids)
+        else:
+            user_key = ura.user_id
+
+        query = session.query(role, ura.tenant_id, tenant.uid, user_key).\
+            select_from(ura).\
+            join((role, role.id == ura.role_id)).\
+            join((user, user.id == ura.user_id)).\
+            outerjoin((tenant, tenant.id == ura.tenant_id)).\
+            filter(user_key.in_(user_ids))
+
+        tenant_ids = set(tenant_id for _user_id, tenant_id in pairs
+                         if tenant_id is not None)
+        if not tenant_ids:
+            query = query.filter(ura.tenant_id == None)
+        elif hasattr(api.TENANT, 'uid_to_id'):
+            query = query.filter(or_(ura.tenant_id == None,
+                                     tenant.uid.in_(tenant_ids)))
+        else:
+            query = query.filter(or_(ura.tenant_id == None,
+                                     ura.tenant_id.in_(tenant_ids)))
+
+        results = query.order_by(ura.id).all()
+
+        # tenant grants first, then global grants (stable sort)
+        results.sort(key=lambda result: result[1] is None)
+
+        roles = dict((pair, []) for pair in pairs)
+        pairs_by_user = {}
+        for pair in pairs:
+            pairs_by_user.setdefault(unicode(pair[0]), []).append(pair)
+        for ref, backend_tenant_id, tenant_uid, user_id in results:
+            if backend_tenant_id is None:
+                role_tenant_id = None
+            elif hasattr(api.TENANT, 'uid_to_id'):
+                role_tenant_id = tenant_uid
+            else:
+                role_tenant_id = str(backend_tenant_id)
+            for pair in pairs_by_user.get(unicode(user_id), []):
+                if role_tenant_id is not None and (pair[1] is None or
+                        unicode(role_tenant_id) != unicode(pair[1])):
+                    continue
+                role_model = RoleAPI.to_model(ref)
+                role_model.tenant_id = role_tenant_id
+                roles[pair].append(role_model)
+        return roles
+
     def rolegrant_list_by_role(self, role_id, session=None):
         """ Get a list of all (global and tenant) grants for this role """
         if not session:
@@ -15,7 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from keystone.backends.sqlalchemy import get_session, models
+from keystone.backends.sqlalchemy import get_session, manages, models
 from keystone.backends import api
 from keystone.models import Service
 
@@ -109,6 +109,15 @@ class ServiceAPI(api.BaseServiceAPI):
         return ServiceAPI.to_model(session.query(models.Service).
                                    filter_by(id=id).first())
 
+    def get_many(self, ids, session=None):
+        if not ids:
+            return []
+
+        session = session or get_session()
+        return ServiceAPI.to_model_list(session.query(models.Service).
+                                        filter(models.Service.id.in_(
+                                            set(ids))).all())
+
     def get_by_name(self, name, session=None):
         if not session:
             session = get_session()
@@ -189,6 +198,42 @@ class ServiceAPI(api.BaseServiceAPI):
                                    filter_by(id=id).first()
             session.delete(service_ref)
 
+    def delete_cascade(self, id, session=None):
+        counts = {}
+        if not manages('Role'):
+            # the roles are stored by another backend
+            for role in api.ROLE.get_by_service(id) or []:
+                for kind, count in api.ROLE.delete_cascade(role.id).items():
+                    counts[kind] = counts.get(kind, 0) + count
+
+        if not session:
+            session = get_session()
+        with session.begin():
+            if manages('Role'):
+                role_ids = session.query(models.Role.id).\
+                    filter_by(service_id=id).subquery()
+                counts['role_grants'] = session.\
+                    query(models.UserRoleAssociation).\
+                    filter(models.UserRoleAssociation.role_id.in_(role_ids)).\
+                    delete(synchronize_session=False)
+                counts['roles'] = session.query(models.Role).\
+                    filter_by(service_id=id).\
+                    delete(synchronize_session=False)
+            template_ids = session.query(models.EndpointTemplates.id).\
+                filter_by(service_id=id).subquery()
+            counts['endpoints'] = session.query(models.Endpoints).\
+                filter(models.Endpoints.endpoint_template_id.in_(
+                    template_ids)).\
+                delete(synchronize_session=False)
+            counts['endpoint_templates'] = session.\
+                query(models.EndpointTemplates).\
+                filter_by(service_id=id).\
+                delete(synchronize_session=False)
+            counts['services'] = session.query(models.Service).\
+                filter_by(id=id).\
+                delete(synchronize_session=False)
+        return counts
+
 
 def get():
     return ServiceAPI()
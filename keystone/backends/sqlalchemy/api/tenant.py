@@ -17,8 +17,10 @@
 
 import uuid
 
-from keystone.backends.sqlalchemy import get_session, models, aliased
+from keystone.backends.sqlalchemy import get_session, models, aliased, \
+    identity_cache
 from keystone.backends import api
+from keystone.logic.types import fault
 from keystone.models import Tenant
 
 
@@ -90,6 +92,15 @@ class TenantAPI(api.BaseTenantAPI):
 
         return TenantAPI.to_model(result)
 
+    def get_many(self, ids, session=None):
+        if not ids:
+            return []
+
+        session = session or get_session()
+        return TenantAPI.to_model_list(session.query(models.Tenant).
+                                       filter(models.Tenant.uid.in_(set(ids))).
+                                       all())
+
     @staticmethod
     def _get_by_id(id, session=None):
         """Returns a tenant by ID (PK).
@@ -112,6 +123,10 @@ class TenantAPI(api.BaseTenantAPI):
         if id is None:
             return None
 
+        uid = identity_cache.TENANTS.get_uid(id)
+        if uid is not None:
+            return uid
+
         session = session or get_session()
         tenant = session.query(models.Tenant).filter_by(id=id).first()
         return tenant.uid if tenant else None
@@ -121,6 +136,10 @@ class TenantAPI(api.BaseTenantAPI):
         if uid is None:
             return None
 
+        id = identity_cache.TENANTS.get_id(uid)
+        if id is not None:
+            return id
+
         session = session or get_session()
         tenant = session.query(models.Tenant).filter_by(uid=uid).first()
         return tenant.id if tenant else None
@@ -336,6 +355,28 @@ class TenantAPI(api.BaseTenantAPI):
             tenant_ref = self._get_by_id(id, session)
             session.delete(tenant_ref)
 
+    def delete_cascade(self, id, session=None):
+        if not session:
+            session = get_session()
+
+        uid = id
+        if hasattr(api.TENANT, 'uid_to_id'):
+            id = self.uid_to_id(uid)
+
+        with session.begin():
+            if not self.is_empty(uid, session):
+                raise fault.ForbiddenFault("You may not delete a tenant that "
+                                           "contains users")
+            endpoints = session.query(models.Endpoints).\
+                filter_by(tenant_id=id).\
+                delete(synchronize_session=False)
+            tenants = session.query(models.Tenant).\
+                filter_by(id=id).\
+                delete(synchronize_session=False)
+        # bulk deletes do not fire the ORM events maintaining the cache
+        identity_cache.TENANTS.evict(id=id, uid=uid)
+        return {'endpoints': endpoints, 'tenants': tenants}
+
     def get_all_endpoints(self, tenant_id, session=None):
         if not session:
             session = get_session()
@@ -15,6 +15,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from datetime import datetime
+
 from keystone.backends.sqlalchemy import get_session, models
 from keystone.backends import api
 from keystone.models import Token
@@ -76,6 +78,15 @@ class TokenAPI(api.BaseTokenAPI):
 
         return TokenAPI.to_model(result)
 
+    def get_many(self, ids, session=None):
+        if not ids:
+            return []
+
+        session = session or get_session()
+        return TokenAPI.to_model_list(session.query(models.Token).
+                                      filter(models.Token.id.in_(set(ids))).
+                                      all())
+
     @staticmethod
     def _get(id, session=None):
         if id is None:
@@ -144,6 +155,35 @@ class TokenAPI(api.BaseTokenAPI):
 
         return TokenAPI.to_model_list(results)
 
+    def delete_expired(self, expires_before, limit, session=None):
+        if not session:
+            session = get_session()
+
+        with session.begin():
+            # oldest first, walking ix_tokens_expires, so each batch only
+            # locks the rows it is about to delete
+            ids = [row.id for row in session.query(models.Token.id).
+                   filter(models.Token.expires < expires_before).
+                   order_by(models.Token.expires).
+                   limit(limit)]
+            if not ids:
+                return 0
+            session.query(models.Token).\
+                filter(models.Token.id.in_(ids)).\
+                delete(synchronize_session=False)
+
+        return len(ids)
+
+    def fetch_live_ids(self, created_after=None, session=None):
+        if not session:
+            session = get_session()
+
+        query = session.query(models.Token.id, models.Token.created).\
+            filter(models.Token.expires > datetime.now())
+        if created_after is not None:
+            query = query.filter(models.Token.created >= created_after)
+        return [(row.id, row.created) for row in query]
+
 
 def get():
     return TokenAPI()
@@ -0,0 +1,66 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2011 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from datetime import datetime
+
+from keystone.backends.sqlalchemy import get_session, models
+from keystone.backends import api
+
+
+# pylint: disable=E1103,W0221
+class TokenRevocationAPI(api.BaseTokenRevocationAPI):
+    def __init__(self, *args, **kw):
+        super(TokenRevocationAPI, self).__init__(*args, **kw)
+
+    def create(self, token_id, expires):
+        revocation_ref = models.TokenRevocation()
+        revocation_ref.update(dict(token_id=token_id, expires=expires))
+        revocation_ref.save()
+        return revocation_ref.id
+
+    def get_since(self, marker, limit, session=None):
+        if not session:
+            session = get_session()
+
+        query = session.query(models.TokenRevocation).\
+            filter(models.TokenRevocation.expires > datetime.now())
+        if marker is not None:
+            query = query.filter(models.TokenRevocation.id > marker)
+        return [(ref.id, ref.token_id, ref.expires) for ref in
+                query.order_by(models.TokenRevocation.id).limit(limit)]
+
+    def delete_expired(self, expires_before, limit, session=None):
+        if not session:
+            session = get_session()
+
+        with session.begin():
+            ids = [row.id for row in
+                   session.query(models.TokenRevocation.id).
+                   filter(models.TokenRevocation.expires < expires_before).
+                   order_by(models.TokenRevocation.expires).
+                   limit(limit)]
+            if not ids:
+                return 0
+            session.query(models.TokenRevocation).\
+                filter(models.TokenRevocation.id.in_(ids)).\
+                delete(synchronize_session=False)
+
+        return len(ids)
+
+
+def get():
+    return TokenRevocationAPI()
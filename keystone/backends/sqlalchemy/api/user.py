@@ -19,7 +19,7 @@ import uuid
 
 import keystone.backends.backendutils as utils
 from keystone.backends.sqlalchemy import get_session, models, aliased, \
-    joinedload
+    joinedload, identity_cache
 from keystone.backends import api
 from keystone.models import User
 
@@ -89,6 +89,14 @@ class UserAPI(api.BaseUserAPI):
 
         return UserAPI.to_model(result)
 
+    def get_many(self, ids, session=None):
+        if not ids:
+            return []
+
+        session = session or get_session()
+        return UserAPI.to_model_list(session.query(models.User).
+            filter(models.User.uid.in_(set(str(id) for id in ids))).all())
+
     @staticmethod
     def _get_by_id(id, session=None):
         """Only for use by the sql backends
@@ -109,6 +117,10 @@ class UserAPI(api.BaseUserAPI):
         if id is None:
             return None
 
+        uid = identity_cache.USERS.get_uid(id)
+        if uid is not None:
+            return uid
+
         session = session or get_session()
         user = session.query(models.User).filter_by(id=str(id)).first()
         return user.uid if user else None
@@ -118,6 +130,10 @@ class UserAPI(api.BaseUserAPI):
         if uid is None:
             return None
 
+        id = identity_cache.USERS.get_id(uid)
+        if id is not None:
+            return id
+
         session = session or get_session()
         user = session.query(models.User).filter_by(uid=str(uid)).first()
         return user.id if user else None
@@ -232,6 +248,30 @@ class UserAPI(api.BaseUserAPI):
             user_ref = session.query(models.User).filter_by(uid=id).first()
             session.delete(user_ref)
 
+    def delete_cascade(self, id, session=None):
+        if not session:
+            session = get_session()
+
+        with session.begin():
+            user_ref = session.query(models.User.id).\
+                filter_by(uid=id).first()
+            if user_ref is None:
+                return {'role_grants': 0, 'credentials': 0, 'users': 0}
+            pkid = user_ref.id
+            grants = session.query(models.UserRoleAssociation).\
+                filter_by(user_id=pkid).\
+                delete(synchronize_session=False)
+            credentials = session.query(models.Credentials).\
+                filter_by(user_id=pkid).\
+                delete(synchronize_session=False)
+            users = session.query(models.User).\
+                filter_by(id=pkid).\
+                delete(synchronize_session=False)
+        # bulk deletes do not fire the ORM events maintaining the cache
+        identity_cache.USERS.evict(id=pkid, uid=id)
+        return {'role_grants': grants, 'credentials': credentials,
+                'users': users}
+
     def get_by_tenant(self, id, tenant_id, session=None):
         if not session:
             session = get_session()
@@ -0,0 +1,144 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2011 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+""" In-process PK <-> UID identity cache for tenants and users
+
+The sqlalchemy backend stores tenants and users with an integer primary key
+(``id``) but exposes the string ``uid`` to the rest of Keystone, so almost
+every read translates between the two. A UID never changes once assigned,
+which makes the mapping safe to cache.
+
+The caches are filled by ORM events whenever a Tenant or User row is loaded
+or updated, and entries are evicted when the row is deleted.
+"""
+
+import logging
+import threading
+
+from sqlalchemy import event
+
+from keystone.backends.sqlalchemy import models
+from keystone.common import lru
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+DEFAULT_MAX_SIZE = 10000
+
+
+class IdentityCache(object):
+    """ Bounded, bidirectional map of primary keys to UIDs
+
+    Least recently used entries are discarded once ``max_size`` is reached.
+    A ``max_size`` of 0 disables the cache.
+    """
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._uids = lru.LRUDict()  # str(pk) -> (pk, uid), in LRU order
+        self._ids = {}  # uid -> str(pk)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._uids)
+
+    def get_uid(self, id):
+        """ Returns the cached UID for a primary key, or None """
+        key = str(id)
+        with self._lock:
+            entry = self._uids.pop(key, None)
+            if entry is None:
+                return None
+            self._uids[key] = entry
+            return entry[1]
+
+    def get_id(self, uid):
+        """ Returns the cached primary key for a UID, or None """
+        uid = str(uid)
+        with self._lock:
+            key = self._ids.get(uid)
+            if key is None:
+                return None
+            entry = self._uids.pop(key)
+            self._uids[key] = entry
+            return entry[0]
+
+    def put(self, id, uid):
+        if not self.max_size or id is None or uid is None:
+            return
+        key = str(id)
+        uid = str(uid)
+        with self._lock:
+            self._remove(key, uid)
+            self._uids[key] = (id, uid)
+            self._ids[uid] = key
+            while len(self._uids) > self.max_size:
+                _key, (_id, old_uid) = self._uids.pop_oldest()
+                self._ids.pop(old_uid, None)
+
+    def evict(self, id=None, uid=None):
+        """ Removes any entry matching the primary key or the UID """
+        with self._lock:
+            self._remove(None if id is None else str(id),
+                         None if uid is None else str(uid))
+
+    def clear(self):
+        with self._lock:
+            self._uids.clear()
+            self._ids.clear()
+
+    def _remove(self, key, uid):
+        if key is not None:
+            entry = self._uids.pop(key, None)
+            if entry is not None:
+                self._ids.pop(entry[1], None)
+        if uid is not None:
+            old_key = self._ids.pop(uid, None)
+            if old_key is not None:
+                self._uids.pop(old_key, None)
+
+
+TENANTS = IdentityCache()
+USERS = IdentityCache()
+
+
+def configure(max_size=None):
+    """ Resets both caches, applying a new size limit if one is given """
+    if max_size is not None:
+        TENANTS.max_size = USERS.max_size = int(max_size)
+    TENANTS.clear()
+    USERS.clear()
+    logger.debug("Identity cache configured (max_size=%s)" %
+                 TENANTS.max_size)
+
+
+def _register(model_class, cache):
+    # pylint: disable=W0613
+    def on_load(target, context):
+        cache.put(target.id, target.uid)
+
+    def on_update(mapper, connection, target):
+        cache.evict(id=target.id)
+        cache.put(target.id, target.uid)
+
+    def on_delete(mapper, connection, target):
+        cache.evict(id=target.id, uid=target.uid)
+
+    event.listen(model_class, 'load', on_load)
+    event.listen(model_class, 'after_update', on_update)
+    event.listen(model_class, 'after_delete', on_delete)
+
+_register(models.Tenant, TENANTS)
+_register(models.User, USERS)
@@ -0,0 +1,36 @@
+"""
+Index the tokens table for user/tenant lookups and expiry scans
+
+Adds a composite (user_id, tenant_id, expires) index, used when looking up
+a user's current token during authentication, and an index on expires.
+"""
+# pylint: disable=C0103,R0801
+
+
+import sqlalchemy
+
+
+meta = sqlalchemy.MetaData()
+
+
+def _indexes(tokens):
+    return [
+        sqlalchemy.Index('ix_tokens_user_id_tenant_id_expires',
+            tokens.c.user_id, tokens.c.tenant_id, tokens.c.expires),
+        sqlalchemy.Index('ix_tokens_expires', tokens.c.expires)]
+
+
+def upgrade(migrate_engine):
+    meta.bind = migrate_engine
+    tokens = sqlalchemy.Table('tokens', meta, autoload=True)
+
+    for index in _indexes(tokens):
+        index.create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta.bind = migrate_engine
+    tokens = sqlalchemy.Table('tokens', meta, autoload=True)
+
+    for index in _indexes(tokens):
+        index.drop(migrate_engine)
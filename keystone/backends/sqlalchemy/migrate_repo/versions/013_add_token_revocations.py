@@ -0,0 +1,32 @@
+"""
+Add the token_revocations table
+
+Records tokens deleted before they expired, so that services caching
+validated tokens can be told to forget them.
+"""
+# pylint: disable=C0103,R0801
+
+
+import sqlalchemy
+
+
+meta = sqlalchemy.MetaData()
+
+
+token_revocations = sqlalchemy.Table('token_revocations', meta,
+    sqlalchemy.Column('id', sqlalchemy.Integer(), primary_key=True),
+    sqlalchemy.Column('token_id', sqlalchemy.String(255), nullable=False),
+    sqlalchemy.Column('expires', sqlalchemy.DateTime()))
+
+# created and dropped with the table
+sqlalchemy.Index('ix_token_revocations_expires', token_revocations.c.expires)
+
+
+def upgrade(migrate_engine):
+    meta.bind = migrate_engine
+    token_revocations.create()
+
+
+def downgrade(migrate_engine):
+    meta.bind = migrate_engine
+    token_revocations.drop()
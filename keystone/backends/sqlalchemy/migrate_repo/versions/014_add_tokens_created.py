@@ -0,0 +1,35 @@
+"""
+Record when each token was created
+
+Adds a tokens.created column, set from the database clock on insert, and an
+index on it. Processes keeping a filter of token ids use it to fetch the
+tokens created since they last looked, whatever their expiry.
+"""
+# pylint: disable=C0103,R0801
+
+
+import sqlalchemy
+import migrate
+
+
+meta = sqlalchemy.MetaData()
+
+created = sqlalchemy.Column('created', sqlalchemy.DateTime, nullable=True)
+
+
+def upgrade(migrate_engine):
+    meta.bind = migrate_engine
+    tokens = sqlalchemy.Table('tokens', meta, autoload=True)
+
+    migrate.create_column(created, tokens)
+    sqlalchemy.Index('ix_tokens_created',
+                     tokens.c.created).create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta.bind = migrate_engine
+    tokens = sqlalchemy.Table('tokens', meta, autoload=True)
+
+    sqlalchemy.Index('ix_tokens_created',
+                     tokens.c.created).drop(migrate_engine)
+    migrate.drop_column('created', tokens)
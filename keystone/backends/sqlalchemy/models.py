@@ -15,7 +15,7 @@
 # limitations under the License.
 
 from sqlalchemy import Column, String, Integer, ForeignKey, \
-    UniqueConstraint, Boolean, DateTime
+    UniqueConstraint, Boolean, DateTime, Index, func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, object_mapper
@@ -169,6 +169,24 @@ class Token(Base, KeystoneBase):
     user_id = Column(Integer)
     tenant_id = Column(Integer)
     expires = Column(DateTime)
+    # from the database clock, so it orders tokens created anywhere
+    created = Column(DateTime, default=func.now())
+
+Index('ix_tokens_user_id_tenant_id_expires',
+      Token.user_id, Token.tenant_id, Token.expires)
+Index('ix_tokens_expires', Token.expires)
+Index('ix_tokens_created', Token.created)
+
+
+class TokenRevocation(Base, KeystoneBase):
+    """ A token deleted before it expired; the id orders revocations """
+    __tablename__ = 'token_revocations'
+    __api__ = 'token_revocation'
+    id = Column(Integer, primary_key=True)
+    token_id = Column(String(255), nullable=False)
+    expires = Column(DateTime)
+
+Index('ix_token_revocations_expires', TokenRevocation.expires)
 
 
 class EndpointTemplates(Base, KeystoneBase):
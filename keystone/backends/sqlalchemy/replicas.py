@@ -0,0 +1,174 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2011 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+""" Routes sqlalchemy backend reads to read replicas
+
+When ``sql_read_connections`` lists replicas of the database, each backend
+API is wrapped in a ReadRoutingAPI. Calls to read-only methods (``get``,
+``get_by_name``, ``list_*``, ``get_all_endpoints`` and the like) mark the
+current greenthread as reading, and the driver then hands out sessions on a
+replica. Everything else, and anything called from within a write, uses the
+primary database.
+
+A replica that cannot be connected to, or fails a query, is left alone for
+a while, and reads fall back to the other replicas or to the primary. A
+read that finds nothing on a replica is repeated on the primary, so that
+rows written an instant ago are found despite replication lag; so is a
+``get_many`` for the ids it did not find.
+"""
+
+import itertools
+import logging
+import re
+import threading
+import time
+
+from eventlet import corolocal
+from sqlalchemy import exc
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+# Seconds a replica that failed is skipped for
+RETRY_INTERVAL = 30
+
+# Backend API methods that only read
+READ_METHODS = re.compile(r'^(get|list_|is_|check_password$|uid_to_id$|'
+                          r'id_to_uid$|(endpoint|rolegrant|users?)_(get|list|'
+                          r'roles))')
+
+_ROUTE = corolocal.local()
+
+
+def is_read_method(name):
+    return READ_METHODS.match(name) is not None
+
+
+def reading():
+    """ Whether the current backend call may be served by a replica """
+    return getattr(_ROUTE, 'state', None) == 'read'
+
+
+def serving(replica):
+    """ Records the replica a session was handed out on, to be marked down
+    if the call fails """
+    _ROUTE.replica = replica
+
+
+class Replica(object):
+    def __init__(self, connection_str, engine):
+        self.connection_str = connection_str
+        self.engine = engine
+        self.down_until = 0
+
+    @property
+    def up(self):
+        return self.down_until <= time.time()
+
+    def mark_down(self, error):
+        logger.warning("Read replica %s is unavailable, using the others "
+                       "for %ss: %s" % (self.connection_str, RETRY_INTERVAL,
+                                        error))
+        self.down_until = time.time() + RETRY_INTERVAL
+
+
+class ReplicaSet(object):
+    """ The read replicas, handed out in turn """
+    def __init__(self, replicas):
+        self.replicas = list(replicas)
+        self._next = itertools.cycle(range(len(self.replicas)))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.replicas)
+
+    def candidates(self):
+        """ Returns the replicas that are up, starting with the next one """
+        if not self.replicas:
+            return []
+        with self._lock:
+            start = self._next.next()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.up]
+
+    def dispose(self):
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+
+class ReadRoutingAPI(object):
+    """ Proxies a backend API, routing its read methods to replicas
+
+    Only the outermost backend call decides; the calls it makes itself, such
+    as uid_to_id() lookups, follow it.
+    """
+    def __init__(self, api):
+        self._api = api
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+        route = 'read' if is_read_method(name) else 'primary'
+
+        def call(*args, **kwargs):
+            if getattr(_ROUTE, 'state', None) is not None:
+                return attr(*args, **kwargs)
+            _ROUTE.state = route
+            try:
+                result = self._call_replicas(attr, args, kwargs)
+                if route == 'read' and result is None:
+                    # perhaps not replicated yet
+                    _ROUTE.state = 'primary'
+                    result = attr(*args, **kwargs)
+                elif route == 'read' and name == 'get_many':
+                    _ROUTE.state = 'primary'
+                    result = _get_missing(attr, args, kwargs, result)
+                return result
+            finally:
+                _ROUTE.state = None
+                _ROUTE.replica = None
+        call.__name__ = name
+        return call
+
+    @staticmethod
+    def _call_replicas(attr, args, kwargs):
+        """ Makes a call, trying the next replica or the primary when the
+        replica it was sent to fails """
+        while True:
+            _ROUTE.replica = None
+            try:
+                return attr(*args, **kwargs)
+            except exc.DBAPIError, e:
+                replica = _ROUTE.replica
+                if _ROUTE.state != 'read' or replica is None:
+                    raise
+                # perhaps a stale pooled connection; the replica is no
+                # longer a candidate, so this ends on the primary
+                replica.mark_down(e)
+
+
+def _get_missing(get_many, args, kwargs, found):
+    """ Adds to what get_many() found on a replica the rows it missed, as
+    found on the primary """
+    args = list(args)
+    ids = args.pop(0) if args else kwargs.pop('ids')
+    found_ids = set(ref.id for ref in found)
+    missing = [id for id in set(ids) if id not in found_ids]
+    if not missing:
+        return found
+    return list(found) + [ref for ref in get_many(missing, *args, **kwargs)
+                          if ref.id not in found_ids]
@@ -0,0 +1,69 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2011 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+""" Runs sqlalchemy backend calls in native threads
+
+The DB-API drivers (MySQLdb, psycopg2) are C extensions that eventlet cannot
+monkey patch, so every query blocks all the greenthreads in the process. In
+the "threadpool" execution mode each backend API is wrapped in a
+ThreadPoolAPI, which hands its method calls to eventlet's pool of native
+threads and lets the hub serve other requests until the query returns.
+"""
+
+import logging
+
+from eventlet import tpool
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+INLINE = 'inline'
+THREADPOOL = 'threadpool'
+EXECUTION_MODES = (INLINE, THREADPOOL)
+DEFAULT_POOL_SIZE = 10
+
+
+def configure(size):
+    """ Sets the number of native threads running backend calls
+
+    Only effective before the first call is made; eventlet starts its
+    threads once and keeps them for the life of the process.
+    """
+    # pylint: disable=W0212
+    if tpool._setup_already and tpool._nthreads != size:
+        logger.warning("Thread pool already started with %s threads" %
+                       tpool._nthreads)
+    tpool.set_num_threads(size)
+
+
+class ThreadPoolAPI(object):
+    """ Proxies a backend API, running its methods in a native thread
+
+    Calls made from within a pool thread, such as one backend API looking up
+    another, run directly in that thread.
+    """
+    def __init__(self, api):
+        self._api = api
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return tpool.execute(attr, *args, **kwargs)
+        call.__name__ = name
+        return call
@@ -17,7 +17,8 @@
 Monkey Patch httplib.HTTPResponse to buffer reads of headers. This can improve
 performance when making large numbers of small HTTP requests.  This module
 also provides helper functions to make HTTP connections using
-BufferedHTTPResponse.
+BufferedHTTPResponse, and HTTPConnectionPool to reuse those connections
+across requests.
 
 .. warning::
 
@@ -26,15 +27,23 @@ BufferedHTTPResponse.
     make all calls through httplib.
 """
 
+from collections import deque
+import errno
 from urllib import quote
 import logging
+import socket
 import time
 
+from eventlet import semaphore
 # pylint: disable=E0611
-from eventlet.green.httplib import CONTINUE, HTTPConnection, HTTPMessage, \
-    HTTPResponse, HTTPSConnection, _UNKNOWN
+from eventlet.green.httplib import BadStatusLine, CONTINUE, HTTPConnection, \
+    HTTPMessage, HTTPResponse, HTTPSConnection, _UNKNOWN
 
 DEFAULT_TIMEOUT = 30
+# Connection pool defaults: connections per host, and seconds a connection
+# may sit idle before it is considered stale and discarded
+DEFAULT_POOL_SIZE = 10
+DEFAULT_IDLE_TIMEOUT = 60
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -93,6 +102,8 @@ class BufferedHTTPConnection(HTTPConnection):
     def putrequest(self, method, url, skip_host=0, skip_accept_encoding=0):
         self._method = method
         self._path = url
+        # a pooled connection is reused, so time from the request instead
+        self._connected_time = time.time()
         return HTTPConnection.putrequest(self, method, url, skip_host,
                                          skip_accept_encoding)
 
@@ -161,14 +172,8 @@ def http_connect_raw(ipaddr, port, method, path, headers=None,
     :param cert_file: Certificate file (Keystore)
     :returns: HTTPConnection object
     """
-    if timeout is None:
-        timeout = DEFAULT_TIMEOUT
-    if ssl:
-        conn = HTTPSConnection('%s:%s' % (ipaddr, port), key_file=key_file,
-                               cert_file=cert_file, timeout=timeout)
-    else:
-        conn = BufferedHTTPConnection('%s:%s' % (ipaddr, port),
-                                      timeout=timeout)
+    conn = _new_connection(ipaddr, port, ssl=ssl, key_file=key_file,
+                           cert_file=cert_file, timeout=timeout)
     if query_string:
         path += '?' + query_string
     conn.path = path
@@ -180,3 +185,156 @@ def http_connect_raw(ipaddr, port, method, path, headers=None,
     # pylint: disable=E1103
     conn.endheaders()
     return conn
+
+
+def _new_connection(ipaddr, port, ssl=False, key_file=None, cert_file=None,
+                    timeout=None):
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    if ssl:
+        return HTTPSConnection('%s:%s' % (ipaddr, port), key_file=key_file,
+                               cert_file=cert_file, timeout=timeout)
+    return BufferedHTTPConnection('%s:%s' % (ipaddr, port), timeout=timeout)
+
+
+class PooledResponse(object):
+    """A fully read response from :class:`HTTPConnectionPool`
+
+    Mirrors the parts of HTTPResponse callers use; the body has already been
+    read so the connection could go back to the pool.
+    """
+
+    def __init__(self, response, body):
+        self.status = response.status
+        self.reason = response.reason
+        self.version = response.version
+        self.msg = response.msg
+        self._body = body
+
+    def read(self):
+        return self._body
+
+    def getheader(self, name, default=None):
+        return self.msg.getheader(name, default)
+
+    def getheaders(self):
+        return self.msg.items()
+
+
+class _ConnectionDropped(Exception):
+    """A reused connection was found closed before the response started"""
+
+    def __init__(self, error):
+        super(_ConnectionDropped, self).__init__(str(error))
+        self.error = error
+
+
+def _dropped_before_response(exc):
+    """Whether an error sending a request, or waiting for its status line,
+    shows that the server had closed the connection"""
+    if isinstance(exc, BadStatusLine):
+        # the connection closed without a status line
+        return True
+    return (isinstance(exc, socket.error) and
+            not isinstance(exc, socket.timeout) and
+            exc.errno in (errno.ECONNRESET, errno.EPIPE))
+
+
+class _HostPool(object):
+    """Idle connections to one host, and a limit on connections in use"""
+
+    def __init__(self, max_size):
+        self.idle = deque()  # (connection, time it was returned)
+        self.limit = semaphore.Semaphore(max_size)
+
+
+class HTTPConnectionPool(object):
+    """Keeps HTTP(S) connections open between requests
+
+    Connections are pooled per host, port and SSL settings, so repeated calls
+    to the same server skip the TCP (and TLS) handshake. At most `max_size`
+    requests run against one host at a time; further callers wait. Idle
+    connections older than `idle_timeout` seconds are closed rather than
+    reused. A request on a reused connection that the server turns out to
+    have dropped before answering is retried once on a new connection; other
+    errors, timeouts included, are not, as the server may have acted on the
+    request.
+    """
+
+    def __init__(self, max_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.max_size = int(max_size)
+        self.idle_timeout = float(idle_timeout)
+        self._hosts = {}
+
+    def _host_pool(self, key):
+        host_pool = self._hosts.get(key)
+        if host_pool is None:
+            host_pool = self._hosts.setdefault(key, _HostPool(self.max_size))
+        return host_pool
+
+    def _get_idle(self, host_pool):
+        """Returns a reusable idle connection, or None"""
+        while host_pool.idle:
+            conn, returned = host_pool.idle.pop()
+            if time.time() - returned < self.idle_timeout:
+                return conn
+            conn.close()
+        return None
+
+    # pylint: disable=R0913
+    def request(self, ipaddr, port, method, path, body=None, headers=None,
+                query_string=None, ssl=False, key_file=None, cert_file=None,
+                timeout=None):
+        """Makes an HTTP request over a pooled connection
+
+        Takes the same connection arguments as :func:`http_connect_raw`.
+
+        :param body: request body, if any
+        :returns: a :class:`PooledResponse`, with the body already read
+        """
+        if query_string:
+            path += '?' + query_string
+        key = (ipaddr, port, ssl, key_file, cert_file, timeout)
+        host_pool = self._host_pool(key)
+        with host_pool.limit:
+            conn = self._get_idle(host_pool)
+            if conn is not None:
+                try:
+                    return self._send(host_pool, conn, method, path, body,
+                                      headers, reused=True)
+                except _ConnectionDropped as exc:
+                    logger.debug("Retrying %s %s on a new connection after "
+                                 "the server dropped a reused one: %s" % (
+                                     method, path, exc.error))
+            conn = _new_connection(ipaddr, port, ssl=ssl, key_file=key_file,
+                                   cert_file=cert_file, timeout=timeout)
+            return self._send(host_pool, conn, method, path, body, headers)
+
+    # pylint: disable=R0913
+    @staticmethod
+    def _send(host_pool, conn, method, path, body, headers, reused=False):
+        try:
+            try:
+                conn.request(method, path, body, headers or {})
+                response = conn.getresponse()
+            except (socket.error, BadStatusLine) as exc:
+                if reused and _dropped_before_response(exc):
+                    raise _ConnectionDropped(exc)
+                raise
+            data = response.read()
+        except:  # pylint: disable=W0702
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            host_pool.idle.append((conn, time.time()))
+        return PooledResponse(response, data)
+
+    def close_all(self):
+        """Closes all idle connections"""
+        for host_pool in self._hosts.values():
+            while host_pool.idle:
+                conn, _returned = host_pool.idle.pop()
+                conn.close()
@@ -88,6 +88,11 @@ for a config file.""")
                      default=None, dest="bind_host",
                      help="specifies host address to listen on "\
                             "(default is all or 0.0.0.0)")
+    group.add_option('--workers', default=None, dest="workers",
+                     metavar="N",
+                     help="Number of worker processes to fork, sharing the "
+                          "listening sockets (default is 0: serve from a "
+                          "single process)")
     # This one is handled by keystone/tools/tracer.py (if loaded)
     group.add_option('-t', '--trace-calls', default=False,
                      dest="trace_calls",
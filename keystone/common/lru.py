@@ -0,0 +1,134 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Building blocks of the in-process LRU caches.
+
+collections.OrderedDict only arrived in Python 2.7, and Keystone still runs
+on 2.6. LRUDict keeps the part of it the caches use: keys in the order they
+were last set, with O(1) moves and evictions. TTLCache adds a size limit,
+expiry and locking on top.
+"""
+
+import threading
+import time
+
+_MISSING = object()
+
+# indexes into a link: [previous link, next link, key, value]
+_PREV, _NEXT, _KEY, _VALUE = range(4)
+
+
+class LRUDict(object):
+    """Map remembering the order keys were last set in, oldest first"""
+
+    def __init__(self):
+        self._links = {}
+        self._root = []
+        self.clear()
+
+    def __len__(self):
+        return len(self._links)
+
+    def __contains__(self, key):
+        return key in self._links
+
+    def __setitem__(self, key, value):
+        """Sets the value of a key, making it the newest"""
+        if key in self._links:
+            self._unlink(self._links[key])
+        root = self._root
+        last = root[_PREV]
+        link = [last, root, key, value]
+        last[_NEXT] = root[_PREV] = self._links[key] = link
+
+    def pop(self, key, default=_MISSING):
+        link = self._links.pop(key, None)
+        if link is None:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        self._unlink(link)
+        return link[_VALUE]
+
+    def pop_oldest(self):
+        """Removes and returns the (key, value) of the oldest key"""
+        if not self._links:
+            raise KeyError('LRUDict is empty')
+        link = self._root[_NEXT]
+        del self._links[link[_KEY]]
+        self._unlink(link)
+        return link[_KEY], link[_VALUE]
+
+    def clear(self):
+        self._links.clear()
+        # a fresh root, so old links are not kept alive through it
+        root = self._root = []
+        root[:] = [root, root, None, None]
+
+    @staticmethod
+    def _unlink(link):
+        link[_PREV][_NEXT] = link[_NEXT]
+        link[_NEXT][_PREV] = link[_PREV]
+
+
+class TTLCache(object):
+    """Bounded map whose entries expire ``ttl`` seconds after being set
+
+    Least recently used entries are discarded once ``max_size`` is reached.
+    A ``ttl`` or ``max_size`` of 0 disables the cache.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = LRUDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached value, or None"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] <= time.time():
+                return None
+            self._entries[key] = entry
+            return entry[1]
+
+    def put(self, key, value):
+        if not self.ttl or not self.max_size:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            while len(self._entries) > self.max_size:
+                self._entries.pop_oldest()
+
+    def evict(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def configure(self, ttl=None, max_size=None):
+        """Empties the cache, applying a new TTL and size limit if given"""
+        if ttl is not None:
+            self.ttl = float(ttl)
+        if max_size is not None:
+            self.max_size = int(max_size)
+        self.clear()
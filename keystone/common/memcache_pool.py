@@ -0,0 +1,150 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pooled memcache clients for use in long-running WSGI processes.
+
+A python-memcached ``Client`` owns one socket per server, so it must not be
+shared by greenthreads that may interleave on the same socket. Building a new
+client per request avoids that, but costs a fresh TCP connection to memcached
+on every call. :class:`MemcacheClientPool` keeps a bounded set of clients
+whose connections are reused, and hands each cache operation a client of its
+own.
+
+Keys are spread over several servers with a consistent hash ring, so adding or
+removing a server only moves the keys that belonged to it. A server that fails
+is marked dead for ``dead_retry`` seconds and its keys go to the next server on
+the ring until then.
+
+This module requires python-memcached; import it only when memcache caching is
+configured.
+"""
+
+import bisect
+import hashlib
+import logging
+
+from eventlet import pools
+import memcache
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_DEAD_RETRY = 30
+DEFAULT_SOCKET_TIMEOUT = 3
+# Points each server gets on the hash ring (multiplied by its weight)
+RING_REPLICAS = 100
+
+
+def _hash(value):
+    return int(hashlib.md5(value).hexdigest()[:8], 16)
+
+
+def parse_hosts(hosts):
+    """Splits a comma-separated host list (or passes a list through)"""
+    if isinstance(hosts, basestring):
+        hosts = hosts.split(',')
+    return [host.strip() for host in hosts if host and host.strip()]
+
+
+class ConsistentHashClient(memcache.Client):
+    """memcache.Client that picks servers from a consistent hash ring"""
+
+    def __init__(self, *args, **kwargs):
+        self._ring = []
+        self._ring_servers = []
+        super(ConsistentHashClient, self).__init__(*args, **kwargs)
+
+    def set_servers(self, servers):
+        super(ConsistentHashClient, self).set_servers(servers)
+        points = []
+        for server in self.servers:
+            if isinstance(server.address, tuple):
+                name = '%s:%s' % server.address
+            else:
+                name = server.address
+            for i in range(RING_REPLICAS * server.weight):
+                points.append((_hash('%s-%d' % (name, i)), server))
+        points.sort(key=lambda point: point[0])
+        self._ring = [point[0] for point in points]
+        self._ring_servers = [point[1] for point in points]
+
+    def _get_server(self, key):
+        if isinstance(key, tuple):
+            serverhash, key = key
+        else:
+            serverhash = _hash(key)
+
+        if not self._ring:
+            return None, None
+
+        # walk clockwise from the key's point, trying each distinct server
+        # once; dead servers refuse to connect until their retry time
+        start = bisect.bisect(self._ring, serverhash)
+        tried = set()
+        for i in range(len(self._ring)):
+            server = self._ring_servers[(start + i) % len(self._ring)]
+            if server in tried:
+                continue
+            tried.add(server)
+            if server.connect():
+                return server, key
+            if len(tried) == len(self.servers):
+                break
+        return None, None
+
+
+class MemcacheClientPool(object):
+    """Shares a bounded set of memcache clients between greenthreads
+
+    Exposes the subset of the memcache.Client interface used for token
+    caching (get, set, delete); each call borrows a client for its duration,
+    waiting if all ``pool_size`` clients are in use.
+    """
+
+    def __init__(self, hosts, pool_size=DEFAULT_POOL_SIZE,
+                 dead_retry=DEFAULT_DEAD_RETRY,
+                 socket_timeout=DEFAULT_SOCKET_TIMEOUT):
+        self.hosts = parse_hosts(hosts)
+        if not self.hosts:
+            raise ValueError("At least one memcache host is required")
+        self.dead_retry = int(dead_retry)
+        self.socket_timeout = float(socket_timeout)
+        self._pool = pools.Pool(max_size=int(pool_size),
+                                order_as_stack=True,
+                                create=self._create_client)
+        logger.debug("Memcache pool of %s clients for %s" % (pool_size,
+                                                             self.hosts))
+
+    def _create_client(self):
+        return ConsistentHashClient(self.hosts, dead_retry=self.dead_retry,
+                                    socket_timeout=self.socket_timeout)
+
+    def get(self, key):
+        with self._pool.item() as client:
+            return client.get(key)
+
+    def set(self, key, val, time=0):
+        with self._pool.item() as client:
+            return client.set(key, val, time=time)
+
+    def delete(self, key, time=0):
+        with self._pool.item() as client:
+            return client.delete(key, time=time)
+
+    def disconnect_all(self):
+        """Closes the connections of all idle clients"""
+        for client in self._pool.free_items:
+            client.disconnect_all()
@@ -0,0 +1,198 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Self-validating signed tokens.
+
+A signed token carries the claims a service needs (user, tenant, role names
+and expiry) together with the id of the token Keystone stored, and an
+HMAC-SHA256 over them::
+
+    S1.<key id>.<base64url claims>.<base64url mac>
+
+Anyone holding the shared key can check such a token without asking
+Keystone. Keys live in a file of ``<key id> <secret>`` lines; the first key
+signs, and every key listed verifies, so a key is rotated by putting the new
+one first and dropping the old one once the tokens it signed have expired.
+
+Only the standard library is used, so that auth_token can verify tokens in
+any service that deploys it.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+PREFIX = 'S1'
+# Seconds between checks of the key file for changes
+RELOAD_INTERVAL = 10
+
+
+class InvalidToken(Exception):
+    """ The token is malformed, or was not signed by any known key """
+    pass
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip('=')
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(str(data) + '=' * (-len(data) % 4))
+
+
+def _mac(secret, message):
+    return hmac.new(secret, message, hashlib.sha256).digest()
+
+
+def _equal(a, b):
+    """ Compares two MACs in constant time """
+    if len(a) != len(b):
+        return False
+    result = 0
+    for x, y in zip(a, b):
+        result |= ord(x) ^ ord(y)
+    return result == 0
+
+
+def is_signed(token):
+    return bool(token) and token.startswith(PREFIX + '.')
+
+
+class KeyRing(object):
+    """ Ordered (key id, secret) pairs; the first one signs """
+    def __init__(self, keys=None):
+        self.keys = list(keys or [])
+
+    def signing_key(self):
+        if not self.keys:
+            raise InvalidToken("No signing key configured")
+        return self.keys[0]
+
+    def secret(self, key_id):
+        for kid, secret in self.keys:
+            if kid == key_id:
+                return secret
+        return None
+
+
+class KeyFile(KeyRing):
+    """ A KeyRing read from a file, and read again when the file changes
+
+    Blank lines and lines starting with ``#`` are ignored.
+    """
+    def __init__(self, path, reload_interval=RELOAD_INTERVAL):
+        super(KeyFile, self).__init__()
+        self.path = path
+        self.reload_interval = reload_interval
+        self._mtime = None
+        self._checked = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime
+        keys = []
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                fields = line.split(None, 1)
+                if len(fields) != 2:
+                    raise ValueError("Malformed line in key file %s"
+                                     % self.path)
+                keys.append((fields[0], fields[1].strip()))
+        self.keys = keys
+        self._mtime = mtime
+        logger.debug("Loaded %d signing keys from %s" % (len(keys),
+                                                           self.path))
+
+    def refresh(self):
+        """ Reads the file again if it changed since it was last read """
+        now = time.time()
+        if now - self._checked < self.reload_interval:
+            return
+        with self._lock:
+            self._checked = now
+            try:
+                if os.stat(self.path).st_mtime != self._mtime:
+                    self._load()
+            except (EnvironmentError, ValueError) as exc:
+                # keep the keys we have rather than rejecting every token
+                logger.error("Could not reload signing keys from %s: %s"
+                             % (self.path, exc))
+
+    def signing_key(self):
+        self.refresh()
+        return super(KeyFile, self).signing_key()
+
+    def secret(self, key_id):
+        self.refresh()
+        return super(KeyFile, self).secret(key_id)
+
+
+def sign(keyring, claims):
+    """ Returns a signed token carrying the claims (a JSON-able dict) """
+    key_id, secret = keyring.signing_key()
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')))
+    message = '%s.%s.%s' % (PREFIX, key_id, payload)
+    return '%s.%s' % (message, _b64encode(_mac(secret, message)))
+
+
+def unverified_id(token):
+    """ Returns the stored token id a signed token claims to carry, without
+    checking its signature, or None if it is malformed
+
+    Only fit for decisions that reject tokens, such as revocation checks.
+    """
+    try:
+        payload = str(token).split('.')[2]
+        return json.loads(_b64decode(payload))['id']
+    except (IndexError, KeyError, TypeError, ValueError, UnicodeError):
+        return None
+
+
+def verify(keyring, token):
+    """ Returns the claims of a signed token
+
+    :raises: InvalidToken if the token is malformed or its signature does
+             not match a key of the keyring. Expiry is left to the caller.
+    """
+    try:
+        message, mac = str(token).rsplit('.', 1)
+        prefix, key_id, payload = message.split('.')
+    except (ValueError, UnicodeError):
+        raise InvalidToken("Malformed signed token")
+    if prefix != PREFIX:
+        raise InvalidToken("Not a signed token")
+    secret = keyring.secret(key_id)
+    if secret is None:
+        raise InvalidToken("Token signed with unknown key %s" % key_id)
+    try:
+        valid = _equal(_b64decode(mac), _mac(secret, message))
+        claims = valid and json.loads(_b64decode(payload))
+    except (TypeError, ValueError):
+        raise InvalidToken("Malformed signed token")
+    if not valid:
+        raise InvalidToken("Token signature does not match")
+    return claims
@@ -101,14 +101,17 @@ class Server(object):
         self.threads = {}
 
     def start(self, application=None, port=None, host='0.0.0.0', key=None,
-            backlog=128):
-        """Run a WSGI server with the given application."""
+            backlog=128, sock=None):
+        """Run a WSGI server with the given application.
+
+        Listens on `sock` if given, such as a socket bound before forking.
+        """
         if application is not None:
             self.application = application
         if port is not None:
             self.port = port
         LOG.debug("start server '%s' on %s:%s" % (key, host, self.port))
-        socket = eventlet.listen((host, self.port), backlog=backlog)
+        socket = sock or eventlet.listen((host, self.port), backlog=backlog)
         thread = self.pool.spawn(self._run, self.application, socket)
         if key:
             self.socket_info[key] = socket
@@ -134,10 +137,10 @@ class SslServer(Server):
     # pylint: disable=W0221,R0913
     def start(self, application, port, host='0.0.0.0', backlog=128,
               certfile=None, keyfile=None, ca_certs=None,
-              cert_required='True', key=None):
+              cert_required='True', key=None, sock=None):
         """Run a 2-way SSL WSGI server with the given application."""
         LOG.debug("start SSL server '%s' on %s:%s" % (key, host, port))
-        socket = eventlet.listen((host, port), backlog=backlog)
+        socket = sock or eventlet.listen((host, port), backlog=backlog)
         if cert_required == 'True':
             cert_reqs = ssl.CERT_REQUIRED
         else:
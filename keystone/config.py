@@ -112,7 +112,7 @@ def register_str(*args, **kw):
 
 def register_cli_str(*args, **kw):
     group = _ensure_group(kw)
-    return CONF.register_opt(cfg.StrOpt(*args, **kw), group=group)
+    return CONF.register_cli_opt(cfg.StrOpt(*args, **kw), group=group)
 
 
 def register_bool(*args, **kw):
@@ -162,15 +162,44 @@ register_bool("cert_required")
 register_str("keystone_admin_role")
 register_str("keystone_service_admin_role")
 register_bool("hash_password")
+register_str("password_hash_executor")
+register_str("password_hash_workers")
+register_str("password_hash_queue_size")
 register_str("backends")
 register_str("global_service_id")
+register_str("catalog_cache_ttl")
+register_str("catalog_cache_size")
+register_str("admin_decision_cache_ttl")
+register_str("admin_decision_cache_size")
 register_bool("disable_tokens_in_url")
+register_str("token_purge_interval")
+register_str("token_purge_batch_size")
+register_str("token_purge_batch_pause")
+register_str("token_signing_key_file")
+register_str("token_filter_capacity")
+register_str("token_filter_error_rate")
+register_str("token_filter_sync_interval")
+register_str("token_filter_rebuild_interval")
+register_str("token_validation_batch_limit")
+register_cli_str("workers")
 
 register_str("sql_connection", group="keystone.backends.sqlalchemy")
 register_str("backend_entities", group="keystone.backends.sqlalchemy")
 register_str("sql_idle_timeout", group="keystone.backends.sqlalchemy")
+register_str("identity_cache_size", group="keystone.backends.sqlalchemy")
+register_str("sql_execution_mode", group="keystone.backends.sqlalchemy")
+register_str("sql_thread_pool_size", group="keystone.backends.sqlalchemy")
+register_str("sql_read_connections", group="keystone.backends.sqlalchemy")
+register_str("sql_pool_size", group="keystone.backends.sqlalchemy")
+register_str("sql_max_overflow", group="keystone.backends.sqlalchemy")
+register_str("sql_pool_timeout", group="keystone.backends.sqlalchemy")
 # May need to initialize other backends, too.
 register_str("ldap_url", group="keystone.backends.ldap")
 register_str("ldap_user", group="keystone.backends.ldap")
 register_str("ldap_password", group="keystone.backends.ldap")
+register_str("ldap_timeout", group="keystone.backends.ldap")
+register_str("ldap_pool_size", group="keystone.backends.ldap")
+register_str("ldap_pool_check_interval", group="keystone.backends.ldap")
+register_str("ldap_pool_connection_lifetime", group="keystone.backends.ldap")
+register_str("ldap_page_size", group="keystone.backends.ldap")
 register_list("backend_entities", group="kkeystone.backends.ldap")
@@ -30,6 +30,16 @@ class ExtensionHandler(BaseExtensionHandler):
                        action="handle_validate_request",
                        conditions=dict(method=["GET"]))
 
+        mapper.connect("/OS-KSVALIDATE/token/validate",
+                       controller=extension_controller,
+                       action="handle_check_request",
+                       conditions=dict(method=["HEAD"]))
+
+        mapper.connect("/OS-KSVALIDATE/tokens/validate",
+                       controller=extension_controller,
+                       action="handle_batch_validate_request",
+                       conditions=dict(method=["POST"]))
+
         mapper.connect("/OS-KSVALIDATE/token/endpoints",
                        controller=extension_controller,
                        action="handle_endpoints_request",
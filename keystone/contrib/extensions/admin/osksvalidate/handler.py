@@ -41,6 +41,13 @@ class SecureValidationController(wsgi.Controller):
         token_id = req.headers.get("X-Subject-Token")
         return self.token_controller.validate_token(req=req, token_id=token_id)
 
+    def handle_check_request(self, req):
+        token_id = req.headers.get("X-Subject-Token")
+        return self.token_controller.check_token(req=req, token_id=token_id)
+
+    def handle_batch_validate_request(self, req):
+        return self.token_controller.validate_tokens(req=req)
+
     def handle_endpoints_request(self, req):
         token_id = req.headers.get("X-Subject-Token")
         return self.token_controller.endpoints(req=req, token_id=token_id)
@@ -33,7 +33,7 @@ logger = logging.getLogger(__name__)  # pylint: disable=C0103
 class CredentialsController(BaseController):
     """Controller for Credentials related operations"""
     def __init__(self):
-        self.identity_service = service.IdentityService()
+        self.identity_service = service.get_identity_service()
 
     @utils.wrap_error
     def get_credentials(self, req, user_id):
@@ -34,7 +34,7 @@ class EndpointTemplatesController(BaseController):
     """Controller for EndpointTemplates related operations"""
 
     def __init__(self):
-        self.identity_service = service.IdentityService()
+        self.identity_service = service.get_identity_service()
 
     @utils.wrap_error
     def get_endpoint_templates(self, req):
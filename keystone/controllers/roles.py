@@ -34,7 +34,7 @@ class RolesController(BaseController):
     """Controller for Role related operations"""
 
     def __init__(self):
-        self.identity_service = service.IdentityService()
+        self.identity_service = service.get_identity_service()
 
     # Not exposed yet.
     @utils.wrap_error
@@ -34,7 +34,7 @@ class TenantController(BaseController):
     """Controller for Tenant related operations"""
 
     def __init__(self, is_service_operation=None):
-        self.identity_service = service.IdentityService()
+        self.identity_service = service.get_identity_service()
         self.is_service_operation = is_service_operation
         logger.debug("Initializing: 'Service API' mode=%s" %
                      self.is_service_operation)
@@ -41,7 +41,7 @@ class TokenController(BaseController):
     """Controller for token related operations"""
 
     def __init__(self):
-        self.identity_service = service.IdentityService()
+        self.identity_service = service.get_identity_service()
         logger.debug("Token controller init with HP-IDM extension: %s" % \
                 extension_reader.is_extension_supported('hpidm'))
 
@@ -117,9 +117,26 @@ class TokenController(BaseController):
         if CONF.disable_tokens_in_url:
             fault.ServiceUnavailableFault()
         else:
-            self._validate_token(req, token_id)
+            self._check_token(req, token_id)
             return utils.send_result(200, req)
 
+    def _check_token(self, req, token_id):
+        """Checks the token without building the validation response"""
+        if extension_reader.is_extension_supported('hpidm') and \
+                req.GET.get('HP-IDM-serviceId'):
+            # the token must hold roles on those services
+            return self._validate_token(req, token_id)
+        return self.identity_service.check_token(utils.get_auth_token(req),
+                token_id, req.GET.get('belongsTo'))
+
+    @utils.wrap_error
+    def validate_tokens(self, req):
+        """Validates the tokens listed in the request body"""
+        batch = utils.get_normalized_request_content(auth.ValidateTokens, req)
+        return utils.send_result(200, req,
+                self.identity_service.validate_tokens(
+                        utils.get_auth_token(req), batch.checks))
+
     @utils.wrap_error
     def delete_token(self, req, token_id):
         if CONF.disable_tokens_in_url:
@@ -129,6 +146,14 @@ class TokenController(BaseController):
                     self.identity_service.revoke_token(
                             utils.get_auth_token(req), token_id))
 
+    @utils.wrap_error
+    def get_revoked_tokens(self, req):
+        """Lists the tokens revoked since the given marker"""
+        return utils.send_result(200, req,
+                self.identity_service.get_revoked_tokens(
+                        utils.get_auth_token(req), req.GET.get('marker'),
+                        req.GET.get('limit', 1000)))
+
     @utils.wrap_error
     def endpoints(self, req, token_id):
         if CONF.disable_tokens_in_url:
@@ -34,7 +34,7 @@ class UserController(BaseController):
     """Controller for User related operations"""
 
     def __init__(self):
-        self.identity_service = service.IdentityService()
+        self.identity_service = service.get_identity_service()
 
     @utils.wrap_error
     def create_user(self, req):
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Request-scoped backend session middleware.
+
+Serving one request takes dozens of backend calls, and each one used to
+check a connection out of the pool and back in. This filter serves each
+request within backends.request_scope(), so that the sqlalchemy backend
+runs all of them on one connection, returned to the pool once the response
+has been produced.
+
+"""
+
+import logging
+
+from keystone import backends
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+PROTOCOL_NAME = "Request Session"
+
+
+class RequestSessionFilter(object):
+    """Middleware filter serving each request within one backend scope"""
+
+    def __init__(self, app, conf):
+        msg = "Starting the %s component" % PROTOCOL_NAME
+        logger.info(msg)
+        self.app = app
+        self.conf = conf
+
+    def __call__(self, env, start_response):
+        with backends.request_scope():
+            # produce the whole body while the session is still open
+            app_iter = self.app(env, start_response)
+            try:
+                return list(app_iter)
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+
+
+def filter_factory(global_conf, **local_conf):
+    """Returns a WSGI filter app for use with paste.deploy."""
+    conf = global_conf.copy()
+    conf.update(local_conf)
+
+    def ext_filter(app):
+        return RequestSessionFilter(app, conf)
+    return ext_filter
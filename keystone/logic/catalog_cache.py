@@ -0,0 +1,63 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2011 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+""" In-process cache of rendered service catalogs
+
+Rendering the service catalog of an auth response takes the tenant's
+endpoints (a UNION query), a service lookup per service, and the
+``%tenant_id%`` substitution on every URL. The result only depends on the
+tenant, the URL types shown and the format, so the rendered fragment is
+cached under that key and spliced into later responses.
+
+The managers creating, updating or deleting services, endpoint templates
+and endpoints clear the cache. Changes made through another keystone
+process are only seen once the entries expire, after ``ttl`` seconds.
+"""
+
+import logging
+
+from keystone.common import lru
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_SIZE = 10000
+
+
+class CatalogCache(lru.TTLCache):
+    """ Maps (tenant, url_types, format) to a rendered catalog """
+    def __init__(self, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE):
+        super(CatalogCache, self).__init__(ttl, max_size)
+
+    @staticmethod
+    def key(tenant_id, url_types, fmt):
+        return (tenant_id and str(tenant_id), tuple(url_types), fmt)
+
+
+CATALOGS = CatalogCache()
+
+
+def configure(ttl=None, max_size=None):
+    """ Empties the cache, applying a new TTL and size limit if given """
+    CATALOGS.configure(ttl, max_size)
+    logger.debug("Catalog cache configured (ttl=%s, max_size=%s)" %
+                 (CATALOGS.ttl, CATALOGS.max_size))
+
+
+def invalidate():
+    """ Drops all cached catalogs, after a catalog change """
+    CATALOGS.clear()
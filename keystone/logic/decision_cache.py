@@ -0,0 +1,81 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2011 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+""" In-process cache of admin authorization decisions
+
+Every admin API call validates the caller's token (token, user and tenant
+lookups) and scans the user's global grants for the admin and service admin
+roles. Callers such as orchestration tools make many calls with the same
+token, so the outcome is cached by token id.
+
+The managers changing tokens, users, tenants, roles or grants clear the
+cache. Another keystone process does not clear it, so a decision may hold
+for up to ``ttl`` seconds after such a change there, though never past the
+expiry of its token.
+"""
+
+from datetime import datetime
+import logging
+
+from keystone.common import lru
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+DEFAULT_TTL = 30
+DEFAULT_MAX_SIZE = 10000
+
+
+class Decision(object):
+    """ The outcome of validating a token for admin calls """
+    def __init__(self, token, user, is_admin, is_service_admin):
+        self.token = token
+        self.user = user
+        self.is_admin = is_admin
+        self.is_service_admin = is_service_admin
+
+
+class DecisionCache(lru.TTLCache):
+    """ Maps token ids to the Decision made for them, until the token
+    expires """
+    def __init__(self, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE):
+        super(DecisionCache, self).__init__(ttl, max_size)
+
+    def get(self, token_id):
+        """ Returns the cached Decision, or None """
+        decision = super(DecisionCache, self).get(token_id)
+        if decision is not None and decision.token.expires < datetime.now():
+            self.evict(token_id)
+            return None
+        return decision
+
+
+DECISIONS = DecisionCache()
+
+
+def configure(ttl=None, max_size=None):
+    """ Empties the cache, applying a new TTL and size limit if given """
+    DECISIONS.configure(ttl, max_size)
+    logger.debug("Decision cache configured (ttl=%s, max_size=%s)" %
+                 (DECISIONS.ttl, DECISIONS.max_size))
+
+
+def invalidate(token_id=None):
+    """ Drops the decision for a token, or all of them if none is given """
+    if token_id is None:
+        DECISIONS.clear()
+    else:
+        DECISIONS.evict(token_id)
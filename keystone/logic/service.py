@@ -18,9 +18,11 @@
 from datetime import datetime, timedelta
 import functools
 import logging
-import uuid
 
 from keystone import config
+from keystone.logic import catalog_cache
+from keystone.logic import decision_cache
+from keystone.logic import token_filter
 from keystone.logic.types import auth, atom
 from keystone.logic.signer import Signer
 import keystone.backends as backends
@@ -77,6 +79,23 @@ def service_admin_token_validator(fnc):
     return _wrapper
 
 
+_IDENTITY_SERVICE = None
+
+
+def get_identity_service():
+    """Returns the IdentityService shared by the whole process
+
+    It is created on first use, and again if the backends have been
+    reconfigured since.
+    """
+    global _IDENTITY_SERVICE
+    backends.configure_backends_once()
+    if (_IDENTITY_SERVICE is None or
+            _IDENTITY_SERVICE.generation != backends.GENERATION):
+        _IDENTITY_SERVICE = IdentityService()
+    return _IDENTITY_SERVICE
+
+
 # pylint: disable=R0902
 class IdentityService(object):
     """Implements the Identity service
@@ -88,9 +107,12 @@ class IdentityService(object):
     def __init__(self):
         """ Initialize
 
-        Loads all necessary backends to handle incoming requests.
+        Loads all necessary backends to handle incoming requests, unless
+        they are loaded already; see get_identity_service() for an instance
+        shared by the whole process.
         """
-        backends.configure_backends()
+        backends.configure_backends_once()
+        self.generation = backends.GENERATION
         self.token_manager = TokenManager()
         self.tenant_manager = TenantManager()
         self.user_manager = UserManager()
@@ -111,6 +133,16 @@ class IdentityService(object):
         global GLOBAL_SERVICE_ID
         GLOBAL_SERVICE_ID = CONF.global_service_id or "global"
 
+        catalog_cache.configure(CONF.catalog_cache_ttl,
+                                CONF.catalog_cache_size)
+        decision_cache.configure(CONF.admin_decision_cache_ttl,
+                                 CONF.admin_decision_cache_size)
+        token_filter.configure(CONF.token_filter_capacity,
+                               CONF.token_filter_error_rate,
+                               CONF.token_filter_sync_interval,
+                               CONF.token_filter_rebuild_interval,
+                               loader=self.token_manager.fetch_live_ids)
+
         LOG.debug("init with ADMIN_ROLE_NAME=%s, SERVICE_ADMIN_ROLE_NAME=%s, "
                   "GLOBAL_SERVICE_ID=%s" % (ADMIN_ROLE_NAME,
                                             SERVICE_ADMIN_ROLE_NAME,
@@ -244,7 +276,7 @@ class IdentityService(object):
                       "for the user")
             # Create new token
             dtoken = Token()
-            dtoken.id = str(uuid.uuid4())
+            dtoken.id = token_filter.new_token_id()
             dtoken.user_id = duser.id
             dtoken.tenant_id = tenant_id
             dtoken.expires = datetime.now() + timedelta(days=1)
@@ -267,6 +299,69 @@ class IdentityService(object):
                 raise fault.UnauthorizedFault("No roles found for scope token")
         return auth_data
 
+    # pylint: disable=W0613
+    @service_admin_token_validator
+    def check_token(self, admin_token, token_id, belongs_to=None):
+        """ Checks the token as validate_token does, without looking up its
+        roles or building a response; for HEAD requests """
+        self._validate_token(token_id, belongs_to, True)
+
+    # pylint: disable=W0613
+    @service_admin_token_validator
+    def validate_tokens(self, admin_token, checks):
+        """ Validates several tokens as validate_token would each, fetching
+        their tokens, users, tenants and roles a batch at a time
+
+        :param checks: list of (token id, belongs_to or None) pairs
+        :returns: auth.ValidateDataBatch of the ValidateData, or the fault
+                  validate_token would raise, for each token
+        """
+        limit = int(CONF.token_validation_batch_limit or 100)
+        if len(checks) > limit:
+            raise fault.BadRequestFault(
+                "Cannot validate more than %s tokens at once" % limit)
+
+        dtokens = self.token_manager.get_many(
+            [token_id for token_id, _belongs_to in checks if token_id])
+        dusers = dict((unicode(duser.id), duser) for duser in
+            self.user_manager.get_many(
+                set(dtoken.user_id for dtoken in dtokens.values())))
+        tenant_ids = set(dtoken.tenant_id for dtoken in dtokens.values())
+        tenant_ids.update(duser.tenant_id for duser in dusers.values())
+        tenant_ids.discard(None)
+        dtenants = dict((unicode(dtenant.id), dtenant) for dtenant in
+                        self.tenant_manager.get_many(tenant_ids))
+
+        def get_tenant(tenant_id):
+            return dtenants.get(unicode(tenant_id))
+
+        valid = []
+        results = []
+        for token_id, belongs_to in checks:
+            dtoken = dtokens.get(token_id) if token_id else None
+            duser = dusers.get(unicode(dtoken.user_id)) if dtoken else None
+            if duser is None:
+                # a token whose user is gone is as good as missing
+                dtoken = None
+            try:
+                if not token_id:
+                    raise fault.UnauthorizedFault("Missing token")
+                self._check_token_info(dtoken, duser, belongs_to, True,
+                                       get_tenant)
+            except fault.IdentityFault as exc:
+                results.append((token_id, exc))
+            else:
+                valid.append((len(results), dtoken, duser))
+                results.append((token_id, None))
+
+        droles = self.grant_manager.list_resolved_roles_for_users(
+            [(duser.id, dtoken.tenant_id) for _i, dtoken, duser in valid])
+        for index, dtoken, duser in valid:
+            results[index] = (results[index][0], self.get_validate_data(
+                dtoken, duser, get_tenant=get_tenant,
+                droles=droles[(duser.id, dtoken.tenant_id)]))
+        return auth.ValidateDataBatch(results)
+
     @admin_token_validator
     def revoke_token(self, admin_token, token_id):
         dtoken = self.token_manager.get(token_id)
@@ -275,6 +370,21 @@ class IdentityService(object):
 
         self.token_manager.delete(token_id)
 
+    @service_admin_token_validator
+    def get_revoked_tokens(self, admin_token, marker=None, limit=1000):
+        """ Lists the unexpired tokens revoked since `marker` """
+        try:
+            marker = int(marker) if marker else None
+            limit = int(limit)
+        except ValueError:
+            raise fault.BadRequestFault("Expecting integer marker and limit")
+        try:
+            revocations = self.token_manager.get_revocations(marker, limit)
+        except NotImplementedError:
+            raise fault.ServiceUnavailableFault(
+                "Token revocations are not recorded by this server")
+        return auth.RevokedTokens(revocations, marker)
+
     @staticmethod
     def parse_service_ids(service_ids):
         """
@@ -296,9 +406,11 @@ class IdentityService(object):
         if not service_ids:
             raise fault.UnauthorizedFault("Missing service IDs")
 
-        services = [self.service_manager.get(service_id) for service_id in
-                    service_ids if not service_id == GLOBAL_SERVICE_ID]
-        if not all(services):
+        ids = set(service_id for service_id in service_ids
+                  if not service_id == GLOBAL_SERVICE_ID)
+        found = set(str(service.id) for service in
+                    self.service_manager.get_many(ids))
+        if ids - found:
             raise fault.UnauthorizedFault(
                 "Invalid service ID: %s" % (service_ids))
 
@@ -321,13 +433,9 @@ class IdentityService(object):
         Method to return all the global roles for the given user.
         user_id -- user ID
         """
-        ts = []
-        drolegrants = self.grant_manager.list_global_roles_for_user(user_id)
-        for drolegrant in drolegrants:
-            drole = self.role_manager.get(drolegrant.role_id)
-            ts.append(Role(drolegrant.role_id, drole.name,
-                      None, drolegrant.tenant_id))
-        return ts
+        droles = self.grant_manager.list_resolved_roles_for_user(user_id)
+        return [Role(drole.id, drole.name, None, drole.tenant_id)
+                for drole in droles]
 
     def get_tenant_roles_for_user_and_services(self, user_id, tenant_id,
                                                service_ids):
@@ -342,13 +450,16 @@ class IdentityService(object):
         """
         ts = []
         if tenant_id and user_id:
-            drolegrants = self.grant_manager.list_tenant_roles_for_user(
+            droles = self.grant_manager.list_resolved_roles_for_user(
                                                             user_id, tenant_id)
-            for drolegrant in drolegrants:
-                drole = self.role_manager.get(drolegrant.role_id)
-                ts.append(Role(drolegrant.role_id, drole.name,
-                    None, drolegrant.tenant_id))
+            ts = [Role(drole.id, drole.name, None, drole.tenant_id)
+                  for drole in droles if drole.tenant_id is not None]
+
+        return self._filter_roles_by_service_ids(ts, service_ids)
 
+    def _filter_roles_by_service_ids(self, ts, service_ids):
+        """Filters the roles down to those of the given service IDs (if any)
+        """
         if service_ids:
             # if service IDs are specified, filter roles by service IDs
             sroles_names = self.get_roles_names_by_service_ids(service_ids)
@@ -393,7 +504,16 @@ class IdentityService(object):
             raise fault.UnauthorizedFault("Missing token")
 
         (token, user) = self.get_token_info(token_id)
+        self._check_token_info(token, user, belongs_to, is_check_token)
+        return (token, user)
+
+    def _check_token_info(self, token, user, belongs_to=None,
+                          is_check_token=None, get_tenant=None):
+        """ Raises the fault _validate_token would for a token and its user
 
+        get_tenant looks tenants up by id; validate_tokens passes one reading
+        from tenants it fetched together.
+        """
         if not token:
             if is_check_token:
                 raise fault.ItemNotFoundFault("Token does not exist.")
@@ -411,16 +531,40 @@ class IdentityService(object):
             raise fault.UserDisabledFault("User %s has been disabled!"
                 % user.id)
 
+        get_tenant = get_tenant or self.tenant_manager.get
         if user.tenant_id:
-            self.validate_tenant_by_id(user.tenant_id)
+            self.validate_tenant(get_tenant(user.tenant_id))
 
-        if token.tenant_id:
-            self.validate_tenant_by_id(token.tenant_id)
+        if token.tenant_id and \
+                unicode(token.tenant_id) != unicode(user.tenant_id):
+            self.validate_tenant(get_tenant(token.tenant_id))
 
         if belongs_to and unicode(token.tenant_id) != unicode(belongs_to):
             raise fault.UnauthorizedFault("Unauthorized on this tenant")
 
-        return (token, user)
+    def _admin_decision(self, token_id):
+        """ Validates the token and tells whether its user has the admin
+        and service admin roles, remembering the outcome in the decision
+        cache.
+        """
+        token_id = self.token_manager.backend_id(token_id)
+        decision = decision_cache.DECISIONS.get(token_id)
+        if decision is not None:
+            return decision
+        (token, user) = self._validate_token(token_id)
+        self.init_admin_role_identifiers()
+        global_role_ids = set(
+            rolegrant.role_id for rolegrant in
+            self.grant_manager.list_global_roles_for_user(user.id)
+            if rolegrant.tenant_id is None)
+        decision = decision_cache.Decision(token, user,
+            is_admin=ADMIN_ROLE_ID in global_role_ids,
+            is_service_admin=SERVICE_ADMIN_ROLE_ID in global_role_ids)
+        if not (decision.is_admin or decision.is_service_admin):
+            LOG.debug("User %s has neither the admin nor the service admin "
+                      "role" % user.id)
+        decision_cache.DECISIONS.put(token_id, decision)
+        return decision
 
     def has_admin_role(self, token_id):
         """ Checks if the token belongs to a user who has Keystone admin
@@ -433,10 +577,9 @@ class IdentityService(object):
         role is defined in the config file using the keystone-admin-role
         setting
         """
-        (token, user) = self._validate_token(token_id)
-        self.init_admin_role_identifiers()
-        if self.has_role(None, user, ADMIN_ROLE_ID):
-            return (token, user)
+        decision = self._admin_decision(token_id)
+        if decision.is_admin:
+            return (decision.token, decision.user)
         else:
             return False
 
@@ -451,12 +594,11 @@ class IdentityService(object):
         (i.e. role assigned without a tenant id). The actual name of the role
         is defined in the config file using the keystone-admin-role setting
         """
-        (token, user) = self._validate_token(token_id)
-        self.init_admin_role_identifiers()
-        if self.has_role(None, user, SERVICE_ADMIN_ROLE_ID):
-            return (token, user)
+        decision = self._admin_decision(token_id)
+        if decision.is_service_admin or decision.is_admin:
+            return (decision.token, decision.user)
         else:
-            return self.has_admin_role(token_id)
+            return False
 
     def validate_admin_token(self, token_id):
         """ Validates that the token belongs to a user who has Keystone admin
@@ -483,17 +625,11 @@ class IdentityService(object):
         is defined in the config file using the keystone-admin-role and
         keystone-service-admin-role settings
         """
-        # Does the user have the Service Admin role
+        # Does the user have the Service Admin role, or the Admin role
+        # (which includes Service Admin rights)
         result = self.has_service_admin_role(token_id)
         if result:
-            LOG.debug("token is associated with service admin role")
-            return result
-        # Does the user have the Admin role (which includes Service Admin
-        # rights)
-        result = self.has_admin_role(token_id)
-        if result:
-            LOG.debug("token is associated with admin role, so responding"
-                      "positively from validate_service_admin_token")
+            LOG.debug("token is associated with admin or service admin role")
             return result
 
         LOG.debug("token is not associated with admin  or service admin role")
@@ -577,62 +713,78 @@ class IdentityService(object):
         AuthData is used for rendering authentication responses
         """
         tenant = None
-        endpoints = None
 
         if dtoken.tenant_id:
             dtenant = self.tenant_manager.get(dtoken.tenant_id)
             tenant = auth.Tenant(id=dtenant.id, name=dtenant.name)
-            endpoints = self.tenant_manager.get_all_endpoints(dtoken.tenant_id)
-        else:
-            endpoints = self.tenant_manager.get_all_endpoints(None)
 
-        token = auth.Token(dtoken.expires, dtoken.id, tenant)
+        def endpoints():
+            # only queried when the catalog is not cached
+            return self.tenant_manager.get_all_endpoints(dtoken.tenant_id)
+
         duser = self.user_manager.get(dtoken.user_id)
 
-        ts = []
-        if dtoken.tenant_id:
-            drolegrants = self.grant_manager.list_tenant_roles_for_user(
-                                                    duser.id, dtoken.tenant_id)
-            for drolegrant in drolegrants:
-                drole = self.role_manager.get(drolegrant.role_id)
-                ts.append(Role(drolegrant.role_id, drole.name,
-                    description=drole.desc, tenant_id=drolegrant.tenant_id))
-        drolegrants = self.grant_manager.list_global_roles_for_user(duser.id)
-        for drolegrant in drolegrants:
-            drole = self.role_manager.get(drolegrant.role_id)
-            ts.append(Role(drolegrant.role_id, drole.name,
-                description=drole.desc, tenant_id=drolegrant.tenant_id))
+        # tenant roles (if scoped) followed by global roles, in one call
+        droles = self.grant_manager.list_resolved_roles_for_user(duser.id,
+                                                        dtoken.tenant_id)
+        ts = [Role(drole.id, drole.name, description=drole.description,
+                   tenant_id=drole.tenant_id) for drole in droles]
         user = auth.User(duser.id, duser.name, None, None, Roles(ts, []))
-        if self.has_service_admin_role(token.id):
+
+        # with signing keys configured, hand out a token auth_token can
+        # verify offline, carrying the claims it would otherwise ask for
+        claims_tenant = {'id': None, 'name': None}
+        if tenant:
+            claims_tenant = {'id': unicode(tenant.id),
+                             'name': unicode(tenant.name)}
+        token_id = self.token_manager.sign(dtoken.id, {
+            'user': {'id': unicode(duser.id), 'name': unicode(duser.name)},
+            'tenant': claims_tenant,
+            'roles': [drole.name for drole in droles],
+            'expires': dtoken.expires.isoformat()})
+        token = auth.Token(dtoken.expires, token_id, tenant)
+        if self.has_service_admin_role(dtoken.id):
             # Privileged users see the adminURL as well
             url_types = ['admin', 'internal', 'public']
         else:
             url_types = ['internal', 'public']
-        return auth.AuthData(token, user, endpoints, url_types=url_types)
+        return auth.AuthData(token, user, endpoints, url_types=url_types,
+                             catalog_cache=catalog_cache.CATALOGS)
+
+    def get_validate_data(self, dtoken, duser, service_ids=None,
+                          get_tenant=None, droles=None):
+        """return ValidateData object for a token/user pair
 
-    def get_validate_data(self, dtoken, duser, service_ids=None):
-        """return ValidateData object for a token/user pair"""
+        validate_tokens passes the tenant lookup and the resolved roles,
+        having fetched them for all its tokens at once.
+        """
         global GLOBAL_SERVICE_ID
+        get_tenant = get_tenant or self.tenant_manager.get
         tenant = None
         if dtoken.tenant_id:
-            dtenant = self.tenant_manager.get(dtoken.tenant_id)
+            dtenant = get_tenant(dtoken.tenant_id)
             tenant = auth.Tenant(id=dtenant.id, name=dtenant.name)
 
         token = auth.Token(dtoken.expires, dtoken.id, tenant)
 
-        ts = self.get_tenant_roles_for_user_and_services(duser.id,
-                                                    dtoken.tenant_id,
-                                                    service_ids)
+        # resolve tenant and global roles together, then split them
+        if droles is None:
+            droles = self.grant_manager.list_resolved_roles_for_user(
+                duser.id, dtoken.tenant_id)
+        ts = [Role(drole.id, drole.name, None, drole.tenant_id)
+              for drole in droles if drole.tenant_id is not None]
+        ts = self._filter_roles_by_service_ids(ts, service_ids)
         if (not dtoken.tenant_id or not service_ids or
                 (GLOBAL_SERVICE_ID in service_ids)):
             # return the global roles for unscoped tokens or
             # its ID is in the service IDs
-            ts = ts + self.get_global_roles_for_user(duser.id)
+            ts = ts + [Role(drole.id, drole.name, None, None)
+                       for drole in droles if drole.tenant_id is None]
 
         # Also get the user's tenant's name
         tenant_name = None
         if duser.tenant_id:
-            utenant = self.tenant_manager.get(duser.tenant_id)
+            utenant = get_tenant(duser.tenant_id)
             tenant_name = utenant.name
 
         user = auth.User(duser.id, duser.name, duser.tenant_id,
@@ -752,7 +904,7 @@ class IdentityService(object):
         if dtenant is None:
             raise fault.ItemNotFoundFault("The tenant could not be found")
 
-        self.tenant_manager.delete(dtenant.id)
+        self.tenant_manager.delete_cascade(dtenant.id)
         return None
 
     #
@@ -939,7 +1091,7 @@ class IdentityService(object):
         if not duser:
             raise fault.ItemNotFoundFault("The user could not be found")
 
-        self.user_manager.delete(user_id)
+        self.user_manager.delete_cascade(user_id)
         return None
 
     def create_role(self, admin_token, role):
@@ -1046,11 +1198,7 @@ class IdentityService(object):
                             "You do not have ownership of the '%s' service"
                             % service.name)
 
-        rolegrants = self.grant_manager.rolegrant_list_by_role(role_id)
-        if rolegrants is not None:
-            for rolegrant in rolegrants:
-                self.grant_manager.rolegrant_delete(rolegrant.id)
-        self.role_manager.delete(role_id)
+        self.role_manager.delete_cascade(role_id)
 
     @service_admin_token_validator
     def add_role_to_user(self, admin_token, user_id, role_id, tenant_id=None):
@@ -1105,8 +1253,11 @@ class IdentityService(object):
         ts = []
         drolegrants = self.grant_manager.rolegrant_get_page(marker, limit,
                                                            user_id, tenant_id)
+        droles = dict((str(drole.id), drole) for drole in
+                      self.role_manager.get_many(
+                          [drolegrant.role_id for drolegrant in drolegrants]))
         for drolegrant in drolegrants:
-            drole = self.role_manager.get(drolegrant.role_id)
+            drole = droles[str(drolegrant.role_id)]
             ts.append(Role(drole.id, drole.name,
                     drole.desc, drole.service_id))
         prev, next = self.grant_manager.rolegrant_get_page_markers(
@@ -1270,8 +1421,9 @@ class IdentityService(object):
 
     def transform_endpoint_templates(self, dendpoint_templates):
         ts = []
+        dservices = self._services_by_id(dendpoint_templates)
         for dendpoint_template in dendpoint_templates:
-            dservice = self.service_manager.get(dendpoint_template.service_id)
+            dservice = dservices.get(str(dendpoint_template.service_id))
             ts.append(EndpointTemplate(
                 dendpoint_template.id,
                 dendpoint_template.region,
@@ -1288,6 +1440,13 @@ class IdentityService(object):
                 ))
         return ts
 
+    def _services_by_id(self, dendpoint_templates):
+        """Looks up the services of the endpoint templates in one call"""
+        return dict((str(dservice.id), dservice) for dservice in
+                    self.service_manager.get_many(
+                        [dendpoint_template.service_id
+                         for dendpoint_template in dendpoint_templates]))
+
     @service_admin_token_validator
     def get_endpoint_template(self, admin_token, endpoint_template_id):
         dendpoint_template = self.endpoint_template_manager.get(
@@ -1328,10 +1487,16 @@ class IdentityService(object):
         dtenant_endpoints = \
             self.endpoint_manager.endpoint_get_by_tenant_get_page(tenant_id,
                                                                 marker, limit)
+        dendpoint_templates = dict(
+            (str(dendpoint_template.id), dendpoint_template)
+            for dendpoint_template in self.endpoint_template_manager.get_many(
+                [dtenant_endpoint.endpoint_template_id
+                 for dtenant_endpoint in dtenant_endpoints]))
+        dservices = self._services_by_id(dendpoint_templates.values())
         for dtenant_endpoint in dtenant_endpoints:
-            dendpoint_template = self.endpoint_template_manager.get(
-                dtenant_endpoint.endpoint_template_id)
-            dservice = self.service_manager.get(dendpoint_template.service_id)
+            dendpoint_template = dendpoint_templates[
+                str(dtenant_endpoint.endpoint_template_id)]
+            dservice = dservices.get(str(dendpoint_template.service_id))
             ts.append(Endpoint(
                             dtenant_endpoint.id,
                             dtenant_endpoint.tenant_id,
@@ -1448,27 +1613,8 @@ class IdentityService(object):
         if not dservice:
             raise fault.ItemNotFoundFault("The service could not be found")
 
-        #Delete Related Endpointtemplates and Endpoints.
-        endpoint_templates = self.endpoint_template_manager.get_by_service(
-            service_id)
-        if endpoint_templates is not None:
-            for endpoint_template in endpoint_templates:
-                endpoints = self.endpoint_manager.\
-                    endpoint_get_by_endpoint_template(endpoint_template.id)
-                if endpoints is not None:
-                    for endpoint in endpoints:
-                        self.endpoint_manager.delete(endpoint.id)
-                self.endpoint_template_manager.delete(endpoint_template.id)
-        #Delete Related Role and RoleRefs
-        roles = self.role_manager.get_by_service(service_id)
-        if roles is not None:
-            for role in roles:
-                rolegrants = self.grant_manager.rolegrant_list_by_role(role.id)
-                if rolegrants is not None:
-                    for rolegrant in rolegrants:
-                        self.grant_manager.rolegrant_delete(rolegrant.id)
-                self.role_manager.delete(role.id)
-        self.service_manager.delete(service_id)
+        # Delete related endpoint templates, endpoints, roles and grants
+        self.service_manager.delete_cascade(service_id)
 
     @admin_token_validator
     def get_credentials(self, admin_token, user_id, marker, limit, url):
@@ -0,0 +1,272 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2011 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+""" In-process Bloom filter of live token ids
+
+Every token presented to Keystone costs a lookup in the tokens table, even
+garbage and long-expired ids from misconfigured clients or scanners. A Bloom
+filter holding the ids of live tokens answers "definitely not a token"
+without touching the database, and "maybe" for every live token and a small
+fraction of the rest.
+
+Tokens created through this process are added as they are created. A
+background greenthread fetches the tokens created by other keystone
+processes every ``sync_interval`` seconds, and rebuilds the filter from the
+backend every ``rebuild_interval`` seconds, which also drops the ids of
+expired and deleted tokens. Unknown ids are answered from the filter alone,
+except for ids issued since the last fetch (token ids carry the time they
+were issued, see new_token_id()), which are left to the backend.
+"""
+
+from datetime import timedelta
+import hashlib
+import logging
+import math
+import struct
+import time
+import uuid
+
+import eventlet
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+DEFAULT_CAPACITY = 0
+DEFAULT_ERROR_RATE = 0.01
+DEFAULT_SYNC_INTERVAL = 1
+DEFAULT_REBUILD_INTERVAL = 3600
+# how far before the newest creation time seen a sync looks again, for
+# tokens whose insert committed after a newer one was already fetched
+SYNC_OVERLAP = timedelta(seconds=5)
+# seconds the clocks of the keystone nodes may disagree by
+CLOCK_SKEW = 5
+
+
+def new_token_id():
+    """ Returns a random token id carrying the time it was issued """
+    return '%x-%s' % (int(time.time() * 1000), uuid.uuid4().hex)
+
+
+def issued_at(token_id):
+    """ The time a token id from new_token_id() was issued, or None for
+    ids in any other form """
+    parts = token_id.split('-')
+    if len(parts) != 2 or len(parts[1]) != 32 or len(parts[0]) > 12:
+        return None
+    try:
+        return int(parts[0], 16) / 1000.0
+    except ValueError:
+        return None
+
+
+class BloomFilter(object):
+    """ Fixed-size set of strings that may answer false positives
+
+    Sized so that holding ``capacity`` strings gives a false positive rate
+    of about ``error_rate``.
+    """
+    def __init__(self, capacity, error_rate=DEFAULT_ERROR_RATE):
+        capacity = max(int(capacity), 1)
+        self.num_bits = max(int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(
+            self.num_bits / float(capacity) * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        if isinstance(key, unicode):
+            key = key.encode('utf-8')
+        h1, h2 = struct.unpack('<QQ', hashlib.md5(str(key)).digest())
+        h2 |= 1
+        return [(h1 + i * h2) % self.num_bits
+                for i in xrange(self.num_hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def memory(self):
+        """ Bytes taken by the bit array """
+        return len(self.bits)
+
+    def false_positive_rate(self):
+        """ Chance that a string never added is reported present, estimated
+        from the share of bits set """
+        bits_set = sum(bin(byte).count('1') for byte in self.bits)
+        return (bits_set / float(self.num_bits)) ** self.num_hashes
+
+
+class TokenFilter(object):
+    """ Answers whether a token id may belong to a live token
+
+    A ``capacity`` of 0 disables the filter, which then answers yes to
+    everything. So does a filter that has not been built yet.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY,
+                 error_rate=DEFAULT_ERROR_RATE,
+                 sync_interval=DEFAULT_SYNC_INTERVAL,
+                 rebuild_interval=DEFAULT_REBUILD_INTERVAL, loader=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        # loader(created_after) returns (token id, created) pairs of the
+        # live tokens created at or after the given time, or all of them
+        self.loader = loader
+        self._worker = None
+        self.clear()
+
+    def clear(self):
+        """ Forgets every id; the filter is built again when next used """
+        if self._worker is not None:
+            self._worker.kill()
+            self._worker = None
+        self.rejected = 0
+        self._bloom = None
+        self._newest = None  # latest creation time among the tokens loaded
+        self._synced_at = 0  # when the last successful load started
+        self._rebuild_due = 0
+        self._rebuilding = None  # ids added while a rebuild is loading
+
+    @property
+    def enabled(self):
+        return bool(self.capacity) and self.loader is not None
+
+    def add(self, token_id):
+        bloom = self._bloom
+        if bloom is not None and token_id not in bloom:
+            bloom.add(token_id)
+        if self._rebuilding is not None:
+            self._rebuilding.append(token_id)
+
+    def might_exist(self, token_id):
+        """ False if the id is definitely not that of a live token """
+        if not self.enabled:
+            return True
+        if self._worker is None:
+            self._worker = eventlet.spawn(self._run)
+        bloom = self._bloom
+        if bloom is None or token_id in bloom:
+            return True
+        issued = issued_at(token_id)
+        if issued is not None and issued >= self._synced_at - CLOCK_SKEW:
+            # perhaps issued by another process since the last sync
+            return True
+        self.rejected += 1
+        return False
+
+    def _run(self):
+        while self.enabled:
+            if time.time() >= self._rebuild_due:
+                self.rebuild()
+            else:
+                self.sync()
+            eventlet.sleep(self.sync_interval or DEFAULT_SYNC_INTERVAL)
+        self._worker = None
+
+    def _note_created(self, created):
+        if created is not None and (self._newest is None or
+                                    created > self._newest):
+            self._newest = created
+
+    def sync(self):
+        """ Adds the tokens created since the last sync """
+        started = time.time()
+        created_after = None
+        if self._newest is not None:
+            created_after = self._newest - SYNC_OVERLAP
+        try:
+            for token_id, created in self.loader(created_after):
+                self.add(token_id)
+                self._note_created(created)
+        except Exception:  # pylint: disable=W0703
+            logger.exception("Failed to sync the token filter")
+            return
+        self._synced_at = started
+
+    def rebuild(self):
+        """ Loads the ids of all live tokens into a new filter """
+        if self._rebuilding is None:
+            self._rebuilding = []
+        started = time.time()
+        try:
+            live = []
+            for token_id, created in self.loader(None):
+                live.append(token_id)
+                self._note_created(created)
+            # ids added meanwhile went to _rebuilding too
+            bloom = BloomFilter(max(self.capacity, 2 * len(live)),
+                                self.error_rate)
+            for token_id in live + self._rebuilding:
+                bloom.add(token_id)
+            self._bloom = bloom
+            self._synced_at = started
+            stats = self.stats()
+            logger.info("Token filter rebuilt with %(ids)s ids: "
+                        "%(memory)s bytes, estimated false positive rate "
+                        "%(false_positive_rate).5f" % stats)
+        except NotImplementedError:
+            logger.warn("Token backend cannot list live tokens; disabling "
+                        "the token filter")
+            self.capacity = 0
+        except Exception:  # pylint: disable=W0703
+            logger.exception("Failed to rebuild the token filter")
+        finally:
+            self._rebuilding = None
+            self._rebuild_due = time.time() + self.rebuild_interval
+
+    def stats(self):
+        """ Returns the size, memory footprint (bytes) and estimated false
+        positive rate of the filter, and how many ids it rejected """
+        bloom = self._bloom
+        if bloom is None:
+            return {'ids': 0, 'memory': 0, 'false_positive_rate': 1.0,
+                    'rejected': self.rejected}
+        return {'ids': bloom.count, 'memory': bloom.memory,
+                'false_positive_rate': bloom.false_positive_rate(),
+                'rejected': self.rejected}
+
+
+FILTER = TokenFilter()
+
+
+def configure(capacity=None, error_rate=None, sync_interval=None,
+              rebuild_interval=None, loader=None):
+    """ Empties the filter, applying new settings if given; it is built
+    again the next time it is used """
+    if capacity is not None:
+        FILTER.capacity = int(capacity)
+    if error_rate is not None:
+        FILTER.error_rate = float(error_rate)
+    if sync_interval is not None:
+        FILTER.sync_interval = float(sync_interval)
+    if rebuild_interval is not None:
+        FILTER.rebuild_interval = float(rebuild_interval)
+    if loader is not None:
+        FILTER.loader = loader
+    FILTER.clear()
+    logger.debug("Token filter configured (capacity=%s, error_rate=%s)" %
+                 (FILTER.capacity, FILTER.error_rate))
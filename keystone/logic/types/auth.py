@@ -451,19 +451,110 @@ class AuthData(object):
         without elevated privileges, the "adminURL" is not returned. The
         url_types paramater in the initializer lists the types to return.
         The actual authorization is done in logic/service.py
+
+        The rendered service catalog is kept in catalog_cache, if given, and
+        base_urls may then be a callable only called on a cache miss.
     """
 
-    def __init__(self, token, user, base_urls=None, url_types=None):
+    def __init__(self, token, user, base_urls=None, url_types=None,
+                 catalog_cache=None):
         self.token = token
         self.user = user
-        self.base_urls = base_urls
+        self._base_urls = base_urls
         if url_types is None:
             self.url_types = ["internal", "public", "admin"]
         else:
             self.url_types = url_types
-        self.d = {}
-        if self.base_urls is not None:
-            self.__convert_baseurls_to_dict()
+        self.catalog_cache = catalog_cache
+        self._d = None
+
+    @property
+    def base_urls(self):
+        if callable(self._base_urls):
+            self._base_urls = self._base_urls()
+        return self._base_urls
+
+    @property
+    def d(self):
+        """Endpoints of the catalog by service id"""
+        if self._d is None:
+            self._d = {}
+            for base_url in self.base_urls or []:
+                self._d.setdefault(base_url.service_id, []).append(base_url)
+        return self._d
+
+    def _service_catalog(self, fmt, render):
+        """Returns the catalog fragment rendered by render(), or cached"""
+        key = None
+        if self.catalog_cache is not None:
+            tenant_id = self.token.tenant.id if self.token.tenant else None
+            key = self.catalog_cache.key(tenant_id, self.url_types, fmt)
+            fragment = self.catalog_cache.get(key)
+            if fragment is not None:
+                return fragment
+        if self.base_urls:
+            fragment = render()
+        else:
+            fragment = ''
+        if key is not None:
+            self.catalog_cache.put(key, fragment)
+        return fragment
+
+    def _endpoint_urls(self, base_url):
+        """Returns the (attribute, value) pairs rendered for an endpoint,
+        or an empty list if none of its URLs apply to the token"""
+        attributes = []
+        include_this_endpoint = False
+        if base_url.region:
+            attributes.append(("region", base_url.region))
+        for url_kind in self.url_types:
+            base_url_item = getattr(base_url, url_kind + "_url")
+            if base_url_item:
+                if '%tenant_id%' in base_url_item:
+                    if self.token.tenant:
+                        # Don't return tenant endpoints if token
+                        # not scoped to a tenant
+                        attributes.append((url_kind + "URL",
+                            base_url_item.replace('%tenant_id%',
+                                                  str(self.token.tenant.id))))
+                        attributes.append(('tenantId',
+                                           str(self.token.tenant.id)))
+                        include_this_endpoint = True
+                else:
+                    attributes.append((url_kind + "URL", base_url_item))
+                    include_this_endpoint = True
+        if not include_this_endpoint:
+            return []
+        attributes.append(("id", str(base_url.id)))
+        if getattr(base_url, "version_id", None):
+            attributes.append(("versionId", str(base_url.version_id)))
+        return attributes
+
+    def _services_by_id(self):
+        """Looks up the services of the catalog in one call"""
+        return dict((str(dservice.id), dservice)
+                    for dservice in db_api.SERVICE.get_many(self.d.keys()))
+
+    def _render_xml_catalog(self):
+        service_catalog = etree.Element("serviceCatalog")
+        dservices = self._services_by_id()
+        for key, key_base_urls in self.d.items():
+            dservice = dservices.get(str(key))
+            if not dservice:
+                raise fault.ItemNotFoundFault(
+                    "The service could not be found")
+            service = etree.Element("service",
+                             name=dservice.name, type=dservice.type)
+            for base_url in key_base_urls:
+                attributes = self._endpoint_urls(base_url)
+                if attributes:
+                    endpoint = etree.Element("endpoint")
+                    for name, value in attributes:
+                        endpoint.set(name, value)
+                    service.append(endpoint)
+            if service.find("endpoint") is not None:
+                service_catalog.append(service)
+        return etree.tostring(service_catalog)
 
     def to_xml(self):
         dom = etree.Element("access",
@@ -486,53 +577,34 @@ class AuthData(object):
         if self.user.rolegrants is not None:
             user.append(self.user.rolegrants.to_dom())
 
-        if self.base_urls is not None and len(self.base_urls) > 0:
-            service_catalog = etree.Element("serviceCatalog")
-            for key, key_base_urls in self.d.items():
-                dservice = db_api.SERVICE.get(key)
-                if not dservice:
-                    raise fault.ItemNotFoundFault(
-                        "The service could not be found")
-                service = etree.Element("service",
-                                 name=dservice.name, type=dservice.type)
-                for base_url in key_base_urls:
-                    include_this_endpoint = False
-                    endpoint = etree.Element("endpoint")
-                    if base_url.region:
-                        endpoint.set("region", base_url.region)
-                    for url_kind in self.url_types:
-                        base_url_item = getattr(base_url, url_kind + "_url")
-                        if base_url_item:
-                            if '%tenant_id%' in base_url_item:
-                                if self.token.tenant:
-                                    # Don't return tenant endpoints if token
-                                    # not scoped to a tenant
-                                    endpoint.set(url_kind + "URL",
-                                        base_url_item.replace('%tenant_id%',
-                                        str(self.token.tenant.id)))
-                                    endpoint.set('tenantId',
-                                                 str(self.token.tenant.id))
-                                    include_this_endpoint = True
-                            else:
-                                endpoint.set(url_kind + "URL", base_url_item)
-                                include_this_endpoint = True
-                    if include_this_endpoint:
-                        endpoint.set("id", str(base_url.id))
-                        if hasattr(base_url, "version_id"):
-                            if base_url.version_id:
-                                endpoint.set("versionId",
-                                             str(base_url.version_id))
-                        service.append(endpoint)
-                if service.find("endpoint") is not None:
-                    service_catalog.append(service)
-            dom.append(service_catalog)
-        return etree.tostring(dom)
-
-    def __convert_baseurls_to_dict(self):
-        for base_url in self.base_urls:
-            if base_url.service_id not in self.d:
-                self.d[base_url.service_id] = list()
-            self.d[base_url.service_id].append(base_url)
+        xml = etree.tostring(dom)
+        service_catalog = self._service_catalog('xml',
+                                                self._render_xml_catalog)
+        if service_catalog:
+            # splice the rendered catalog in as the last child of <access>
+            xml = xml[:-len("</access>")] + service_catalog + "</access>"
+        return xml
+
+    def _render_json_catalog(self):
+        service_catalog = []
+        dservices = self._services_by_id()
+        for key, key_base_urls in self.d.items():
+            service = {}
+            endpoints = []
+            for base_url in key_base_urls:
+                attributes = self._endpoint_urls(base_url)
+                if attributes:
+                    endpoints.append(dict(attributes))
+                    dservice = dservices.get(str(key))
+                    if not dservice:
+                        raise fault.ItemNotFoundFault(
+                        "The service could not be found for" + str(key))
+            if len(endpoints):
+                service["name"] = dservice.name
+                service["type"] = dservice.type
+                service["endpoints"] = endpoints
+                service_catalog.append(service)
+        return json.dumps(service_catalog)
 
     def to_json(self):
         token = {}
@@ -553,52 +625,14 @@ class AuthData(object):
         if self.user.rolegrants is not None:
             auth['user']["roles"] = self.user.rolegrants.to_json_values()
 
-        if self.base_urls is not None and len(self.base_urls) > 0:
-            service_catalog = []
-            for key, key_base_urls in self.d.items():
-                service = {}
-                endpoints = []
-                for base_url in key_base_urls:
-                    include_this_endpoint = False
-                    endpoint = {}
-                    if base_url.region:
-                        endpoint["region"] = base_url.region
-                    for url_kind in self.url_types:
-                        base_url_item = getattr(base_url, url_kind + "_url")
-                        if base_url_item:
-                            if '%tenant_id%' in base_url_item:
-                                if self.token.tenant:
-                                    # Don't return tenant endpoints if token
-                                    # not scoped to a tenant
-                                    endpoint[url_kind + "URL"] = \
-                                    base_url_item.replace('%tenant_id%',
-                                            str(self.token.tenant.id))
-                                    endpoint['tenantId'] = \
-                                            str(self.token.tenant.id)
-                                    include_this_endpoint = True
-                            else:
-                                endpoint[url_kind + "URL"] = base_url_item
-                                include_this_endpoint = True
-                    if include_this_endpoint:
-                        endpoint['id'] = str(base_url.id)
-                        if hasattr(base_url, 'version_id'):
-                            if base_url.version_id:
-                                endpoint['versionId'] = \
-                                        str(base_url.version_id)
-                        endpoints.append(endpoint)
-                        dservice = db_api.SERVICE.get(key)
-                        if not dservice:
-                            raise fault.ItemNotFoundFault(
-                            "The service could not be found for" + str(key))
-                if len(endpoints):
-                    service["name"] = dservice.name
-                    service["type"] = dservice.type
-                    service["endpoints"] = endpoints
-                    service_catalog.append(service)
-            auth["serviceCatalog"] = service_catalog
-        ret = {}
-        ret["access"] = auth
-        return json.dumps(ret)
+        auth_json = json.dumps(auth)
+        service_catalog = self._service_catalog('json',
+                                                self._render_json_catalog)
+        if service_catalog:
+            # splice the rendered catalog in as the last member of "access"
+            auth_json = '%s, "serviceCatalog": %s}' % (auth_json[:-1],
+                                                       service_catalog)
+        return '{"access": %s}' % auth_json
 
 
 class ValidateData(object):
@@ -611,7 +645,7 @@ class ValidateData(object):
         self.token = token
         self.user = user
 
-    def to_xml(self):
+    def to_dom(self):
         dom = etree.Element("access",
             xmlns="http://docs.openstack.org/identity/api/v2.0")
 
@@ -639,9 +673,12 @@ class ValidateData(object):
 
         dom.append(token)
         dom.append(user)
-        return etree.tostring(dom)
+        return dom
 
-    def to_json(self):
+    def to_xml(self):
+        return etree.tostring(self.to_dom())
+
+    def to_json_values(self):
         token = {
             "id": unicode(self.token.id),
             "expires": self.token.expires.isoformat()}
@@ -667,7 +704,120 @@ class ValidateData(object):
         if self.user.rolegrants is not None:
             user["roles"] = self.user.rolegrants.to_json_values()
 
-        return json.dumps({
+        return {
             "access": {
                 "token": token,
-                "user": user}})
+                "user": user}}
+
+    def to_json(self):
+        return json.dumps(self.to_json_values())
+
+
+class ValidateTokens(object):
+    """A request to validate several tokens at once
+
+    `checks` holds a (token id, belongsTo tenant id or None) pair per token.
+    """
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    @staticmethod
+    def from_xml(xml_str):
+        try:
+            dom = etree.Element("root")
+            dom.append(etree.fromstring(xml_str))
+            root = dom.find("{http://docs.openstack.org/identity/api/v2.0}"
+                "tokens")
+            if root is None:
+                raise fault.BadRequestFault("Expecting tokens")
+            checks = []
+            for token in root.findall(
+                    "{http://docs.openstack.org/identity/api/v2.0}token"):
+                token_id = token.get("id")
+                utils.check_empty_string(token_id, "Expecting a token id.")
+                checks.append((token_id, token.get("belongsTo")))
+            return ValidateTokens(checks)
+        except etree.LxmlError as e:
+            raise fault.BadRequestFault("Cannot parse tokens", str(e))
+
+    @staticmethod
+    def from_json(json_str):
+        try:
+            obj = json.loads(json_str)
+            if "tokens" not in obj:
+                raise fault.BadRequestFault("Expecting tokens")
+            checks = []
+            for token in obj["tokens"]:
+                if not token.get("id"):
+                    raise fault.BadRequestFault("Expecting a token id.")
+                checks.append((token["id"], token.get("belongsTo")))
+            return ValidateTokens(checks)
+        except (ValueError, TypeError, AttributeError) as e:
+            raise fault.BadRequestFault("Cannot parse tokens", str(e))
+
+
+class ValidateDataBatch(object):
+    """The outcome of validating several tokens at once
+
+    `results` holds a (token id, ValidateData or IdentityFault) pair per
+    token, in the order they were asked for.
+    """
+
+    def __init__(self, results):
+        self.results = results
+
+    def to_xml(self):
+        dom = etree.Element("tokens",
+            xmlns="http://docs.openstack.org/identity/api/v2.0")
+        for token_id, result in self.results:
+            token = etree.Element("token", id=unicode(token_id))
+            if isinstance(result, ValidateData):
+                token.append(result.to_dom())
+            else:
+                token.append(etree.fromstring(result.to_xml()))
+            dom.append(token)
+        return etree.tostring(dom)
+
+    def to_json(self):
+        tokens = []
+        for token_id, result in self.results:
+            if isinstance(result, ValidateData):
+                token = result.to_json_values()
+            else:
+                token = json.loads(result.to_json())
+            token["id"] = unicode(token_id)
+            tokens.append(token)
+        return json.dumps({"tokens": tokens})
+
+
+class RevokedTokens(object):
+    """Tokens deleted before they expired, since a marker
+
+    `marker` is the position to ask for the next revocations from.
+    """
+
+    def __init__(self, revocations, marker=None):
+        # (marker, token id, expires) tuples, oldest first
+        self.revocations = revocations
+        self.marker = marker
+        if revocations:
+            self.marker = revocations[-1][0]
+
+    def to_xml(self):
+        dom = etree.Element("revokedTokens",
+            xmlns="http://docs.openstack.org/identity/api/v2.0")
+        if self.marker is not None:
+            dom.set("marker", unicode(self.marker))
+        for _marker, token_id, expires in self.revocations:
+            dom.append(etree.Element("token", id=unicode(token_id),
+                                     expires=expires.isoformat()))
+        return etree.tostring(dom)
+
+    def to_json(self):
+        revoked = {"tokens": [
+            {"id": unicode(token_id), "expires": expires.isoformat()}
+            for _marker, token_id, expires in self.revocations]}
+        if self.marker is not None:
+            revoked["marker"] = unicode(self.marker)
+        return json.dumps({"revokedTokens": revoked})
@@ -0,0 +1,26 @@
+from keystone.manage2 import base
+from keystone.manage2 import common
+
+
+@common.arg('--batch-size',
+    type=int,
+    default=1000,
+    help='maximum number of tokens deleted per transaction '
+        '(default: %(default)s)')
+@common.arg('--pause',
+    type=float,
+    default=0,
+    help='seconds to wait between batches (default: %(default)s)')
+class Command(base.BaseBackendCommand):
+    """Deletes all expired tokens."""
+
+    # pylint: disable=E1101
+    def purge_tokens(self, batch_size, pause):
+        return self.token_manager.purge_expired(batch_size=batch_size,
+                pause=pause)
+
+    def run(self, args):
+        """Process argparse args, and print results to stdout"""
+        purged, elapsed = self.purge_tokens(batch_size=args.batch_size,
+                pause=args.pause)
+        print "Purged %s expired tokens in %.2f seconds" % (purged, elapsed)
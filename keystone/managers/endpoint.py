@@ -19,6 +19,7 @@
 import logging
 
 import keystone.backends.api as api
+from keystone.logic import catalog_cache
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -35,6 +36,7 @@ class Manager(object):
     def delete(self, endpoint_id):
         """ Delete Endpoint """
         self.driver.endpoint_delete(endpoint_id)
+        catalog_cache.invalidate()
 
     def endpoint_get_by_tenant_get_page(self, tenant_id, marker, limit):
         """ Get endpoints by tenant """
@@ -48,7 +50,9 @@ class Manager(object):
 
     def create(self, endpoint):
         """ Create a new Endpoint """
-        return self.driver.endpoint_add(endpoint)
+        result = self.driver.endpoint_add(endpoint)
+        catalog_cache.invalidate()
+        return result
 
     def get(self, endpoint_id):
         """ Returns Endpoint by ID """
@@ -19,6 +19,7 @@
 import logging
 
 import keystone.backends.api as api
+from keystone.logic import catalog_cache
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -29,7 +30,9 @@ class Manager(object):
 
     def create(self, obj):
         """ Create a new Endpoint Template """
-        return self.driver.create(obj)
+        result = self.driver.create(obj)
+        catalog_cache.invalidate()
+        return result
 
     def get_all(self):
         """ Returns all endpoint templates """
@@ -39,6 +42,10 @@ class Manager(object):
         """ Returns Endpoint Template by ID """
         return self.driver.get(endpoint_template_id)
 
+    def get_many(self, endpoint_template_ids):
+        """ Returns the Endpoint Templates with any of the given IDs """
+        return self.driver.get_many(endpoint_template_ids)
+
     def get_page(self, marker, limit):
         """ Get one page of endpoint template list """
         return self.driver.get_page(marker, limit)
@@ -62,8 +69,11 @@ class Manager(object):
 
     def update(self, endpoint_template):
         """ Update Endpoint Template """
-        return self.driver.update(endpoint_template['id'], endpoint_template)
+        result = self.driver.update(endpoint_template['id'], endpoint_template)
+        catalog_cache.invalidate()
+        return result
 
     def delete(self, endpoint_template_id):
         """ Delete Endpoint Template """
         self.driver.delete(endpoint_template_id)
+        catalog_cache.invalidate()
@@ -19,6 +19,7 @@
 import logging
 
 import keystone.backends.api as api
+from keystone.logic import decision_cache
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -46,6 +47,15 @@ class Manager(object):
     def list_tenant_roles_for_user(self, user_id, tenant_id):
         return self.driver.list_tenant_roles_for_user(user_id, tenant_id)
 
+    def list_resolved_roles_for_user(self, user_id, tenant_id=None):
+        """ Returns tenant and global roles for a user, fully resolved """
+        return self.driver.list_resolved_roles_for_user(user_id, tenant_id)
+
+    def list_resolved_roles_for_users(self, user_tenant_pairs):
+        """ Returns the resolved roles of each (user, tenant) pair, keyed by
+        the pair """
+        return self.driver.list_resolved_roles_for_users(user_tenant_pairs)
+
     def rolegrant_list_by_role(self, role_id):
         return self.driver.rolegrant_list_by_role(role_id)
 
@@ -53,7 +63,9 @@ class Manager(object):
         return self.driver.rolegrant_get_by_ids(user_id, role_id, tenant_id)
 
     def rolegrant_delete(self, grant_id):
-        return self.driver.rolegrant_delete(grant_id)
+        result = self.driver.rolegrant_delete(grant_id)
+        decision_cache.invalidate()
+        return result
 
     def list_role_grants(self, role_id, user_id, tenant_id):
         return self.driver.list_role_grants(role_id, user_id, tenant_id)
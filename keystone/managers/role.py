@@ -19,6 +19,7 @@
 import logging
 
 import keystone.backends.api as api
+from keystone.logic import decision_cache
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -35,6 +36,10 @@ class Manager(object):
         """ Returns role by ID """
         return self.driver.get(role_id)
 
+    def get_many(self, role_ids):
+        """ Returns the roles with any of the given IDs """
+        return self.driver.get_many(role_ids)
+
     def get_by_name(self, name):
         """ Returns role by name """
         return self.driver.get_by_name(name=name)
@@ -72,3 +77,14 @@ class Manager(object):
     def delete(self, role_id):
         """ Delete role """
         self.driver.delete(role_id)
+        decision_cache.invalidate()
+
+    def delete_cascade(self, role_id):
+        """ Delete role with all its grants
+
+        :returns: dict of the number of records removed, by kind
+        """
+        counts = self.driver.delete_cascade(role_id)
+        decision_cache.invalidate()
+        logger.info("Deleted role %s: %s" % (role_id, counts))
+        return counts
@@ -19,6 +19,8 @@
 import logging
 
 import keystone.backends.api as api
+from keystone.logic import catalog_cache
+from keystone.logic import decision_cache
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -29,12 +31,18 @@ class Manager(object):
 
     def create(self, service):
         """ Create a new service """
-        return self.driver.create(service)
+        result = self.driver.create(service)
+        catalog_cache.invalidate()
+        return result
 
     def get(self, service_id):
         """ Returns service by ID """
         return self.driver.get(service_id)
 
+    def get_many(self, service_ids):
+        """ Returns the services with any of the given IDs """
+        return self.driver.get_many(service_ids)
+
     def get_by_name(self, name):
         """ Returns service by name """
         return self.driver.get_by_name(name=name)
@@ -58,8 +66,23 @@ class Manager(object):
     # pylint: disable=E1103
     def update(self, service):
         """ Update service """
-        return self.driver.update(service['id'], service)
+        result = self.driver.update(service['id'], service)
+        catalog_cache.invalidate()
+        return result
 
     def delete(self, service_id):
         """ Delete service """
         self.driver.delete(service_id)
+        catalog_cache.invalidate()
+
+    def delete_cascade(self, service_id):
+        """ Delete service with its endpoint templates, endpoints, roles and
+        role grants
+
+        :returns: dict of the number of records removed, by kind
+        """
+        counts = self.driver.delete_cascade(service_id)
+        catalog_cache.invalidate()
+        decision_cache.invalidate()
+        logger.info("Deleted service %s: %s" % (service_id, counts))
+        return counts
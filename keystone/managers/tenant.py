@@ -26,6 +26,8 @@ TODO: move functionality into here. Ex:
 import logging
 
 import keystone.backends.api as api
+from keystone.logic import catalog_cache
+from keystone.logic import decision_cache
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -41,6 +43,10 @@ class Manager(object):
         """ Returns tenant by ID """
         return self.driver.get(tenant_id)
 
+    def get_many(self, tenant_ids):
+        """ Returns the tenants with any of the given IDs """
+        return self.driver.get_many(tenant_ids)
+
     def get_by_name(self, name):
         """ Returns tenant by name """
         return self.driver.get_by_name(name=name)
@@ -66,10 +72,25 @@ class Manager(object):
 
     def update(self, tenant):
         """ Update tenant """
-        return self.driver.update(tenant['id'], tenant)
+        result = self.driver.update(tenant['id'], tenant)
+        decision_cache.invalidate()
+        return result
 
     def delete(self, tenant_id):
         self.driver.delete(tenant_id)
+        catalog_cache.invalidate()
+        decision_cache.invalidate()
+
+    def delete_cascade(self, tenant_id):
+        """ Delete an empty tenant with its endpoints
+
+        :returns: dict of the number of records removed, by kind
+        """
+        counts = self.driver.delete_cascade(tenant_id)
+        catalog_cache.invalidate()
+        decision_cache.invalidate()
+        logger.info("Deleted tenant %s: %s" % (tenant_id, counts))
+        return counts
 
     def get_all_endpoints(self, tenant_id):
         return self.driver.get_all_endpoints(tenant_id)
@@ -16,28 +16,92 @@
 
 """ Token manager module """
 
+from datetime import datetime
 import logging
+import time
+
+import eventlet
 
 import keystone.backends.api as api
+from keystone import config
+from keystone.common import signing
+from keystone.logic import decision_cache
+from keystone.logic import token_filter
 
+CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
 class Manager(object):
     def __init__(self):
         self.driver = api.TOKEN
+        self.revocation_driver = api.TOKEN_REVOCATION
+        self.signing_keys = None
+        if CONF.token_signing_key_file:
+            self.signing_keys = signing.KeyFile(CONF.token_signing_key_file)
 
     def create(self, token):
-        return self.driver.create(token)
+        result = self.driver.create(token)
+        token_filter.FILTER.add(result.id)
+        return result
+
+    def sign(self, token_id, claims):
+        """ Returns the id handed out for a token: a signed token carrying
+        the claims if signing keys are configured, else the token id itself
+        """
+        if self.signing_keys is None:
+            return token_id
+        claims = dict(claims, id=token_id)
+        return signing.sign(self.signing_keys, claims)
+
+    def backend_id(self, token_id):
+        """ Returns the id the token is stored under
+
+        Signed tokens embed it; anything else is stored as is. A signed
+        token failing verification is returned unchanged, so it is simply
+        not found.
+        """
+        if self.signing_keys is None or not signing.is_signed(token_id):
+            return token_id
+        try:
+            return signing.verify(self.signing_keys, token_id)['id']
+        except (signing.InvalidToken, KeyError, TypeError):
+            LOG.debug("Rejecting signed token that failed verification")
+            return token_id
 
     # pylint: disable=E1103
     def update(self, id, token):
-        return self.driver.update(id, token)
+        id = self.backend_id(id)
+        result = self.driver.update(id, token)
+        decision_cache.invalidate(id)
+        return result
 
     def get(self, token_id):
         """ Returns token by ID """
+        token_id = self.backend_id(token_id)
+        if not token_filter.FILTER.might_exist(token_id):
+            # not a live token, no need to look
+            return None
         return self.driver.get(token_id)
 
+    def get_many(self, token_ids):
+        """ Returns the tokens found for the given IDs, keyed by the ID
+        they were asked for """
+        backend_ids = dict((token_id, self.backend_id(token_id))
+                           for token_id in set(token_ids))
+        wanted = [backend_id for backend_id in set(backend_ids.values())
+                  if token_filter.FILTER.might_exist(backend_id)]
+        found = dict((dtoken.id, dtoken)
+                     for dtoken in self.driver.get_many(wanted))
+        return dict((token_id, found[backend_id])
+                    for token_id, backend_id in backend_ids.items()
+                    if backend_id in found)
+
+    def fetch_live_ids(self, created_after=None):
+        """ Lists (id, created) of the live tokens created at or after the
+        given time, or of all the live tokens """
+        return self.driver.fetch_live_ids(created_after)
+
     def get_all(self):
         """ Returns all tokens """
         return self.driver.get_all()
@@ -58,4 +122,55 @@ class Manager(object):
             return self.driver.get_for_user(user_id)
 
     def delete(self, token_id):
+        token_id = self.backend_id(token_id)
+        dtoken = self.driver.get(token_id)
         self.driver.delete(token_id)
+        decision_cache.invalidate(token_id)
+        if dtoken is not None and dtoken.expires > datetime.now():
+            self._record_revocation(token_id, dtoken.expires)
+
+    def _record_revocation(self, token_id, expires):
+        try:
+            self.revocation_driver.create(token_id, expires)
+        except NotImplementedError:
+            LOG.debug("No TokenRevocation backend; not recording the "
+                      "revocation of token %s" % token_id)
+
+    def get_revocations(self, marker=None, limit=1000):
+        """ Lists the tokens revoked after `marker` that have not expired
+
+        :returns: list of (marker, token id, expires) tuples, oldest first
+        """
+        return self.revocation_driver.get_since(marker, limit)
+
+    def purge_expired(self, batch_size=1000, pause=0, expires_before=None):
+        """ Deletes expired tokens in batches of at most `batch_size` rows
+
+        Each batch is its own transaction, and the purge yields for `pause`
+        seconds between batches so other requests can reach the table.
+
+        :param expires_before: cutoff datetime (defaults to now)
+        :returns: tuple of (tokens purged, seconds taken)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        expires_before = expires_before or datetime.now()
+        start = time.time()
+        purged = 0
+        while True:
+            count = self.driver.delete_expired(expires_before, batch_size)
+            purged += count
+            if count < batch_size:
+                break
+            eventlet.sleep(pause)
+        self._purge_revocations(expires_before, batch_size, pause)
+        return purged, time.time() - start
+
+    def _purge_revocations(self, expires_before, batch_size, pause):
+        """ Forgets revocations of tokens that have expired anyway """
+        try:
+            while self.revocation_driver.delete_expired(
+                    expires_before, batch_size) == batch_size:
+                eventlet.sleep(pause)
+        except NotImplementedError:
+            pass
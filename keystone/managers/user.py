@@ -19,6 +19,7 @@
 import logging
 
 import keystone.backends.api as api
+from keystone.logic import decision_cache
 
 LOG = logging.getLogger(__name__)
 
@@ -35,6 +36,10 @@ class Manager(object):
         """ Returns user by ID """
         return self.driver.get(user_id)
 
+    def get_many(self, user_ids):
+        """ Returns the users with any of the given IDs """
+        return self.driver.get_many(user_ids)
+
     def get_by_name(self, name):
         """ Returns user by name """
         return self.driver.get_by_name(name=name)
@@ -72,13 +77,27 @@ class Manager(object):
 
     def update(self, user):
         """ Update user """
-        return self.driver.update(user['id'], user)
+        result = self.driver.update(user['id'], user)
+        decision_cache.invalidate()
+        return result
 
     def delete(self, user_id):
         self.driver.delete(user_id)
+        decision_cache.invalidate()
+
+    def delete_cascade(self, user_id):
+        """ Delete user with its role grants and credentials
+
+        :returns: dict of the number of records removed, by kind
+        """
+        counts = self.driver.delete_cascade(user_id)
+        decision_cache.invalidate()
+        LOG.info("Deleted user %s: %s" % (user_id, counts))
+        return counts
 
     def check_password(self, user_id, password):
         return self.driver.check_password(user_id, password)
 
     def user_role_add(self, values):
         self.driver.user_role_add(values)
+        decision_cache.invalidate()
@@ -40,7 +40,7 @@ import urlparse
 from webob.exc import Request, Response
 from webob.exc import HTTPUnauthorized
 
-from keystone.common.bufferedhttp import http_connect_raw as http_connect
+from keystone.common import bufferedhttp
 
 PROTOCOL_NAME = "Basic Authentication"
 
@@ -79,6 +79,13 @@ class AuthProtocol(object):
         # through and we let the downstream service make the final decision
         self.delay_auth_decision = int(conf.get('delay_auth_decision', 0))
 
+        # keep-alive connections to the remote service
+        self.http_pool = bufferedhttp.HTTPConnectionPool(
+            max_size=conf.get('http_pool_size',
+                              bufferedhttp.DEFAULT_POOL_SIZE),
+            idle_timeout=conf.get('http_pool_idle_timeout',
+                                  bufferedhttp.DEFAULT_IDLE_TIMEOUT))
+
     def __call__(self, env, start_response):
         def custom_start_response(status, headers):
             if self.delay_auth_decision:
@@ -140,11 +147,12 @@ class AuthProtocol(object):
             # We are forwarding to a remote service (no downstream WSGI app)
             req = Request(proxy_headers)
             parsed = urlparse(req.url)
-            conn = http_connect(self.service_host, self.service_port, \
-                                req.method, parsed.path, \
-                                proxy_headers, \
-                                ssl=(self.service_protocol == 'https'))
-            resp = conn.getresponse()
+            resp = self.http_pool.request(self.service_host,
+                                          self.service_port,
+                                          req.method, parsed.path,
+                                          headers=proxy_headers,
+                                          ssl=(self.service_protocol ==
+                                               'https'))
             data = resp.read()
             #TODO(ziad): use a more sophisticated proxy
             # we are rewriting the headers now
@@ -100,20 +100,26 @@ from datetime import datetime
 from dateutil import parser
 import errno
 import eventlet
+from eventlet import event
 from eventlet import wsgi
+import hashlib
 import httplib
 import json
-# memcache is imported in __init__ if memcache caching is configured
+# memcache_pool is imported in __init__ if memcache caching is configured
 import logging
 import os
 from paste.deploy import loadapp
+import sys
+import threading
 import time
 import urllib
 from urlparse import urlparse
 from webob.exc import HTTPUnauthorized
 from webob.exc import Request, Response
 
-from keystone.common.bufferedhttp import http_connect_raw as http_connect
+from keystone.common import bufferedhttp
+from keystone.common import lru
+from keystone.common import signing
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -121,6 +127,70 @@ PROTOCOL_NAME = "Token Authentication"
 # The time format of the 'expires' property of a token
 EXPIRE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 MAX_CACHE_TIME = 86400
+# Local (in-process) token cache defaults, see LocalTokenCache
+LOCAL_CACHE_TTL = 300
+LOCAL_CACHE_NEGATIVE_TTL = 10
+# Revocations fetched per request when polling Keystone for them
+REVOCATION_PAGE_SIZE = 1000
+# Most tokens sent to Keystone in one batch validation (its default
+# token_validation_batch_limit)
+VALIDATION_BATCH_SIZE = 100
+BATCH_VALIDATION_PATH = '/v2.0/OS-KSVALIDATE/tokens/validate'
+
+
+class LocalTokenCache(object):
+    """ Bounded in-process LRU cache of token validation results
+
+    Sits in front of memcache so hot tokens are validated without any network
+    call. Valid tokens are kept until they expire or for `ttl` seconds,
+    whichever comes first; invalid tokens for only `negative_ttl` seconds.
+    """
+    def __init__(self, max_size, ttl=LOCAL_CACHE_TTL,
+                 negative_ttl=LOCAL_CACHE_NEGATIVE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = lru.LRUDict()  # token -> (deadline, cached claims)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token):
+        """ Returns (claims, expires, valid) for the token, or None """
+        with self._lock:
+            entry = self._entries.pop(token, None)
+            if entry is None or entry[0] <= time.time():
+                self.misses += 1
+                return None
+            self._entries[token] = entry
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token, claims, expires, valid):
+        now = time.time()
+        if valid:
+            deadline = min(expires, now + self.ttl)
+        else:
+            deadline = now + self.negative_ttl
+        if deadline <= now:
+            return
+        with self._lock:
+            self._entries.pop(token, None)
+            self._entries[token] = (deadline, (claims, expires, valid))
+            while len(self._entries) > self.max_size:
+                self._entries.pop_oldest()
+
+    def evict(self, token):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def stats(self):
+        """ Returns the hit and miss counters and current size """
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._entries)}
 
 
 class ValidationFailed(Exception):
@@ -135,6 +205,11 @@ class KeystoneUnreachable(Exception):
     pass
 
 
+class BatchUnavailable(Exception):
+    """Keystone did not validate a batch; validate the tokens one by one"""
+    pass
+
+
 class AuthProtocol(object):
     """Auth Middleware that handles authenticating client calls"""
 
@@ -174,6 +249,13 @@ class AuthProtocol(object):
         # through and we let the downstream service make the final decision
         self.delay_auth_decision = int(conf.get('delay_auth_decision', 0))
 
+        # keep-alive connections to Keystone and the remote service
+        self.http_pool = bufferedhttp.HTTPConnectionPool(
+            max_size=conf.get('http_pool_size',
+                              bufferedhttp.DEFAULT_POOL_SIZE),
+            idle_timeout=conf.get('http_pool_idle_timeout',
+                                  bufferedhttp.DEFAULT_IDLE_TIMEOUT))
+
     def _init_protocol(self, conf):
         """ Protocol specific initialization """
 
@@ -206,6 +288,44 @@ class AuthProtocol(object):
         if self.memcache_hosts:
             if self.cache is None:
                 self.cache = "keystone.cache"
+            # Only imported if the configuration calls for memcache
+            from keystone.common import memcache_pool
+
+            # One pool per middleware instance, so connections to memcached
+            # are reused across requests instead of opened for each one
+            self.memcache_pool = memcache_pool.MemcacheClientPool(
+                self.memcache_hosts,
+                pool_size=conf.get('memcache_pool_size',
+                                   memcache_pool.DEFAULT_POOL_SIZE),
+                dead_retry=conf.get('memcache_dead_retry',
+                                    memcache_pool.DEFAULT_DEAD_RETRY),
+                socket_timeout=conf.get('memcache_socket_timeout',
+                                        memcache_pool.DEFAULT_SOCKET_TIMEOUT))
+        # Optional in-process tier in front of memcache
+        local_cache_size = int(conf.get('local_cache_size', 0))
+        if local_cache_size > 0:
+            self.local_cache = LocalTokenCache(local_cache_size,
+                ttl=float(conf.get('local_cache_ttl', LOCAL_CACHE_TTL)),
+                negative_ttl=float(conf.get('local_cache_negative_ttl',
+                                            LOCAL_CACHE_NEGATIVE_TTL)))
+        # Keys shared with Keystone (its token_signing_key_file) to verify
+        # signed tokens locally. Role filtering by service_ids needs Keystone,
+        # so signed tokens are only verified locally without them.
+        signing_key_file = conf.get('signing_key_file')
+        if signing_key_file and not self.service_id_querystring:
+            self.signing_keys = signing.KeyFile(signing_key_file)
+        # Poll Keystone for revoked tokens, so that they are rejected even
+        # while cached
+        self.revocation_poll_interval = float(
+            conf.get('revocation_poll_interval', 0))
+        # Validate the tokens missing from the cache within this many
+        # seconds of each other with one call to Keystone. Needs the
+        # OS-KSVALIDATE extension, and does not take service_ids.
+        if not self.service_id_querystring:
+            self.validation_batch_window = float(
+                conf.get('validation_batch_window', 0))
+        self.validation_batch_size = int(
+            conf.get('validation_batch_size', VALIDATION_BATCH_SIZE))
         self.tested_for_osksvalidate = False
         self.last_test_for_osksvalidate = None
         self.osksvalidate = self._supports_osksvalidate()
@@ -243,20 +363,32 @@ class AuthProtocol(object):
         self.last_test_for_osksvalidate = None
         self.cache = None
         self.memcache_hosts = None
+        self.memcache_pool = None
+        self.local_cache = None
+        self.signing_keys = None
+        self.http_pool = None
+        self.revocation_poll_interval = None
+        # revoked token id -> expiry timestamp, see _poll_revocations
+        self.revoked_tokens = {}
+        self.revocation_marker = None
+        self.last_revocation_poll = None
+        self._polling_revocations = False
+        # token -> Event for validations in progress, see _verify_claims
+        self._validations = {}
+        self.validation_batch_window = 0
+        self.validation_batch_size = None
+        # (token, env, Event) of the validations waiting for the next batch
+        self._batch = None
         self._init_protocol_common(app, conf)  # Applies to all protocols
         self._init_protocol(conf)  # Specific to this protocol
 
     def __call__(self, env, start_response):
         """ Handle incoming request. Authenticate. And send downstream. """
         logger.debug("entering AuthProtocol.__call__")
-        # Initialize caching client
-        if self.memcache_hosts:
-            # This will only be used if the configuration calls for memcache
-            import memcache
-
+        # Use our memcache pool unless the pipeline provided a cache
+        if self.memcache_pool is not None:
             if env.get(self.cache, None) is None:
-                memcache_client = memcache.Client([self.memcache_hosts])
-                env[self.cache] = memcache_client
+                env[self.cache] = self.memcache_pool
 
         # Check if we're set up to use OS-KSVALIDATE periodically if not on
         if self.tested_for_osksvalidate != True:
@@ -270,6 +402,13 @@ class AuthProtocol(object):
                 except (httplib.HTTPException, StandardError):
                     pass
 
+        if self.revocation_poll_interval and not self._polling_revocations:
+            if self.last_revocation_poll is None or \
+                    (time.time() - self.last_revocation_poll) >= \
+                    self.revocation_poll_interval:
+                self._polling_revocations = True
+                eventlet.spawn_n(self._poll_revocations, self._cache(env))
+
         #Prep headers to forward request to local or remote downstream service
         proxy_headers = env.copy()
         for header in proxy_headers.iterkeys():
@@ -363,9 +502,12 @@ class AuthProtocol(object):
 
     def _cache_put(self, env, token, claims, valid):
         """ Put a claim into the cache """
+        if self.local_cache is not None and claims:
+            self.local_cache.put(token, claims,
+                                 self._convert_date(claims['expires']), valid)
         cache = self._cache(env)
         if cache and claims:
-            key = 'tokens/%s' % (token)
+            key = self._cache_key(token)
             if "timeout" in cache.set.func_code.co_varnames:
                 # swift cache
                 expires = self._convert_date(claims['expires'])
@@ -387,7 +529,7 @@ class AuthProtocol(object):
         from cache """
         cache = self._cache(env)
         if cache:
-            key = 'tokens/%s' % (token)
+            key = self._cache_key(token)
             cached_claims = cache.get(key)
             if cached_claims:
                 claims, expires, valid = cached_claims
@@ -401,6 +543,12 @@ class AuthProtocol(object):
                 return (claims, expires, valid)
         return None
 
+    @staticmethod
+    def _cache_key(token):
+        """ Memcache key of a token; hashed, as signed tokens are longer
+        than the 250 bytes memcache allows in a key """
+        return 'tokens/%s' % hashlib.sha1(token).hexdigest()
+
     def _cache(self, env):
         """ Return a cache to use for token caching, or none """
         if self.cache is not None:
@@ -449,21 +597,36 @@ class AuthProtocol(object):
                     }
                    }
                   }
-        if self.auth_protocol == "http":
-            conn = httplib.HTTPConnection(self.auth_host, self.auth_port)
-        else:
-            conn = httplib.HTTPSConnection(self.auth_host, self.auth_port,
-                cert_file=self.cert_file)
-        conn.request("POST", self._build_token_uri(), json.dumps(params),
-            headers=headers)
-        response = conn.getresponse()
+        response = self.http_pool.request(self.auth_host, self.auth_port,
+                                          "POST", self._build_token_uri(),
+                                          body=json.dumps(params),
+                                          headers=headers,
+                                          ssl=(self.auth_protocol == 'https'),
+                                          key_file=self.key_file,
+                                          cert_file=self.cert_file,
+                                          timeout=self.auth_timeout)
         data = response.read()
         return data
 
-    def _verify_claims(self, env, claims, retry=True):
+    def _verify_claims(self, env, claims):
         """Verify claims and extract identity information, if applicable."""
 
-        cached_claims = self._cache_get(env, claims)
+        if self._is_revoked(claims):
+            logger.debug("Claims (token) revoked")
+            raise ValidationFailed()
+
+        if self.signing_keys is not None and signing.is_signed(claims):
+            verified_claims = self._verify_signed_claims(claims)
+            if verified_claims is not None:
+                return verified_claims
+
+        cached_claims = None
+        if self.local_cache is not None:
+            cached_claims = self.local_cache.get(claims)
+        if cached_claims is None:
+            cached_claims = self._cache_get(env, claims)
+            if cached_claims and self.local_cache is not None:
+                self.local_cache.put(claims, *cached_claims)
         if cached_claims:
             logger.debug("Found cached claims")
             claims, expires, valid = cached_claims
@@ -475,13 +638,128 @@ class AuthProtocol(object):
                 raise TokenExpired()
             return claims
 
-        # Step 1: We need to auth with the keystone service, so get an
-        # admin token
+        # Coalesce concurrent validations of the same token: the first
+        # request asks Keystone, the others wait for and share its result
+        waiter = self._validations.get(claims)
+        if waiter is not None:
+            logger.debug("Waiting on in-flight validation of claims")
+            return waiter.wait()
+
+        waiter = self._validations[claims] = event.Event()
+        try:
+            if self.validation_batch_window and self.osksvalidate:
+                verified_claims = self._validate_claims_batched(env, claims)
+            else:
+                verified_claims = self._validate_claims(env, claims)
+        except:  # pylint: disable=W0702
+            waiter.send_exception(*sys.exc_info())
+            raise
+        else:
+            waiter.send(verified_claims)
+            return verified_claims
+        finally:
+            del self._validations[claims]
+
+    def _verify_signed_claims(self, claims):
+        """Verify a signed token locally, without calling Keystone
+
+        Returns None if the signature cannot be checked, perhaps because
+        Keystone signs with a key not yet in our key file, leaving the
+        token to be validated by Keystone.
+        """
+        try:
+            signed_claims = signing.verify(self.signing_keys, claims)
+            verified_claims = {
+                'user': signed_claims['user'],
+                'tenant': signed_claims['tenant'],
+                'roles': signed_claims['roles'],
+                'expires': signed_claims['expires']}
+        except (signing.InvalidToken, KeyError, TypeError) as exc:
+            logger.debug("Could not verify signed claims locally: %s" % exc)
+            return None
+        if self._convert_date(verified_claims['expires']) <= time.time():
+            logger.debug("Signed claims (token) expired")
+            raise TokenExpired()
+        logger.debug("Signed claims verified locally")
+        return verified_claims
+
+    def _ensure_admin_token(self):
+        """Get an admin token to call Keystone with, if we have none"""
         if not self.admin_token:
             auth = self._get_admin_auth_token(self.admin_user,
                                                   self.admin_password)
             self.admin_token = json.loads(auth)["access"]["token"]["id"]
 
+    def _is_revoked(self, token):
+        """Whether Keystone told us the token was revoked"""
+        if not self.revoked_tokens:
+            return False
+        if signing.is_signed(token):
+            # revocations name the token Keystone stored
+            token = signing.unverified_id(token)
+        return token in self.revoked_tokens
+
+    def _poll_revocations(self, cache=None):
+        """Fetch the tokens revoked since the last poll, and forget them"""
+        try:
+            while True:
+                revoked = self._fetch_revocations()
+                if revoked is None:
+                    break
+                now = time.time()
+                for token in revoked['tokens']:
+                    expires = self._convert_date(token['expires'])
+                    if expires <= now:
+                        continue
+                    self.revoked_tokens[token['id']] = expires
+                    if self.local_cache is not None:
+                        self.local_cache.evict(token['id'])
+                    if cache is not None and hasattr(cache, 'delete'):
+                        cache.delete(self._cache_key(token['id']))
+                self.revocation_marker = revoked.get('marker',
+                                                     self.revocation_marker)
+                if len(revoked['tokens']) < REVOCATION_PAGE_SIZE:
+                    break
+            now = time.time()
+            for token, expires in self.revoked_tokens.items():
+                if expires <= now:
+                    del self.revoked_tokens[token]
+        except (httplib.HTTPException, StandardError):
+            logger.exception("Failed to fetch revoked tokens")
+        finally:
+            self.last_revocation_poll = time.time()
+            self._polling_revocations = False
+
+    def _fetch_revocations(self):
+        """Returns the next page of revoked tokens, or None on failure"""
+        self._ensure_admin_token()
+        path = '/v2.0/tokens/revoked?limit=%d' % REVOCATION_PAGE_SIZE
+        if self.revocation_marker is not None:
+            path += '&marker=%s' % urllib.quote(str(self.revocation_marker))
+        headers = {"Accept": "application/json",
+                   "X-Auth-Token": self.admin_token}
+        resp = self.http_pool.request(self.auth_host, self.auth_port,
+                                      'GET', path,
+                                      headers=headers,
+                                      ssl=(self.auth_protocol == 'https'),
+                                      key_file=self.key_file,
+                                      cert_file=self.cert_file,
+                                      timeout=self.auth_timeout)
+        data = resp.read()
+        if not str(resp.status).startswith('20'):
+            logger.warning("Keystone returned %s when asked for revoked "
+                           "tokens" % resp.status)
+            # perhaps our admin token expired; get another one next time
+            self.admin_token = None
+            return None
+        return json.loads(data)['revokedTokens']
+
+    def _validate_claims(self, env, claims, retry=True):
+        """Validate claims with Keystone and cache the result"""
+        # Step 1: We need to auth with the keystone service, so get an
+        # admin token
+        self._ensure_admin_token()
+
         # Step 2: validate the user's token with the auth service
         # since this is a priviledged op,m we need to auth ourselves
         # by using an admin token
@@ -501,14 +779,13 @@ class AuthProtocol(object):
                     self.auth_protocol, self.auth_host, self.auth_port))
 
         try:
-            conn = http_connect(self.auth_host, self.auth_port, 'GET',
-                                path,
-                                headers=headers,
-                                ssl=(self.auth_protocol == 'https'),
-                                key_file=self.key_file,
-                                cert_file=self.cert_file,
-                                timeout=self.auth_timeout)
-            resp = conn.getresponse()
+            resp = self.http_pool.request(self.auth_host, self.auth_port,
+                                          'GET', path,
+                                          headers=headers,
+                                          ssl=(self.auth_protocol == 'https'),
+                                          key_file=self.key_file,
+                                          cert_file=self.cert_file,
+                                          timeout=self.auth_timeout)
             data = resp.read()
         except EnvironmentError as exc:
             if exc.errno == errno.ECONNREFUSED:
@@ -524,24 +801,17 @@ class AuthProtocol(object):
 
         logger.debug("Response received: %s" % resp.status)
         if not str(resp.status).startswith('20'):
-            # Cache it if there is a cache available
-            if self.cache:
-                logger.debug("Caching that results were invalid")
-                self._cache_put(env, claims,
-                                claims={'expires':
-                                datetime.strftime(time.time(),
-                                                  EXPIRE_TIME_FORMAT)},
-                                valid=False)
             if retry:
                 self.admin_token = None
-                return self._verify_claims(env, claims, False)
+                return self._validate_claims(env, claims, False)
             else:
-                # Keystone rejected claim
-                logger.debug("Failing the validation")
-                raise ValidationFailed()
+                # Keystone rejected claim; cache it if there is a cache
+                self._reject_invalid_claims(env, claims)
 
-        token_info = json.loads(data)
+        return self._accept_claims(env, claims, json.loads(data))
 
+    def _accept_claims(self, env, claims, token_info):
+        """Cache and return the claims Keystone validated the token with"""
         roles = [role['name'] for role in token_info[
             "access"]["user"]["roles"]]
 
@@ -578,18 +848,116 @@ class AuthProtocol(object):
             logger.debug("Claims (token) expired: %s" % str(expires))
             # Cache it if there is a cache available (we also cached bad
             # claims)
-            if self.cache:
-                logger.debug("Caching expired claim (token)")
-                self._cache_put(env, claims, verified_claims, valid=False)
+            logger.debug("Caching expired claim (token)")
+            self._cache_put(env, claims, verified_claims, valid=False)
             raise TokenExpired()
 
         # Cache it if there is a cache available
-        if self.cache:
-            logger.debug("Caching validated claim")
-            self._cache_put(env, claims, verified_claims, valid=True)
+        logger.debug("Caching validated claim")
+        self._cache_put(env, claims, verified_claims, valid=True)
         logger.debug("Returning successful validation")
         return verified_claims
 
+    def _reject_invalid_claims(self, env, claims):
+        """Cache that Keystone rejected the token, and fail"""
+        logger.debug("Caching that results were invalid")
+        self._cache_put(env, claims,
+                        claims={'expires':
+                        datetime.now().strftime(EXPIRE_TIME_FORMAT)},
+                        valid=False)
+        logger.debug("Failing the validation")
+        raise ValidationFailed()
+
+    def _validate_claims_batched(self, env, claims):
+        """Validate claims with Keystone along with the other tokens missed
+        within validation_batch_window seconds"""
+        batch = self._batch
+        if batch is None:
+            batch = self._batch = []
+            eventlet.spawn_after(self.validation_batch_window,
+                                 self._send_batch, batch)
+        waiter = event.Event()
+        batch.append((claims, env, waiter))
+        if len(batch) >= self.validation_batch_size:
+            self._send_batch(batch)
+        # Sending the batch may also fetch an admin token and retry once
+        timeout = None
+        if self.auth_timeout:
+            timeout = self.validation_batch_window + 3 * self.auth_timeout
+        try:
+            with eventlet.Timeout(timeout, BatchUnavailable()):
+                return waiter.wait()
+        except BatchUnavailable:
+            return self._validate_claims(env, claims)
+
+    def _send_batch(self, batch):
+        """Validate a batch of claims, unless it was sent already"""
+        if self._batch is not batch:
+            return
+        self._batch = None
+        try:
+            results = self._request_batch_validation(
+                [claims for claims, _env, _waiter in batch])
+        except:  # pylint: disable=W0702
+            for _claims, _env, waiter in batch:
+                waiter.send_exception(*sys.exc_info())
+            return
+        for claims, env, waiter in batch:
+            token_info = results.get(claims)
+            try:
+                if token_info is None:
+                    raise BatchUnavailable()
+                if 'access' not in token_info:
+                    self._reject_invalid_claims(env, claims)
+                waiter.send(self._accept_claims(env, claims, token_info))
+            except:  # pylint: disable=W0702
+                # every waiter must be woken, whatever went wrong
+                waiter.send_exception(*sys.exc_info())
+
+    def _request_batch_validation(self, tokens, retry=True):
+        """Returns what Keystone answered for each token, by token"""
+        self._ensure_admin_token()
+        headers = {"Content-type": "application/json",
+                   "Accept": "application/json",
+                   "X-Auth-Token": self.admin_token}
+        body = json.dumps({"tokens": [{"id": token} for token in tokens]})
+        logger.debug("Connecting to %s://%s:%s to check %d claims" % (
+                self.auth_protocol, self.auth_host, self.auth_port,
+                len(tokens)))
+        try:
+            resp = self.http_pool.request(self.auth_host, self.auth_port,
+                                          'POST', BATCH_VALIDATION_PATH,
+                                          body=body,
+                                          headers=headers,
+                                          ssl=(self.auth_protocol == 'https'),
+                                          key_file=self.key_file,
+                                          cert_file=self.cert_file,
+                                          timeout=self.auth_timeout)
+            data = resp.read()
+        except EnvironmentError as exc:
+            if exc.errno == errno.ECONNREFUSED:
+                logger.error("Keystone server not responding on %s://%s:%s "
+                             "to check claims" % (self.auth_protocol,
+                                                  self.auth_host,
+                                                  self.auth_port))
+                raise KeystoneUnreachable("Unable to connect to authentication"
+                                          " server")
+            raise
+
+        logger.debug("Response received: %s" % resp.status)
+        if resp.status in (404, 405, 501):
+            logger.warning("Keystone cannot validate tokens in batches; "
+                           "validating them one at a time")
+            self.validation_batch_window = 0
+            raise BatchUnavailable()
+        if not str(resp.status).startswith('20'):
+            if retry:
+                self.admin_token = None
+                return self._request_batch_validation(tokens, False)
+            raise BatchUnavailable()
+        return dict((token_info['id'], token_info)
+                    for token_info in json.loads(data)['tokens'])
+
     @staticmethod
     def _decorate_request(index, value, env, proxy_headers):
         """Add headers to request"""
@@ -614,14 +982,14 @@ class AuthProtocol(object):
             parsed = urlparse(req.url)
 
             # pylint: disable=E1101
-            conn = http_connect(self.service_host,
-                                self.service_port,
-                                req.method,
-                                parsed.path,
-                                proxy_headers,
-                                ssl=(self.service_protocol == 'https'),
-                                timeout=self.service_timeout)
-            resp = conn.getresponse()
+            resp = self.http_pool.request(self.service_host,
+                                          self.service_port,
+                                          req.method,
+                                          parsed.path,
+                                          headers=proxy_headers,
+                                          ssl=(self.service_protocol ==
+                                               'https'),
+                                          timeout=self.service_timeout)
             data = resp.read()
             logger.debug("Response was %s" % resp.status)
 
@@ -649,14 +1017,13 @@ class AuthProtocol(object):
                 self.auth_protocol, self.auth_host, self.auth_port))
         try:
             self.last_test_for_osksvalidate = time.time()
-            conn = http_connect(self.auth_host, self.auth_port, 'GET',
-                                '/v2.0/extensions/',
-                                headers=headers,
-                                ssl=(self.auth_protocol == 'https'),
-                                key_file=self.key_file,
-                                cert_file=self.cert_file,
-                                timeout=self.auth_timeout)
-            resp = conn.getresponse()
+            resp = self.http_pool.request(self.auth_host, self.auth_port,
+                                          'GET', '/v2.0/extensions/',
+                                          headers=headers,
+                                          ssl=(self.auth_protocol == 'https'),
+                                          key_file=self.key_file,
+                                          cert_file=self.cert_file,
+                                          timeout=self.auth_timeout)
             data = resp.read()
 
             logger.debug("Response received: %s" % resp.status)
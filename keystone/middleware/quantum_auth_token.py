@@ -68,14 +68,13 @@ HTTP_X_AUTHORIZATION
 
 """
 
-import httplib
 import json
 import logging
 import urllib
 from urlparse import urlparse
 from webob.exc import HTTPUnauthorized, Request, Response
 
-from keystone.common.bufferedhttp import http_connect_raw as http_connect
+from keystone.common import bufferedhttp
 
 PROTOCOL_NAME = "Quantum Token Authentication"
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
@@ -109,6 +108,13 @@ class AuthProtocol(object):
         # through and we let the downstream service make the final decision
         self.delay_auth_decision = int(conf.get('delay_auth_decision', 0))
 
+        # keep-alive connections to Keystone and the remote service
+        self.http_pool = bufferedhttp.HTTPConnectionPool(
+            max_size=conf.get('http_pool_size',
+                              bufferedhttp.DEFAULT_POOL_SIZE),
+            idle_timeout=conf.get('http_pool_idle_timeout',
+                                  bufferedhttp.DEFAULT_IDLE_TIMEOUT))
+
     def _init_protocol(self, _app, conf):
         """ Protocol specific initialization """
 
@@ -172,6 +178,7 @@ class AuthProtocol(object):
         self.delay_auth_decision = None
         self.expanded = None
         self.claims = None
+        self.http_pool = None
 
         self._init_protocol_common(app, conf)  # Applies to all protocols
         self._init_protocol(app, conf)  # Specific to this protocol
@@ -281,14 +288,14 @@ class AuthProtocol(object):
                     }
                    }
                   }
-        if self.auth_protocol == "http":
-            conn = httplib.HTTPConnection(self.auth_host, self.auth_port)
-        else:
-            conn = httplib.HTTPSConnection(self.auth_host, self.auth_port,
-                cert_file=self.cert_file)
-        conn.request("POST", self._build_token_uri(), json.dumps(params), \
-            headers=headers)
-        response = conn.getresponse()
+        response = self.http_pool.request(self.auth_host, self.auth_port,
+                                          "POST", self._build_token_uri(),
+                                          body=json.dumps(params),
+                                          headers=headers,
+                                          ssl=(self.auth_protocol == 'https'),
+                                          key_file=self.key_file,
+                                          cert_file=self.cert_file,
+                                          timeout=self.auth_timeout)
         data = response.read()
         return data
 
@@ -329,14 +336,13 @@ class AuthProtocol(object):
         headers = {"Content-type": "application/json",
                     "Accept": "application/json",
                     "X-Auth-Token": self.admin_token}
-        conn = http_connect(self.auth_host, self.auth_port, 'GET',
-                            self._build_token_uri(claims), headers=headers,
-                            ssl=(self.auth_protocol == 'https'),
-                            key_file=self.key_file, cert_file=self.cert_file,
-                            timeout=self.auth_timeout)
-        resp = conn.getresponse()
-        # pylint: disable=E1103
-        conn.close()
+        resp = self.http_pool.request(self.auth_host, self.auth_port, 'GET',
+                                      self._build_token_uri(claims),
+                                      headers=headers,
+                                      ssl=(self.auth_protocol == 'https'),
+                                      key_file=self.key_file,
+                                      cert_file=self.cert_file,
+                                      timeout=self.auth_timeout)
 
         if not str(resp.status).startswith('20'):
             # Keystone rejected claim
@@ -365,16 +371,14 @@ class AuthProtocol(object):
         headers = {"Content-type": "application/json",
                     "Accept": "application/json",
                     "X-Auth-Token": self.admin_token}
-        conn = http_connect(self.auth_host, self.auth_port, 'GET',
-                            self._build_token_uri(self.claims),
-                            headers=headers,
-                            ssl=(self.auth_protocol == 'https'),
-                            key_file=self.key_file, cert_file=self.cert_file,
-                            timeout=self.auth_timeout)
-        resp = conn.getresponse()
+        resp = self.http_pool.request(self.auth_host, self.auth_port, 'GET',
+                                      self._build_token_uri(self.claims),
+                                      headers=headers,
+                                      ssl=(self.auth_protocol == 'https'),
+                                      key_file=self.key_file,
+                                      cert_file=self.cert_file,
+                                      timeout=self.auth_timeout)
         data = resp.read()
-        # pylint: disable=E1103
-        conn.close()
 
         if not str(resp.status).startswith('20'):
             raise LookupError('Unable to locate claims: %s' % resp.status)
@@ -433,13 +437,13 @@ class AuthProtocol(object):
             req = Request(self.proxy_headers)
             # pylint: disable=E1101
             parsed = urlparse(req.url)
-            conn = http_connect(self.service_host,
-                                self.service_port,
-                                req.method,
-                                parsed.path,
-                                self.proxy_headers,
-                                ssl=(self.service_protocol == 'https'))
-            resp = conn.getresponse()
+            resp = self.http_pool.request(self.service_host,
+                                          self.service_port,
+                                          req.method,
+                                          parsed.path,
+                                          headers=self.proxy_headers,
+                                          ssl=(self.service_protocol ==
+                                               'https'))
             data = resp.read()
             return Response(status=resp.status, body=data)(self.proxy_headers,
                                                            self.start_response)
@@ -25,11 +25,12 @@ Starting point for routing S3 requests.
 
 """
 
-import httplib
 import json
 from webob.dec import wsgify
 from urlparse import urlparse
 
+from keystone.common import bufferedhttp
+
 PROTOCOL_NAME = "S3 Token Authentication"
 
 
@@ -45,6 +46,13 @@ class S3Token(object):
         #if app is set, then we are in a WSGI pipeline and requests get passed
         # on to app. If it is not set, this component should forward requests
 
+        # keep-alive connections to Keystone
+        self.http_pool = bufferedhttp.HTTPConnectionPool(
+            max_size=conf.get('http_pool_size',
+                              bufferedhttp.DEFAULT_POOL_SIZE),
+            idle_timeout=conf.get('http_pool_idle_timeout',
+                                  bufferedhttp.DEFAULT_IDLE_TIMEOUT))
+
     def _init_protocol(self, conf):
         """ Protocol specific initialization """
 
@@ -66,10 +74,6 @@ class S3Token(object):
 
     def __init__(self, app, conf):
         """ Common initialization code """
-
-        #TODO(ziad): maybe we refactor this into a superclass
-        self._init_protocol_common(app, conf)  # Applies to all protocols
-        self._init_protocol(conf)  # Specific to this protocol
         self.app = None
         self.auth_port = None
         self.auth_protocol = None
@@ -77,6 +81,11 @@ class S3Token(object):
         self.auth_host = None
         self.admin_token = None
         self.conf = None
+        self.http_pool = None
+
+        #TODO(ziad): maybe we refactor this into a superclass
+        self._init_protocol_common(app, conf)  # Applies to all protocols
+        self._init_protocol(conf)  # Specific to this protocol
 
     #@webob.dec.wsgify(RequestClass=webob.exc.Request)
     # pylint: disable=R0914
@@ -121,14 +130,11 @@ class S3Token(object):
 
         creds_json = json.dumps(creds)
         headers = {'Content-Type': 'application/json'}
-        if self.auth_protocol == 'http':
-            conn = httplib.HTTPConnection(self.auth_host, self.auth_port)
-        else:
-            conn = httplib.HTTPSConnection(self.auth_host, self.auth_port)
-
-        conn.request('POST', '/v2.0/tokens', body=creds_json, headers=headers)
-        response = conn.getresponse().read()
-        conn.close()
+        response = self.http_pool.request(self.auth_host, self.auth_port,
+                                          'POST', '/v2.0/tokens',
+                                          body=creds_json, headers=headers,
+                                          ssl=(self.auth_protocol == 'https'))
+        response = response.read()
 
         # NOTE(vish): We could save a call to keystone by
         #             having keystone return token, tenant,
@@ -45,6 +45,10 @@ class AdminApi(wsgi.Router):
         mapper.connect("/tokens", controller=auth_controller,
                        action="authenticate",
                        conditions=dict(method=["POST"]))
+        # before /tokens/{token_id}, which would match it too
+        mapper.connect("/tokens/revoked", controller=auth_controller,
+                        action="get_revoked_tokens",
+                        conditions=dict(method=["GET"]))
         mapper.connect("/tokens/{token_id}", controller=auth_controller,
                         action="validate_token",
                         conditions=dict(method=["GET"]))
@@ -53,8 +53,17 @@ HTTP_X_AUTHORIZATION
 
 # pylint: disable=W0613
 
+import errno
 import logging
+import os
+import signal
+import time
 
+import eventlet
+from eventlet import hubs
+from eventlet import tpool
+
+from keystone import backends
 from keystone import config
 from keystone.common import config as common_config
 from keystone.common import wsgi
@@ -76,6 +85,55 @@ def admin_app_factory(global_conf, **local_conf):
     return AdminApi()
 
 
+# Only one purge greenthread per process, however many servers it runs
+_TOKEN_PURGER = None
+
+
+def _purge_tokens_forever(interval, batch_size, pause):
+    # Imported here so the backends are configured by the time we need them
+    from keystone.managers.token import Manager as TokenManager
+
+    while True:
+        eventlet.sleep(interval)
+        try:
+            purged, elapsed = TokenManager().purge_expired(
+                batch_size=batch_size, pause=pause)
+            logger.info("Purged %s expired tokens in %.2f seconds" %
+                        (purged, elapsed))
+        except NotImplementedError:
+            logger.warn("Token backend does not support purging expired "
+                        "tokens; stopping the token purger")
+            return
+        except Exception:  # pylint: disable=W0703
+            logger.exception("Failed to purge expired tokens")
+
+
+def start_token_purger():
+    """Starts the background expired-token purge, if configured
+
+    Runs every `token_purge_interval` seconds; a missing or zero interval
+    leaves it disabled.
+    """
+    global _TOKEN_PURGER  # pylint: disable=W0603
+    interval = int(CONF.token_purge_interval or 0)
+    if interval <= 0 or _TOKEN_PURGER is not None:
+        return
+    batch_size = int(CONF.token_purge_batch_size or 1000)
+    pause = float(CONF.token_purge_batch_pause or 0)
+    logger.info("Purging expired tokens every %s seconds (batch size %s)" %
+                (interval, batch_size))
+    _TOKEN_PURGER = eventlet.spawn(_purge_tokens_forever, interval,
+                                   batch_size, pause)
+
+
+def stop_token_purger():
+    """Stops the background expired-token purge, if running"""
+    global _TOKEN_PURGER  # pylint: disable=W0603
+    if _TOKEN_PURGER is not None:
+        _TOKEN_PURGER.kill()
+        _TOKEN_PURGER = None
+
+
 # pylint: disable=R0902
 class Server():
     """Used to start and stop Keystone servers
@@ -107,16 +165,20 @@ class Server():
         self.host = None
         self.protocol = None
         self.options = CONF.to_dict()
+        self.conf = None
+        self.app = None
+        self.socket = None
 
-    def start(self, host=None, port=None, wait=True):
-        """Starts the Keystone server
+    def listen(self, host=None, port=None):
+        """Loads the application and binds the listening socket
+
+        Called by start(); call it first to share the socket with worker
+        processes forked afterwards (see run_workers).
 
         :param host: the IP address to listen on
         :param port: the TCP/IP port to listen on
-        :param wait: whether to wait (block) for the server to terminate or
-            return to the caller without waiting
         """
-        logger.debug("Starting API server")
+        logger.debug("Loading API server")
         conf, app = common_config.load_paste_app(self.config, self.options,
                 self.args)
 
@@ -139,6 +201,25 @@ class Server():
             host = CONF.bind_host or CONF.service_host or "0.0.0.0"
 
         self.key = "%s-%s:%s" % (self.name, host, port)
+        self.conf = conf
+        self.app = app
+        self.socket = eventlet.listen((host, port), backlog=128)
+        self.port = port
+        self.host = host
+
+    def start(self, host=None, port=None, wait=True):
+        """Starts the Keystone server
+
+        :param host: the IP address to listen on
+        :param port: the TCP/IP port to listen on
+        :param wait: whether to wait (block) for the server to terminate or
+            return to the caller without waiting
+        """
+        logger.debug("Starting API server")
+        if self.socket is None:
+            self.listen(host, port)
+        conf, app = self.conf, self.app
+        host, port = self.host, self.port
 
         # Safely get SSL options
         service_ssl = CONF.service_ssl in [True, "True", "1"]
@@ -156,20 +237,20 @@ class Server():
                          certfile=certfile, keyfile=keyfile,
                          ca_certs=ca_certs,
                          cert_required=cert_required,
-                         key=self.key)
+                         key=self.key, sock=self.socket)
             self.protocol = 'https'
         else:
             self.server = wsgi.Server()
             self.server.start(app, port, host,
-                              key="%s-%s:%s" % (self.config, host, port))
+                              key="%s-%s:%s" % (self.config, host, port),
+                              sock=self.socket)
             self.protocol = 'http'
 
-        self.port = port
-        self.host = host
-
         logger.info("%s listening on %s://%s:%s" % (
             self.name, ['http', 'https'][service_ssl], host, port))
 
+        start_token_purger()
+
         # Wait until done
         if wait:
             self.server.wait()
@@ -184,3 +265,92 @@ class Server():
                 logger.debug("Killing %s" % self.key)
                 self.server.threads[self.key].kill()
             self.server = None
+        self.socket = None
+        stop_token_purger()
+
+
+def get_workers():
+    """Returns the number of worker processes to fork; 0 means none"""
+    return int(CONF.workers or 0)
+
+
+def _run_worker(index, servers):
+    """Serves the servers' bound sockets in a freshly forked process"""
+    # The parent's hub and native threads are no use here: its epoll
+    # instance is shared with every other child, and threads do not
+    # survive a fork
+    hubs.use_hub()
+    # pylint: disable=W0212
+    tpool._setup_already = False
+    del tpool._threads[:]
+    backends.reset_after_fork()
+
+    for server in servers:
+        server.start(wait=False)
+    if index != 0:
+        # one expired-token purger is enough for the whole node
+        stop_token_purger()
+    servers[-1].server.wait()
+
+
+def run_workers(servers, workers):
+    """Serves the servers from `workers` forked processes
+
+    Each server must already be bound (see Server.listen); every worker
+    serves all of them from the shared sockets. Workers that die are
+    replaced. SIGTERM, SIGINT and SIGHUP are passed on to the workers, and
+    the call returns once they have all exited.
+    """
+    children = {}  # pid -> (worker index, start time)
+    running = [True]
+
+    def on_signal(signum, frame):
+        running[0] = False
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                pass
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(signum, signal.SIG_DFL)
+            status = 0
+            try:
+                _run_worker(index, servers)
+            except Exception:  # pylint: disable=W0703
+                logger.exception("Worker %s failed" % index)
+                status = 1
+            finally:
+                os._exit(status)  # pylint: disable=W0212
+        logger.info("Started worker %s (pid %s)" % (index, pid))
+        children[pid] = (index, time.time())
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, on_signal)
+    for index in range(workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except OSError, e:
+            if e.errno == errno.EINTR:
+                continue
+            if e.errno == errno.ECHILD:
+                break
+            raise
+        if pid not in children:
+            continue
+        index, started = children.pop(pid)
+        if not running[0]:
+            continue
+        logger.error("Worker %s (pid %s) exited with status %s; restarting" %
+                     (index, pid, status))
+        if time.time() - started < 1:
+            # do not spin on a worker that dies as soon as it starts
+            time.sleep(1)
+        if running[0]:
+            spawn(index)
@@ -9,6 +9,7 @@ import uuid
 from webob import Request, Response
 from xml.etree import ElementTree
 
+from keystone import backends
 from keystone import server
 import keystone.backends.api as db_api
 from keystone.test import client as client_tests
@@ -229,9 +230,9 @@ class ApiTestCase(RestfulTestCase):
             'backend_entities':
                 "['UserRoleAssociation', 'Endpoints', 'Role', 'Tenant', "
                 "'Tenant', 'User', 'Credentials', 'EndpointTemplates', "
-                "'Token', 'Service']",
+                "'Token', 'Service', 'TokenRevocation']",
         },
-        'extensions': 'osksadm, oskscatalog, hpidm',
+        'extensions': 'osksadm, oskscatalog, hpidm, osksvalidate',
         'keystone-admin-role': 'Admin',
         'keystone-service-admin-role': 'KeystoneServiceAdmin',
         'hash-password': 'True',
@@ -320,6 +321,9 @@ class ApiTestCase(RestfulTestCase):
         if self.use_server:
             return
 
+        # Backends are shared by the whole process; start each test with a
+        # fresh (in-memory) database
+        backends.configure_backends()
         self.service_api = server.ServiceApi()
         self.admin_api = server.AdminApi()
 
@@ -550,6 +554,20 @@ class ApiTestCase(RestfulTestCase):
         return self.admin_request(method='DELETE',
             path='/tokens/%s' % (token_id,), **kwargs)
 
+    def get_revoked_tokens(self, marker=None, **kwargs):
+        """GET /tokens/revoked?marker={marker}"""
+        path = '/tokens/revoked'
+        if marker is not None:
+            path += '?marker=%s' % (marker,)
+        return self.admin_request(method='GET', path=path, **kwargs)
+
+    def validate_tokens(self, token_ids, **kwargs):
+        """POST /OS-KSVALIDATE/tokens/validate"""
+        return self.admin_request(method='POST',
+            path='/OS-KSVALIDATE/tokens/validate',
+            as_json={'tokens': [{'id': token_id} for token_id in token_ids]},
+            **kwargs)
+
     def post_tenant(self, **kwargs):
         """POST /tenants"""
         return self.admin_request(method='POST', path='/tenants', **kwargs)
@@ -128,6 +128,91 @@ class CheckToken(common.FunctionalTestCase):
     def test_validate_token_invalid(self):
         self.check_token(common.unique_str(), assert_status=404)
 
+    def test_validate_token_wrong_tenant(self):
+        self.check_token_belongs_to(self.token['id'], common.unique_str(),
+            assert_status=401)
+
+
+class ValidateTokens(common.FunctionalTestCase):
+    def setUp(self, *args, **kwargs):
+        super(ValidateTokens, self).setUp(*args, **kwargs)
+        self.fixture_create_normal_tenant()
+        self.fixture_create_tenant_user()
+
+        self.token = self.authenticate(self.tenant_user['name'],
+            self.tenant_user['password'],
+            self.tenant['id']).json['access']['token']
+
+    def test_validate_tokens(self):
+        missing = common.unique_str()
+        tokens = self.validate_tokens([self.token['id'], missing],
+            assert_status=200).json['tokens']
+        self.assertEqual([t['id'] for t in tokens],
+                         [self.token['id'], missing])
+        self.assertEqual(tokens[0]['access'], self.get_token(
+            self.token['id'], assert_status=200).json['access'])
+        self.assertEqual(tokens[1]['itemNotFound']['code'], '404')
+
+    def test_validate_tokens_xml(self):
+        r = self.admin_request(method='POST',
+            path='/OS-KSVALIDATE/tokens/validate',
+            as_xml='<tokens xmlns="%s"><token id="%s"/></tokens>' % (
+                self.xmlns, self.token['id']),
+            headers={'Accept': 'application/xml'}, assert_status=200)
+        self.assertEqual(r.xml.tag, '{%s}tokens' % self.xmlns)
+        token = r.xml.find('{%s}token' % self.xmlns)
+        self.assertEqual(token.get('id'), self.token['id'])
+        self.assertIsNotNone(token.find('{%s}access' % self.xmlns))
+
+    def test_validate_tokens_malformed(self):
+        self.admin_request(method='POST',
+            path='/OS-KSVALIDATE/tokens/validate',
+            as_json={'tokens': [{}]}, assert_status=400)
+
+    def test_validate_tokens_requires_admin(self):
+        self.admin_token = self.token['id']
+        self.validate_tokens([self.token['id']], assert_status=401)
+
+
+class RevokedTokens(common.FunctionalTestCase):
+    def setUp(self, *args, **kwargs):
+        super(RevokedTokens, self).setUp(*args, **kwargs)
+        self.fixture_create_normal_tenant()
+        self.fixture_create_tenant_user()
+
+    def _revoke_new_token(self):
+        token = self.authenticate(self.tenant_user['name'],
+            self.tenant_user['password'],
+            self.tenant['id']).json['access']['token']
+        self.remove_token(token['id'], assert_status=204)
+        return token
+
+    def test_revoked_tokens_since_marker(self):
+        marker = self.get_revoked_tokens(
+            assert_status=200).json['revokedTokens'].get('marker')
+        token = self._revoke_new_token()
+
+        revoked = self.get_revoked_tokens(marker,
+            assert_status=200).json['revokedTokens']
+        self.assertEqual([t['id'] for t in revoked['tokens']], [token['id']])
+
+        revoked = self.get_revoked_tokens(revoked['marker'],
+            assert_status=200).json['revokedTokens']
+        self.assertEqual(revoked['tokens'], [])
+
+    def test_revoked_tokens_xml(self):
+        token = self._revoke_new_token()
+        r = self.get_revoked_tokens(assert_status=200,
+            headers={'Accept': 'application/xml'})
+        self.assertEqual(r.xml.tag, '{%s}revokedTokens' % self.xmlns)
+        self.assertIn(token['id'], [t.get('id') for t in
+                                    r.xml.findall('{%s}token' % self.xmlns)])
+
+    def test_revoked_tokens_requires_admin(self):
+        self.admin_token = self.authenticate(self.tenant_user['name'],
+            self.tenant_user['password']).json['access']['token']['id']
+        self.get_revoked_tokens(assert_status=401)
+
 
 # pylint: disable=E1101,E1120
 class TokenEndpointTest(unittest.TestCase):
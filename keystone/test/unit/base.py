@@ -117,7 +117,8 @@ debug = False
 sql_connection = sqlite://
 backend_entities = ['UserRoleAssociation',
         'Endpoints', 'Role', 'Tenant', 'User',
-        'Credentials', 'EndpointTemplates', 'Token', 'Service']
+        'Credentials', 'EndpointTemplates', 'Token', 'Service',
+        'TokenRevocation']
 """
         self.update_CONF(conf_text)
 
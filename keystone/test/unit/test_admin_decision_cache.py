@@ -0,0 +1,97 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime, timedelta
+import unittest2 as unittest
+
+from keystone import config
+import keystone.backends.sqlalchemy as db
+from keystone.logic import decision_cache
+from keystone.logic import service
+from keystone.logic.types import fault
+from keystone import models
+from keystone.test import KeystoneTest
+
+CONF = config.CONF
+
+
+class TestAdminDecisionCache(unittest.TestCase):
+    def setUp(self):
+        kt = KeystoneTest()
+        kt.config_name = "sql.conf.template"
+        kt.construct_temp_conf_file()
+        CONF.reset()
+        CONF(config_files=[kt.conf_fp.name])
+        db.unregister_models()
+        reload(db)
+        self.identity = service.get_identity_service()
+        # role ids looked up against databases of earlier tests
+        service.ADMIN_ROLE_ID = service.SERVICE_ADMIN_ROLE_ID = None
+
+        role = self.identity.role_manager.get_by_name(
+            service.ADMIN_ROLE_NAME) or self.identity.role_manager.create(
+            models.Role(name=service.ADMIN_ROLE_NAME))
+        user = self.identity.user_manager.create(models.User(
+            name='cached-admin', password='secret', enabled=True))
+        self.identity.user_manager.user_role_add(models.UserRoleAssociation(
+            user_id=user.id, role_id=role.id, tenant_id=None))
+        self.token = self.identity.token_manager.create(models.Token(
+            id='cached-admin-token', user_id=user.id,
+            expires=datetime.now() + timedelta(days=1)))
+        self.grant = self.identity.grant_manager.rolegrant_get_by_ids(
+            user.id, role.id, None)
+
+        self.lookups = []
+        get_token = self.identity.token_manager.get
+
+        def counting_get(token_id):
+            self.lookups.append(token_id)
+            return get_token(token_id)
+        self.identity.token_manager.get = counting_get
+
+    def tearDown(self):
+        del self.identity.token_manager.get
+        service.ADMIN_ROLE_ID = service.SERVICE_ADMIN_ROLE_ID = None
+        db.unregister_models()
+        reload(db)
+
+    def test_decision_is_cached(self):
+        self.identity.validate_admin_token(self.token.id)
+        self.identity.validate_service_admin_token(self.token.id)
+        self.identity.validate_admin_token(self.token.id)
+        self.assertEqual(len(self.lookups), 1)
+
+    def test_grant_removal_invalidates(self):
+        self.identity.validate_admin_token(self.token.id)
+        self.identity.grant_manager.rolegrant_delete(self.grant.id)
+        self.assertRaises(fault.UnauthorizedFault,
+                          self.identity.validate_admin_token, self.token.id)
+
+    def test_token_removal_invalidates(self):
+        self.identity.validate_admin_token(self.token.id)
+        self.identity.token_manager.delete(self.token.id)
+        self.assertRaises(fault.UnauthorizedFault,
+                          self.identity.validate_admin_token, self.token.id)
+
+    def test_expired_token_is_not_served(self):
+        cache = decision_cache.DecisionCache()
+        token = models.Token(id='t', expires=datetime.now() -
+                             timedelta(seconds=1))
+        cache.put('t', decision_cache.Decision(token, None, True, True))
+        self.assertIsNone(cache.get('t'))
+
+
+if __name__ == '__main__':
+    unittest.main()
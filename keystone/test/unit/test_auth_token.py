@@ -0,0 +1,420 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import json
+import os
+import tempfile
+import time
+import unittest2 as unittest
+
+import eventlet
+
+from keystone.common import signing
+from keystone.middleware import auth_token
+
+
+def _expires(seconds):
+    return (datetime.datetime.now() +
+            datetime.timedelta(seconds=seconds)).strftime(
+                auth_token.EXPIRE_TIME_FORMAT)
+
+
+# nothing listens on port 1, so extension detection just fails
+BASE_CONF = {
+    'auth_host': '127.0.0.1',
+    'auth_port': '1',
+    'auth_protocol': 'http',
+    'admin_token': 'admin',
+    'service_host': '127.0.0.1',
+    'service_port': '1'}
+
+
+def _middleware(keystone=None, **conf):
+    """Builds the middleware from BASE_CONF plus the given options, talking
+    to `keystone` instead of the network"""
+    middleware = auth_token.AuthProtocol(None, dict(BASE_CONF, **conf))
+    if keystone is not None:
+        middleware.http_pool = keystone
+    return middleware
+
+
+class FakeResponse(object):
+    def __init__(self, status, body=''):
+        self.status = status
+        self._body = body
+
+    def read(self):
+        return self._body
+
+
+class FakeKeystone(object):
+    """Stands in for the middleware's HTTP pool; counts validations"""
+    def __init__(self, latency=0):
+        self.tokens = {}
+        self.revoked = []
+        self.revocation_requests = []
+        self.batches = []
+        self.calls = 0
+        self.latency = latency
+
+    def _access(self, token):
+        return {'access': {
+            'token': {'id': token, 'expires': self.tokens[token],
+                      'tenant': {'id': '1', 'name': 'tenant'}},
+            'user': {'id': '2', 'name': 'user', 'roles': []}}}
+
+    # pylint: disable=W0613
+    def request(self, ipaddr, port, method, path, **kwargs):
+        if path.startswith('/v2.0/tokens/revoked'):
+            self.revocation_requests.append(path)
+            revoked = {'tokens': [{'id': token, 'expires': expires}
+                                  for token, expires in self.revoked]}
+            if self.revoked:
+                revoked['marker'] = str(len(self.revoked))
+            return FakeResponse(200, json.dumps({'revokedTokens': revoked}))
+        if path == auth_token.BATCH_VALIDATION_PATH:
+            tokens = [token['id'] for token in
+                      json.loads(kwargs['body'])['tokens']]
+            self.batches.append(tokens)
+            eventlet.sleep(self.latency)
+            results = []
+            for token in tokens:
+                if token in self.tokens:
+                    result = self._access(token)
+                else:
+                    result = {'itemNotFound': {'code': '404'}}
+                result['id'] = token
+                results.append(result)
+            return FakeResponse(200, json.dumps({'tokens': results}))
+        if method == 'POST':
+            # the middleware fetching a new admin token
+            return FakeResponse(200, json.dumps({'access': {
+                'token': {'id': 'admin'}}}))
+        self.calls += 1
+        eventlet.sleep(self.latency)
+        token = kwargs['headers'].get('X-Subject-Token',
+                                      path.split('/')[-1])
+        if token not in self.tokens:
+            return FakeResponse(404)
+        return FakeResponse(200, json.dumps(self._access(token)))
+
+
+class FakeMemcache(object):
+    """Stands in for a python-memcached client, keys limits included"""
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def _check_key(key):
+        if len(key) > 250:
+            raise ValueError("Key length is > 250")
+
+    # pylint: disable=W0613
+    def set(self, key, value, time=0):
+        self._check_key(key)
+        self.data[key] = value
+
+    def get(self, key):
+        self._check_key(key)
+        return self.data.get(key)
+
+    def delete(self, key):
+        self._check_key(key)
+        self.data.pop(key, None)
+
+
+class TestLocalTokenCache(unittest.TestCase):
+    def test_hit_and_miss_counters(self):
+        cache = auth_token.LocalTokenCache(10)
+        self.assertIsNone(cache.get('abc'))
+        cache.put('abc', {'user': 'u'}, time.time() + 60, True)
+        claims, _expires, valid = cache.get('abc')
+        self.assertEqual(claims, {'user': 'u'})
+        self.assertTrue(valid)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_bounded_lru(self):
+        cache = auth_token.LocalTokenCache(2)
+        expires = time.time() + 60
+        cache.put('a', {}, expires, True)
+        cache.put('b', {}, expires, True)
+        cache.get('a')
+        cache.put('c', {}, expires, True)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+
+    def test_honours_expires_and_ttl(self):
+        cache = auth_token.LocalTokenCache(10, ttl=60)
+        cache.put('expired', {}, time.time() - 1, True)
+        self.assertIsNone(cache.get('expired'))
+
+        cache.put('soon', {}, time.time() + 0.01, True)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('soon'))
+
+        cache = auth_token.LocalTokenCache(10, ttl=0.01)
+        cache.put('capped', {}, time.time() + 3600, True)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('capped'))
+
+    def test_negative_ttl(self):
+        cache = auth_token.LocalTokenCache(10, negative_ttl=0.01)
+        cache.put('bad', {}, time.time() + 3600, False)
+        self.assertEqual(cache.get('bad')[2], False)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('bad'))
+
+
+class TestAuthProtocolLocalCache(unittest.TestCase):
+    def setUp(self):
+        self.keystone = FakeKeystone()
+        self.middleware = _middleware(self.keystone, local_cache_size='10')
+
+    def test_valid_token_is_validated_once(self):
+        self.keystone.tokens['good'] = _expires(3600)
+        for _i in range(3):
+            claims = self.middleware._verify_claims({}, 'good')
+            self.assertEqual(claims['user']['name'], 'user')
+        self.assertEqual(self.keystone.calls, 1)
+        self.assertEqual(self.middleware.local_cache.stats()['hits'], 2)
+
+    def test_invalid_token_is_negatively_cached(self):
+        for _i in range(3):
+            self.assertRaises(auth_token.ValidationFailed,
+                              self.middleware._verify_claims, {}, 'bad')
+        # the first attempt retries once with a fresh admin token
+        self.assertEqual(self.keystone.calls, 2)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(_middleware().local_cache)
+
+
+class TestAuthProtocolRevocations(unittest.TestCase):
+    def setUp(self):
+        self.keystone = FakeKeystone()
+        self.middleware = _middleware(self.keystone, local_cache_size='10',
+                                      revocation_poll_interval='60')
+
+    def test_revoked_tokens_are_evicted(self):
+        self.keystone.tokens['good'] = _expires(3600)
+        self.middleware._verify_claims({}, 'good')
+        self.keystone.revoked = [('good', _expires(3600)),
+                                 ('old', _expires(-1))]
+        self.middleware._poll_revocations()
+        self.assertEqual(self.middleware.revoked_tokens.keys(), ['good'])
+        self.assertEqual(len(self.middleware.local_cache), 0)
+        self.assertRaises(auth_token.ValidationFailed,
+                          self.middleware._verify_claims, {}, 'good')
+        self.assertEqual(self.keystone.calls, 1)
+
+        self.middleware._poll_revocations()
+        self.assertEqual(self.keystone.revocation_requests,
+                         ['/v2.0/tokens/revoked?limit=1000',
+                          '/v2.0/tokens/revoked?limit=1000&marker=2'])
+
+    def test_signed_tokens_are_revoked_by_stored_id(self):
+        keys = signing.KeyRing([('k1', 'secret')])
+        self.middleware.signing_keys = keys
+        token = signing.sign(keys, {
+            'id': 'stored', 'user': {'id': '2', 'name': 'user'},
+            'tenant': {'id': '1', 'name': 'tenant'}, 'roles': [],
+            'expires': _expires(3600)})
+        self.middleware._verify_claims({}, token)
+        self.keystone.revoked = [('stored', _expires(3600))]
+        self.middleware._poll_revocations()
+        self.assertRaises(auth_token.ValidationFailed,
+                          self.middleware._verify_claims, {}, token)
+        self.assertEqual(self.keystone.calls, 0)
+
+
+class TestAuthProtocolCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.keystone = FakeKeystone(latency=0.01)
+        self.middleware = _middleware(self.keystone)
+
+    def _verify_concurrently(self, token, count=20):
+        def verify():
+            try:
+                return self.middleware._verify_claims({}, token)
+            except auth_token.ValidationFailed as exc:
+                return exc
+        threads = [eventlet.spawn(verify) for _i in range(count)]
+        return [thread.wait() for thread in threads]
+
+    def test_concurrent_validations_are_coalesced(self):
+        self.keystone.tokens['good'] = _expires(3600)
+        results = self._verify_concurrently('good')
+        self.assertEqual(self.keystone.calls, 1)
+        for claims in results:
+            self.assertEqual(claims['user']['name'], 'user')
+        self.assertEqual(self.middleware._validations, {})
+
+    def test_failures_are_shared(self):
+        results = self._verify_concurrently('bad')
+        # one validation, plus its retry with a fresh admin token
+        self.assertEqual(self.keystone.calls, 2)
+        for exc in results:
+            self.assertIsInstance(exc, auth_token.ValidationFailed)
+        self.assertEqual(self.middleware._validations, {})
+
+    def test_sequential_validations_are_not_coalesced(self):
+        self.keystone.tokens['good'] = _expires(3600)
+        self.middleware._verify_claims({}, 'good')
+        self.middleware._verify_claims({}, 'good')
+        self.assertEqual(self.keystone.calls, 2)
+
+
+class TestAuthProtocolBatching(unittest.TestCase):
+    def setUp(self):
+        self.keystone = FakeKeystone()
+        self.middleware = _middleware(self.keystone,
+                                      validation_batch_window='0.01',
+                                      validation_batch_size='3')
+        self.middleware.osksvalidate = True
+
+    def _verify_concurrently(self, tokens):
+        def verify(token):
+            try:
+                return self.middleware._verify_claims({}, token)
+            except (auth_token.ValidationFailed,
+                    auth_token.TokenExpired) as exc:
+                return exc
+        threads = [eventlet.spawn(verify, token) for token in tokens]
+        return [thread.wait() for thread in threads]
+
+    def test_misses_are_validated_together(self):
+        self.keystone.tokens['good'] = _expires(3600)
+        self.keystone.tokens['expired'] = _expires(-1)
+        results = self._verify_concurrently(['good', 'bad', 'expired'])
+        self.assertEqual(self.keystone.batches, [['good', 'bad', 'expired']])
+        self.assertEqual(self.keystone.calls, 0)
+        self.assertEqual(results[0]['user']['name'], 'user')
+        self.assertIsInstance(results[1], auth_token.ValidationFailed)
+        self.assertIsInstance(results[2], auth_token.TokenExpired)
+        self.assertIsNone(self.middleware._batch)
+
+    def test_full_batches_are_sent_at_once(self):
+        tokens = ['t%d' % i for i in range(5)]
+        for token in tokens:
+            self.keystone.tokens[token] = _expires(3600)
+        results = self._verify_concurrently(tokens)
+        self.assertEqual(self.keystone.batches, [tokens[:3], tokens[3:]])
+        for claims in results:
+            self.assertEqual(claims['user']['name'], 'user')
+
+    def test_unexpected_errors_wake_every_waiter(self):
+        accept_claims = self.middleware._accept_claims
+
+        def odd_response(env, claims, token_info):
+            if claims == 'odd':
+                raise KeyError('token')
+            return accept_claims(env, claims, token_info)
+        self.middleware._accept_claims = odd_response
+        for token in ('odd', 'good'):
+            self.keystone.tokens[token] = _expires(3600)
+
+        def verify(token):
+            try:
+                return self.middleware._verify_claims({}, token)
+            except KeyError as exc:
+                return exc
+        threads = [eventlet.spawn(verify, token)
+                   for token in ('odd', 'good')]
+        with eventlet.Timeout(1):
+            results = [thread.wait() for thread in threads]
+        self.assertIsInstance(results[0], KeyError)
+        self.assertEqual(results[1]['user']['name'], 'user')
+
+    def test_falls_back_without_batch_support(self):
+        def request(ipaddr, port, method, path, **kwargs):
+            if path == auth_token.BATCH_VALIDATION_PATH:
+                return FakeResponse(404)
+            return FakeKeystone.request(self.keystone, ipaddr, port, method,
+                                        path, **kwargs)
+        self.keystone.request = request
+        self.keystone.tokens['good'] = _expires(3600)
+        results = self._verify_concurrently(['good', 'bad'])
+        self.assertEqual(results[0]['user']['name'], 'user')
+        self.assertIsInstance(results[1], auth_token.ValidationFailed)
+        self.assertEqual(self.middleware.validation_batch_window, 0)
+
+    def test_not_batched_with_service_ids(self):
+        middleware = _middleware(service_ids='1',
+                                 validation_batch_window='0.01')
+        self.assertEqual(middleware.validation_batch_window, 0)
+
+
+class TestAuthProtocolSignedTokens(unittest.TestCase):
+    def setUp(self):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'w') as f:
+            f.write("k1 secret\n")
+        self.keys = signing.KeyRing([('k1', 'secret')])
+        self.key_file = path
+        self.keystone = FakeKeystone()
+        self.middleware = _middleware(self.keystone, signing_key_file=path)
+
+    def _sign(self, seconds, key=None):
+        return signing.sign(key or self.keys, {
+            'id': 'stored', 'user': {'id': '2', 'name': 'user'},
+            'tenant': {'id': '1', 'name': 'tenant'}, 'roles': ['Member'],
+            'expires': _expires(seconds)})
+
+    def test_signed_token_is_verified_offline(self):
+        claims = self.middleware._verify_claims({}, self._sign(3600))
+        self.assertEqual(claims['user']['name'], 'user')
+        self.assertEqual(claims['roles'], ['Member'])
+        self.assertNotIn('id', claims)
+        self.assertEqual(self.keystone.calls, 0)
+
+    def test_expired_signed_token(self):
+        self.assertRaises(auth_token.TokenExpired,
+                          self.middleware._verify_claims, {},
+                          self._sign(-1))
+        self.assertEqual(self.keystone.calls, 0)
+
+    def test_unverifiable_token_is_left_to_keystone(self):
+        token = self._sign(3600, signing.KeyRing([('k9', 'unknown')]))
+        self.assertRaises(auth_token.ValidationFailed,
+                          self.middleware._verify_claims, {}, token)
+        self.assertEqual(self.keystone.calls, 2)
+
+    def test_signed_token_cached_in_memcache(self):
+        middleware = _middleware(self.keystone, cache='keystone.cache')
+        token = signing.sign(self.keys, {
+            'id': '18b3c2f9a1e-%s' % ('0' * 32),
+            'user': {'id': '2', 'name': 'user'},
+            'tenant': {'id': '1', 'name': 'tenant'},
+            'roles': ['Member', 'swiftoperator', 'ResellerAdmin'],
+            'expires': _expires(3600)})
+        self.assertGreater(len(token), 250)
+        self.keystone.tokens[token] = _expires(3600)
+        env = {'keystone.cache': FakeMemcache()}
+        for _i in range(2):
+            claims = middleware._verify_claims(env, token)
+            self.assertEqual(claims['user']['name'], 'user')
+        self.assertEqual(self.keystone.calls, 1)
+
+    def test_not_verified_offline_with_service_ids(self):
+        middleware = _middleware(signing_key_file=self.key_file,
+                                 service_ids='1')
+        self.assertIsNone(middleware.signing_keys)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
 import os
 import unittest2 as unittest
 import uuid
@@ -23,6 +24,7 @@ from keystone.cfg import OptGroup, NoSuchOptError
 import keystone.backends.api as api
 import keystone.backends.models as legacy_backend_models
 import keystone.backends.sqlalchemy as db
+from keystone.managers.token import Manager as TokenManager
 from keystone import models
 from keystone.test import KeystoneTest
 from keystone import utils
@@ -157,6 +159,214 @@ class BackendTestCase(unittest.TestCase):
         tenant_endpoints = api.TENANT.get_all_endpoints(tenant.id)
         self.assertGreater(len(tenant_endpoints), 0)
 
+    def test_list_resolved_roles_for_user(self):
+        tenant = api.TENANT.create(models.Tenant(name="Tee Four",
+            description="This is T4", enabled=True))
+        user = api.USER.create(models.User(name="resolved_user",
+            password="secret", email="resolved@example.com", enabled=True))
+        global_role = api.ROLE.create(models.Role(name="global_role",
+            description="A global role"))
+        tenant_role = api.ROLE.create(models.Role(name="tenant_role",
+            description="A tenant role"))
+        api.USER.user_role_add(models.UserRoleAssociation(
+            user_id=user.id, role_id=global_role.id))
+        api.USER.user_role_add(models.UserRoleAssociation(
+            user_id=user.id, role_id=tenant_role.id, tenant_id=tenant.id))
+
+        roles = api.ROLE.list_resolved_roles_for_user(user.id)
+        self.assertEqual([(r.name, r.description, r.tenant_id)
+                          for r in roles],
+                         [("global_role", "A global role", None)])
+
+        roles = api.ROLE.list_resolved_roles_for_user(user.id, tenant.id)
+        self.assertEqual([(r.name, r.description, r.tenant_id)
+                          for r in roles],
+                         [("tenant_role", "A tenant role", tenant.id),
+                          ("global_role", "A global role", None)])
+
+    def test_list_resolved_roles_for_users(self):
+        tenant = api.TENANT.create(models.Tenant(name="Tee Five",
+            description="This is T5", enabled=True))
+        users = [api.USER.create(models.User(name="resolved_user%d" % i,
+            password="secret", email="resolved%d@example.com" % i,
+            enabled=True)) for i in range(2)]
+        global_role = api.ROLE.create(models.Role(name="batch_global_role"))
+        tenant_role = api.ROLE.create(models.Role(name="batch_tenant_role"))
+        for user in users:
+            api.USER.user_role_add(models.UserRoleAssociation(
+                user_id=user.id, role_id=global_role.id))
+        api.USER.user_role_add(models.UserRoleAssociation(
+            user_id=users[0].id, role_id=tenant_role.id, tenant_id=tenant.id))
+
+        pairs = [(users[0].id, tenant.id), (users[0].id, None),
+                 (users[1].id, tenant.id)]
+        roles = api.ROLE.list_resolved_roles_for_users(pairs)
+        self.assertEqual(sorted(roles.keys()), sorted(pairs))
+        for pair in pairs:
+            self.assertEqual([(r.name, r.tenant_id) for r in roles[pair]],
+                             [(r.name, r.tenant_id) for r in
+                              api.ROLE.list_resolved_roles_for_user(*pair)])
+        self.assertEqual(api.ROLE.list_resolved_roles_for_users([]), {})
+
+    def test_get_many(self):
+        services = [api.SERVICE.create(models.Service(name="svc%d" % i,
+            type="type%d" % i)) for i in range(3)]
+        found = api.SERVICE.get_many([services[0].id, services[2].id,
+                                      "999999"])
+        self.assertEqual(sorted(s.name for s in found), ["svc0", "svc2"])
+
+        roles = [api.ROLE.create(models.Role(name="many_role%d" % i))
+                 for i in range(3)]
+        found = api.ROLE.get_many([roles[1].id, roles[2].id, roles[1].id])
+        self.assertEqual(sorted(r.name for r in found),
+                         ["many_role1", "many_role2"])
+
+        ept = api.ENDPOINT_TEMPLATE.create(models.EndpointTemplate(
+            region="north", name="svc0", type="type0", is_global=True,
+            public_URL="http://global.public"))
+        found = api.ENDPOINT_TEMPLATE.get_many([ept.id])
+        self.assertEqual([e.id for e in found], [ept.id])
+
+        self.assertEqual(api.SERVICE.get_many([]), [])
+
+        tenants = [api.TENANT.create(models.Tenant(name="many_tenant%d" % i,
+            enabled=True)) for i in range(3)]
+        found = api.TENANT.get_many([tenants[0].id, tenants[1].id])
+        self.assertEqual(sorted(t.name for t in found),
+                         ["many_tenant0", "many_tenant1"])
+
+        users = [api.USER.create(models.User(name="many_user%d" % i,
+            password="secret", email="many%d@example.com" % i,
+            enabled=True)) for i in range(3)]
+        found = api.USER.get_many([users[1].id, users[2].id, "unknown"])
+        self.assertEqual(sorted(u.name for u in found),
+                         ["many_user1", "many_user2"])
+
+        tokens = [api.TOKEN.create(models.Token(id=uuid.uuid4().hex,
+            user_id=users[0].id, expires=datetime.datetime.now()))
+            for _i in range(2)]
+        found = api.TOKEN.get_many([tokens[0].id, "unknown"])
+        self.assertEqual([(t.id, t.user_id) for t in found],
+                         [(tokens[0].id, users[0].id)])
+
+    def _grant_roles(self, service=None):
+        tenant = api.TENANT.create(models.Tenant(name="Tee Cascade",
+            description="Cascade tenant", enabled=True))
+        user = api.USER.create(models.User(name="cascade_user",
+            password="secret", email="cascade@example.com", enabled=True))
+        name = "cascade_role"
+        if service is not None:
+            name = "%s:%s" % (service.name, name)
+        role = api.ROLE.create(models.Role(name=name,
+            service_id=service and service.id))
+        api.USER.user_role_add(models.UserRoleAssociation(
+            user_id=user.id, role_id=role.id))
+        api.USER.user_role_add(models.UserRoleAssociation(
+            user_id=user.id, role_id=role.id, tenant_id=tenant.id))
+        return tenant, user, role
+
+    def test_role_delete_cascade(self):
+        _tenant, user, role = self._grant_roles()
+
+        self.assertEqual(api.ROLE.delete_cascade(role.id),
+                         {'role_grants': 2, 'roles': 1})
+        self.assertIsNone(api.ROLE.get(role.id))
+        self.assertEqual(api.ROLE.list_resolved_roles_for_user(user.id), [])
+
+    def test_service_delete_cascade(self):
+        service = api.SERVICE.create(models.Service(name="cascade",
+            type="cascade-service"))
+        tenant, _user, role = self._grant_roles(service)
+        for is_global in (True, False):
+            ept = legacy_backend_models.EndpointTemplates()
+            ept.update(dict(region="north", service_id=service.id,
+                is_global=is_global, public_url="http://cascade.public"))
+            ept = api.ENDPOINT_TEMPLATE.create(ept)
+        endpoint = legacy_backend_models.Endpoints()
+        endpoint.tenant_id = tenant.id
+        endpoint.endpoint_template_id = ept.id
+        api.ENDPOINT_TEMPLATE.endpoint_add(endpoint)
+
+        self.assertEqual(api.SERVICE.delete_cascade(service.id),
+                         {'role_grants': 2, 'roles': 1, 'endpoints': 1,
+                          'endpoint_templates': 2, 'services': 1})
+        self.assertIsNone(api.SERVICE.get(service.id))
+        self.assertIsNone(api.ROLE.get(role.id))
+        self.assertEqual(api.ENDPOINT_TEMPLATE.get_by_service(service.id),
+                         [])
+        self.assertEqual(api.TENANT.get_all_endpoints(tenant.id), [])
+
+    def test_user_delete_cascade(self):
+        tenant, user, _role = self._grant_roles()
+
+        counts = api.USER.delete_cascade(user.id)
+        self.assertEqual(counts['role_grants'], 2)
+        self.assertEqual(counts['users'], 1)
+        self.assertIsNone(api.USER.get(user.id))
+        self.assertEqual(api.TENANT.delete_cascade(tenant.id)['tenants'], 1)
+        self.assertIsNone(api.TENANT.get(tenant.id))
+
+    def test_token_delete_expired(self):
+        user = api.USER.create(models.User(name="expiring_user",
+            password="secret", email="expiring@example.com", enabled=True))
+        now = datetime.datetime.now()
+        expired = [api.TOKEN.create(models.Token(id=uuid.uuid4().hex,
+            user_id=user.id, expires=now - datetime.timedelta(hours=i + 1)))
+            for i in range(3)]
+        live = api.TOKEN.create(models.Token(id=uuid.uuid4().hex,
+            user_id=user.id, expires=now + datetime.timedelta(days=1)))
+
+        # oldest tokens go first
+        self.assertEqual(api.TOKEN.delete_expired(now, 2), 2)
+        self.assertIsNotNone(api.TOKEN.get(expired[0].id))
+        self.assertIsNone(api.TOKEN.get(expired[2].id))
+
+        self.assertEqual(api.TOKEN.delete_expired(now, 2), 1)
+        self.assertEqual(api.TOKEN.delete_expired(now, 2), 0)
+        self.assertEqual([t.id for t in api.TOKEN.get_all()], [live.id])
+
+    def test_token_fetch_live_ids(self):
+        user = api.USER.create(models.User(name="live_user",
+            password="secret", email="live@example.com", enabled=True))
+        now = datetime.datetime.now()
+        expired, live, newer = [api.TOKEN.create(models.Token(
+            id=uuid.uuid4().hex, user_id=user.id,
+            expires=now + datetime.timedelta(hours=hours)))
+            for hours in (-1, 1, 2)]
+        live_ids = dict(api.TOKEN.fetch_live_ids())
+        self.assertEqual(sorted(live_ids), sorted([live.id, newer.id]))
+        # creation time comes from the database, whatever the expiry
+        created = live_ids[live.id]
+        self.assertIsNotNone(created)
+        self.assertEqual(sorted(token_id for token_id, _created in
+                                api.TOKEN.fetch_live_ids(created)),
+                         sorted([live.id, newer.id]))
+        self.assertEqual(api.TOKEN.fetch_live_ids(
+            created + datetime.timedelta(days=1)), [])
+
+    def test_token_revocations(self):
+        user = api.USER.create(models.User(name="revoked_user",
+            password="secret", email="revoked@example.com", enabled=True))
+        now = datetime.datetime.now()
+        manager = TokenManager()
+        tokens = [api.TOKEN.create(models.Token(id=uuid.uuid4().hex,
+            user_id=user.id, expires=now + datetime.timedelta(days=1)))
+            for _i in range(3)]
+
+        manager.delete(tokens[0].id)
+        revocations = manager.get_revocations()
+        self.assertEqual([r[1] for r in revocations], [tokens[0].id])
+        marker = revocations[-1][0]
+        manager.delete(tokens[1].id)
+        manager.delete(tokens[2].id)
+        self.assertEqual([r[1] for r in manager.get_revocations(marker)],
+                         [tokens[1].id, tokens[2].id])
+
+        # revocations of expired tokens are neither listed nor kept
+        api.TOKEN_REVOCATION.create('gone', now - datetime.timedelta(hours=1))
+        self.assertEqual(len(manager.get_revocations()), 3)
+        self.assertEqual(api.TOKEN_REVOCATION.delete_expired(now, 10), 1)
+
 
 class LDAPBackendTestCase(BackendTestCase):
     def setUp(self):
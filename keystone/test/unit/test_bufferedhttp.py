@@ -0,0 +1,143 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import time
+import unittest2 as unittest
+
+import eventlet
+
+from keystone.common import bufferedhttp
+
+
+class KeepAliveServer(object):
+    """Minimal HTTP/1.1 server that counts the connections it accepts"""
+
+    def __init__(self, close_after_response=False, delay=0):
+        self.close_after_response = close_after_response
+        self.delay = delay
+        self.requests = 0
+        self.connections = []
+        self.handlers = []
+        self.sock = eventlet.listen(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        self.thread = eventlet.spawn(self._serve)
+
+    def _serve(self):
+        while True:
+            conn, _addr = self.sock.accept()
+            self.connections.append(conn)
+            self.handlers.append(eventlet.spawn(self._handle, conn))
+
+    def _handle(self, conn):
+        data = ''
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return
+            data += chunk
+            while '\r\n\r\n' in data:
+                request, data = data.split('\r\n\r\n', 1)
+                path = request.split()[1]
+                self.requests += 1
+                if path.startswith('/slow'):
+                    eventlet.sleep(self.delay)
+                headers = 'Content-Length: %s\r\n' % len(path)
+                if self.close_after_response:
+                    headers += 'Connection: close\r\n'
+                conn.sendall('HTTP/1.1 200 OK\r\n%s\r\n%s' % (headers, path))
+                if self.close_after_response:
+                    conn.close()
+                    return
+
+    def drop_connections(self):
+        for handler in self.handlers:
+            handler.kill()
+        for conn in self.connections:
+            conn.close()
+
+    def stop(self):
+        self.thread.kill()
+        self.drop_connections()
+        self.sock.close()
+
+
+class TestHTTPConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.server = None
+
+    def tearDown(self):
+        if self.server:
+            self.server.stop()
+
+    def _request(self, pool, path):
+        return pool.request('127.0.0.1', self.server.port, 'GET', path)
+
+    def test_connection_is_reused(self):
+        self.server = KeepAliveServer()
+        pool = bufferedhttp.HTTPConnectionPool()
+        for i in range(3):
+            resp = self._request(pool, '/%s' % i)
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(resp.read(), '/%s' % i)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_closed_connection_is_not_reused(self):
+        self.server = KeepAliveServer(close_after_response=True)
+        pool = bufferedhttp.HTTPConnectionPool()
+        self._request(pool, '/a')
+        self._request(pool, '/b')
+        self.assertEqual(len(self.server.connections), 2)
+
+    def test_stale_connection_is_retried(self):
+        self.server = KeepAliveServer()
+        pool = bufferedhttp.HTTPConnectionPool()
+        self._request(pool, '/a')
+        self.server.drop_connections()
+        eventlet.sleep(0)
+        resp = self._request(pool, '/b')
+        self.assertEqual(resp.read(), '/b')
+        self.assertEqual(len(self.server.connections), 2)
+
+    def test_timeout_on_reused_connection_is_not_retried(self):
+        self.server = KeepAliveServer(delay=0.1)
+        pool = bufferedhttp.HTTPConnectionPool()
+        pool.request('127.0.0.1', self.server.port, 'GET', '/a',
+                     timeout=0.05)
+        self.assertRaises(socket.timeout, pool.request, '127.0.0.1',
+                          self.server.port, 'POST', '/slow', timeout=0.05)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_idle_timeout(self):
+        self.server = KeepAliveServer()
+        pool = bufferedhttp.HTTPConnectionPool(idle_timeout=0.01)
+        self._request(pool, '/a')
+        time.sleep(0.02)
+        self._request(pool, '/b')
+        self.assertEqual(len(self.server.connections), 2)
+
+    def test_per_host_limit(self):
+        self.server = KeepAliveServer()
+        pool = bufferedhttp.HTTPConnectionPool(max_size=2)
+        threads = [eventlet.spawn(self._request, pool, '/%s' % i)
+                   for i in range(10)]
+        for thread in threads:
+            thread.wait()
+        self.assertEqual(len(self.server.connections), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
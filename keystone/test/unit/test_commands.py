@@ -33,6 +33,7 @@ from keystone.manage2.commands import list_tenants
 from keystone.manage2.commands import list_tokens
 from keystone.manage2.commands import list_users
 from keystone.manage2.commands import map_endpoint
+from keystone.manage2.commands import purge_tokens
 from keystone.manage2.commands import revoke_role
 from keystone.manage2.commands import unmap_endpoint
 from keystone.manage2.commands import update_credential
@@ -945,6 +946,36 @@ class TestCreateTokenCommand(CommandTestCase):
             str(None), tomorrow])
 
 
+class TestPurgeTokensCommand(CommandTestCase):
+    def test_purge_tokens(self):
+        user_id = self._create_user()
+        expired_ids = []
+        for _i in range(3):
+            self.run_cmd(create_token, [
+                '--user-id', user_id,
+                '--expires', '1999-12-31T23:59'])
+            expired_ids.append(self.ob.read_lines()[0])
+            self.ob.clear()
+        live_id = self._create_token(user_id)
+
+        self.run_cmd(purge_tokens, ['--batch-size', '2'])
+        self.assertTrue(self.ob.read_lines()[0].startswith(
+            'Purged 3 expired tokens in '))
+
+        self.ob.clear()
+        self.run_cmd(list_tokens)
+        output = self.ob.read()
+        self.assertIn(live_id, output)
+        for token_id in expired_ids:
+            self.assertNotIn(token_id, output)
+
+    def test_purge_tokens_nothing_expired(self):
+        self._create_token(self._create_user())
+        self.run_cmd(purge_tokens)
+        self.assertTrue(self.ob.read_lines()[0].startswith(
+            'Purged 0 expired tokens in '))
+
+
 class TestUpdateTokenCommand(CommandTestCase):
     def test_no_args(self):
         with self.assertRaises(SystemExit):
@@ -0,0 +1,114 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2 as unittest
+
+from keystone import backends
+from keystone import config
+import keystone.backends.api as api
+import keystone.backends.sqlalchemy as db
+from keystone.backends.sqlalchemy import identity_cache
+from keystone import models
+from keystone.test import KeystoneTest
+
+CONF = config.CONF
+GROUP = 'keystone.backends.sqlalchemy'
+
+
+class TestIdentityCache(unittest.TestCase):
+    def test_lookup_both_ways(self):
+        cache = identity_cache.IdentityCache(max_size=10)
+        cache.put(1, 'abc')
+        self.assertEqual(cache.get_uid(1), 'abc')
+        self.assertEqual(cache.get_uid('1'), 'abc')
+        self.assertEqual(cache.get_id('abc'), 1)
+        self.assertIsNone(cache.get_id('xyz'))
+
+    def test_bounded_lru(self):
+        cache = identity_cache.IdentityCache(max_size=2)
+        cache.put(1, 'one')
+        cache.put(2, 'two')
+        cache.get_uid(1)  # 1 is now most recently used
+        cache.put(3, 'three')
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get_id('two'))
+        self.assertEqual(cache.get_id('one'), 1)
+        self.assertEqual(cache.get_id('three'), 3)
+
+    def test_evict(self):
+        cache = identity_cache.IdentityCache(max_size=10)
+        cache.put(1, 'one')
+        cache.evict(uid='one')
+        self.assertIsNone(cache.get_uid(1))
+        self.assertIsNone(cache.get_id('one'))
+
+    def test_disabled(self):
+        cache = identity_cache.IdentityCache(max_size=0)
+        cache.put(1, 'one')
+        self.assertIsNone(cache.get_uid(1))
+
+
+class TestIdentityCacheBackend(unittest.TestCase):
+    """ Checks the cache is kept in step with the sqlalchemy backend """
+    def setUp(self):
+        kt = KeystoneTest()
+        kt.config_name = "sql.conf.template"
+        kt.construct_temp_conf_file()
+        CONF.reset()
+        CONF(config_files=[kt.conf_fp.name])
+        db.unregister_models()
+        reload(db)
+        backends.configure_backends()
+
+    def tearDown(self):
+        db.unregister_models()
+        reload(db)
+
+    def test_configured_size_is_applied(self):
+        self.addCleanup(identity_cache.configure,
+                        identity_cache.DEFAULT_MAX_SIZE)
+        self.addCleanup(CONF.set_override, 'identity_cache_size', None,
+                        group=GROUP)
+        CONF.set_override('identity_cache_size', '5', group=GROUP)
+        db.unregister_models()
+        reload(db)
+        backends.configure_backends()
+        self.assertEqual(identity_cache.TENANTS.max_size, 5)
+        self.assertEqual(identity_cache.USERS.max_size, 5)
+
+    def test_filled_on_load_and_evicted_on_delete(self):
+        tenant = api.TENANT.create(models.Tenant(name="cached",
+                                                 enabled=True))
+        pkid = api.TENANT.uid_to_id(tenant.id)
+        self.assertEqual(identity_cache.TENANTS.get_id(tenant.id), pkid)
+        self.assertEqual(api.TENANT.id_to_uid(pkid), tenant.id)
+
+        api.TENANT.delete(tenant.id)
+        self.assertIsNone(identity_cache.TENANTS.get_id(tenant.id))
+        self.assertIsNone(api.TENANT.uid_to_id(tenant.id))
+
+    def test_user_cache(self):
+        user = api.USER.create(models.User(name="cached_user",
+                                           email="cached@example.com",
+                                           enabled=True))
+        pkid = api.USER.uid_to_id(user.id)
+        self.assertEqual(identity_cache.USERS.get_uid(pkid), user.id)
+
+        api.USER.delete(user.id)
+        self.assertIsNone(identity_cache.USERS.get_uid(pkid))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2 as unittest
+
+try:
+    import ldap
+    from ldap.controls import SimplePagedResultsControl
+    from keystone.backends.ldap import api
+    from keystone.backends.ldap import fakeldap
+    from keystone.backends.ldap.api.base import BaseLdapAPI
+except ImportError:
+    ldap = None
+
+TREE_DN = 'ou=Groups,dc=example,dc=com'
+IDS = ['t%02d' % i for i in range(0, 40, 2)]
+
+
+class FakeConf(dict):
+    def __init__(self, **kwargs):
+        super(FakeConf, self).__init__(**kwargs)
+        self.ldap_url = 'fake://memory'
+        self.ldap_user = 'cn=Admin'
+        self.ldap_password = 'password'
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __getattr__(self, key):
+        return self.get(key)
+
+
+class PagingServer(object):
+    """Answers paged searches the way a directory would, counting pages"""
+    def __init__(self, entries, page_size):
+        self.entries = entries
+        self.page_size = page_size
+        self.pages = 0
+        self.abandoned = False
+        self._results = {}
+
+    # pylint: disable=W0613
+    def search_ext(self, dn, scope, query, serverctrls=None):
+        paging = serverctrls[1]
+        start = int(paging.cookie or 0)
+        if paging.size == 0:
+            self.abandoned = True
+            page, cookie = [], ''
+        else:
+            self.pages += 1
+            end = start + paging.size
+            page = self.entries[start:end]
+            cookie = str(end) if end < len(self.entries) else ''
+        msgid = len(self._results)
+        self._results[msgid] = (page, cookie)
+        return msgid
+
+    def result3(self, msgid):
+        page, cookie = self._results.pop(msgid)
+        return (None, page, msgid,
+                [SimplePagedResultsControl(True, size=0, cookie=cookie)])
+
+
+@unittest.skipIf(ldap is None, "python-ldap is not installed")
+class TestPaging(unittest.TestCase):
+    def setUp(self):
+        fakeldap.FakeShelve.get_instance().clear()
+        self.api = api.API(FakeConf())
+        conn = self.api.get_connection()
+        for id in IDS:
+            conn.add_s('cn=%s,%s' % (id, TREE_DN),
+                       [('objectClass', ['groupOfNames', 'keystoneTenant'])])
+        self.tenants = self.api.tenant
+
+    def tearDown(self):
+        fakeldap.FakeShelve.get_instance().clear()
+
+    def _all(self):
+        return self.tenants.get_all()
+
+    def test_get_page(self):
+        for marker in [None, '', 't00', 't05', 't20', 't38', 'zzz']:
+            for limit in [1, 3, 10, 50]:
+                expected = BaseLdapAPI._get_page(marker, limit, self._all())
+                self.assertEqual(
+                    [t.id for t in self.tenants.get_page(marker, limit)],
+                    [t.id for t in expected])
+
+    def test_get_page_markers(self):
+        for marker in [None, 'a', 't00', 't05', 't20', 't38', 'zzz']:
+            for limit in [1, 3, 10, 19, 20, 21, 50]:
+                expected = BaseLdapAPI._get_page_markers(marker, limit,
+                                                         self._all())
+                self.assertEqual(
+                    self.tenants.get_page_markers(marker, limit), expected,
+                    'marker=%s limit=%s' % (marker, limit))
+
+    def test_search_stops_once_the_window_is_full(self):
+        entries = [('cn=%s,%s' % (id, TREE_DN), {}) for id in IDS]
+        wrapper = api.LDAPWrapper.__new__(api.LDAPWrapper)
+        wrapper.conn = PagingServer(entries, page_size=4)
+        res = wrapper.search_sorted_s(TREE_DN, ldap.SCOPE_ONELEVEL,
+                                      '(objectClass=*)', 'cn', 3,
+                                      marker='t04', page_size=4)
+        self.assertEqual([dn for dn, _attrs in res],
+                         [e[0] for e in entries[3:6]])
+        self.assertEqual(wrapper.conn.pages, 2)
+        self.assertTrue(wrapper.conn.abandoned)
+
+    def test_marker_is_compared_ignoring_case(self):
+        # ordered as a directory orders cn, ignoring case
+        ids = ['apple', 'banana', 'Cherry', 'date', 'Elder']
+        entries = [('cn=%s,%s' % (id, TREE_DN), {}) for id in ids]
+        wrapper = api.LDAPWrapper.__new__(api.LDAPWrapper)
+        wrapper.conn = PagingServer(entries, page_size=2)
+        res = wrapper.search_sorted_s(TREE_DN, ldap.SCOPE_ONELEVEL,
+                                      '(objectClass=*)', 'cn', 10,
+                                      marker='banana', page_size=2)
+        self.assertEqual([dn for dn, _attrs in res],
+                         [e[0] for e in entries[2:]])
+        self.assertEqual(
+            [e[0] for e in fakeldap.sorted_window(reversed(entries), 10,
+                                                  marker='banana')],
+            [e[0] for e in entries[2:]])
+
+    def test_sorts_locally_without_paging_controls(self):
+        entries = [('cn=%s,%s' % (id, TREE_DN), {}) for id in IDS]
+        wrapper = api.LDAPWrapper.__new__(api.LDAPWrapper)
+        wrapper.conn = PagingServer(entries, page_size=4)
+        wrapper.search_s = lambda dn, scope, query: list(reversed(entries))
+        self.addCleanup(setattr, api, '_PAGING_CONTROLS',
+                        api._PAGING_CONTROLS)
+        api._PAGING_CONTROLS = [None]
+        res = wrapper.search_sorted_s(TREE_DN, ldap.SCOPE_ONELEVEL,
+                                      '(objectClass=*)', 'cn', 3,
+                                      marker='t04')
+        self.assertEqual([dn for dn, _attrs in res],
+                         [e[0] for e in entries[3:6]])
+        self.assertEqual(wrapper.conn.pages, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest2 as unittest
+
+try:
+    import ldap
+    from keystone.backends.ldap import fakeldap
+    from keystone.backends.ldap.api import pool
+except ImportError:
+    ldap = None
+
+
+class FlakyLDAP(object):
+    """Wraps a FakeLDAP connection that can be made to fail"""
+    def __init__(self):
+        self.conn = fakeldap.initialize('fake://memory')
+        self.conn.simple_bind_s('cn=Admin', 'password')
+        self.down = False
+        self.unbound = False
+
+    def _check(self):
+        if self.down:
+            raise ldap.SERVER_DOWN
+
+    def whoami_s(self):
+        self._check()
+        return self.conn.whoami_s()
+
+    def search_s(self, *args):
+        self._check()
+        return self.conn.search_s(*args)
+
+    def unbind_s(self):
+        self.unbound = True
+
+
+@unittest.skipIf(ldap is None, "python-ldap is not installed")
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.connections = []
+        self.pool = pool.ConnectionPool(self._connect, size=2)
+
+    def _connect(self):
+        conn = FlakyLDAP()
+        self.connections.append(conn)
+        return conn
+
+    def _search(self):
+        return self.pool.call('search_s', 'ou=nowhere', ldap.SCOPE_ONELEVEL,
+                              '(objectClass=*)')
+
+    def test_connection_is_reused(self):
+        for _i in range(3):
+            self.assertEqual(self._search(), [])
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(len(self.pool), 1)
+
+    def test_reconnects_on_server_down(self):
+        self._search()
+        self.connections[0].down = True
+        self.assertEqual(self._search(), [])
+        self.assertEqual(len(self.connections), 2)
+        self.assertTrue(self.connections[0].unbound)
+        self.assertEqual(len(self.pool), 1)
+
+    def test_gives_up_after_one_reconnect(self):
+        self._search()
+        self.connections[0].down = True
+        self.pool.connect = self._connect_down
+        self.assertRaises(ldap.SERVER_DOWN, self._search)
+        self.assertEqual(len(self.pool), 0)
+
+    def _connect_down(self):
+        conn = self._connect()
+        conn.down = True
+        return conn
+
+    def test_other_errors_keep_the_connection(self):
+        self.assertRaises(ldap.NO_SUCH_OBJECT, self.pool.call, 'search_s',
+                          'cn=missing', ldap.SCOPE_BASE, '(objectClass=*)')
+        self.assertEqual(len(self.pool), 1)
+        self.assertFalse(self.connections[0].unbound)
+
+    def test_idle_connection_is_checked(self):
+        self.pool.check_interval = 0
+        self._search()
+        self.connections[0].down = True
+        time.sleep(0.01)
+        self._search()
+        self.assertEqual(len(self.connections), 2)
+        self.assertTrue(self.connections[0].unbound)
+
+    def test_connection_lifetime(self):
+        self.pool.lifetime = 0
+        self._search()
+        time.sleep(0.01)
+        self._search()
+        self.assertEqual(len(self.connections), 2)
+
+    def test_pooled_connection(self):
+        conn = pool.PooledConnection(self.pool)
+        self.assertEqual(conn.whoami_s(), 'dn:cn=Admin')
+        self.assertEqual(len(self.connections), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,10 +15,12 @@
 
 import json
 import datetime
+import time
 from lxml import etree
 import unittest2 as unittest
 
 import base
+from keystone.logic import catalog_cache
 from keystone.logic.types import auth as logic_auth
 from keystone import models
 from keystone.test import utils as test_utils
@@ -127,6 +129,41 @@ class LogicTypesAuthTestCase(base.ServiceAPITest):
         self.assertIn("versionId", endpoint.attrib)
         self.assertIn("tenantId", endpoint.attrib)
 
+    def test_AuthData_catalog_is_cached(self):
+        cache = catalog_cache.CatalogCache()
+        loads = []
+
+        def base_urls():
+            loads.append(None)
+            return self.base_urls
+        for _i in range(2):
+            for fmt in ('json', 'xml'):
+                auth = logic_auth.AuthData(self.token, self.user, base_urls,
+                                           catalog_cache=cache)
+                uncached = logic_auth.AuthData(self.token, self.user,
+                                               self.base_urls)
+                if fmt == 'json':
+                    self.assertDictEqual(json.loads(auth.to_json()),
+                                         json.loads(uncached.to_json()))
+                else:
+                    self.assertTrue(test_utils.XMLTools.xmlEqual(
+                        auth.to_xml(), uncached.to_xml()))
+        self.assertEqual(len(loads), 2)
+        self.assertEqual(len(cache), 2)
+
+        cache.clear()
+        logic_auth.AuthData(self.token, self.user, base_urls,
+                            catalog_cache=cache).to_json()
+        self.assertEqual(len(loads), 3)
+
+    def test_catalog_cache_expires(self):
+        cache = catalog_cache.CatalogCache(ttl=0.01)
+        key = cache.key('ten8', ['public'], 'json')
+        cache.put(key, '[]')
+        self.assertEqual(cache.get(key), '[]')
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(key))
+
 
 if __name__ == '__main__':
     unittest.main()
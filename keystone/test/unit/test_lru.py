@@ -0,0 +1,86 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest2 as unittest
+
+from keystone.common import lru
+
+
+class TestLRUDict(unittest.TestCase):
+    def test_oldest_first(self):
+        entries = lru.LRUDict()
+        for key in 'abc':
+            entries[key] = key.upper()
+        # setting a key again makes it the newest
+        entries['a'] = 'A'
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries.pop_oldest(), ('b', 'B'))
+        self.assertEqual(entries.pop_oldest(), ('c', 'C'))
+        self.assertEqual(entries.pop_oldest(), ('a', 'A'))
+        self.assertRaises(KeyError, entries.pop_oldest)
+
+    def test_pop(self):
+        entries = lru.LRUDict()
+        entries['a'] = 1
+        entries['b'] = 2
+        self.assertEqual(entries.pop('a'), 1)
+        self.assertIsNone(entries.pop('a', None))
+        self.assertRaises(KeyError, entries.pop, 'a')
+        self.assertNotIn('a', entries)
+        self.assertEqual(entries.pop_oldest(), ('b', 2))
+
+    def test_clear(self):
+        entries = lru.LRUDict()
+        entries['a'] = 1
+        entries.clear()
+        self.assertEqual(len(entries), 0)
+        entries['b'] = 2
+        self.assertEqual(entries.pop_oldest(), ('b', 2))
+
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_bounded_lru(self):
+        cache = lru.TTLCache(60, 2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+    def test_entries_expire(self):
+        cache = lru.TTLCache(0.01, 10)
+        cache.put('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+
+    def test_disabled(self):
+        for ttl, max_size in ((0, 10), (60, 0)):
+            cache = lru.TTLCache(ttl, max_size)
+            cache.put('a', 1)
+            self.assertIsNone(cache.get('a'))
+
+    def test_configure_empties(self):
+        cache = lru.TTLCache(60, 10)
+        cache.put('a', 1)
+        cache.configure(ttl='30', max_size='5')
+        self.assertEqual((cache.ttl, cache.max_size, len(cache)), (30, 5, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest2 as unittest
+
+try:
+    from keystone.common import memcache_pool
+except ImportError:
+    memcache_pool = None
+
+HOSTS = ['10.0.0.1:11211', '10.0.0.2:11211', '10.0.0.3:11211']
+
+
+def _owner(client, key):
+    """Returns the address of the server holding key, without connecting
+
+    A host counts as up unless it is marked dead.
+    """
+    for server in client.servers:
+        server.connect = (lambda s=server:
+                          not s.deaduntil or s.deaduntil < time.time())
+    server, _key = client._get_server(key)  # pylint: disable=W0212
+    return server.address if server else None
+
+
+@unittest.skipIf(memcache_pool is None, "python-memcached is not installed")
+class TestConsistentHashClient(unittest.TestCase):
+    def test_keys_spread_over_servers(self):
+        client = memcache_pool.ConsistentHashClient(HOSTS)
+        owners = set(_owner(client, 'tokens/%s' % i)
+                     for i in range(100))
+        self.assertEqual(len(owners), 3)
+
+    def test_removing_a_server_only_moves_its_keys(self):
+        keys = ['tokens/%s' % i for i in range(200)]
+        client = memcache_pool.ConsistentHashClient(HOSTS)
+        before = dict((key, _owner(client, key)) for key in keys)
+        client = memcache_pool.ConsistentHashClient(HOSTS[:2])
+        for key in keys:
+            if before[key] != ('10.0.0.3', 11211):
+                self.assertEqual(_owner(client, key), before[key])
+
+    def test_dead_server_is_skipped_until_retry(self):
+        client = memcache_pool.ConsistentHashClient(HOSTS)
+        owner = _owner(client, 'tokens/abc')
+        for server in client.servers:
+            if server.address == owner:
+                server.deaduntil = time.time() + 30
+        self.assertNotEqual(_owner(client, 'tokens/abc'), owner)
+
+        for server in client.servers:
+            server.deaduntil = time.time() - 1
+        self.assertEqual(_owner(client, 'tokens/abc'), owner)
+
+    def test_all_servers_dead(self):
+        client = memcache_pool.ConsistentHashClient(HOSTS)
+        for server in client.servers:
+            server.deaduntil = time.time() + 30
+        self.assertIsNone(_owner(client, 'tokens/abc'))
+
+
+@unittest.skipIf(memcache_pool is None, "python-memcached is not installed")
+class TestMemcacheClientPool(unittest.TestCase):
+    def test_parse_hosts(self):
+        pool = memcache_pool.MemcacheClientPool(
+            ' 10.0.0.1:11211, 10.0.0.2:11211,,')
+        self.assertEqual(pool.hosts, ['10.0.0.1:11211', '10.0.0.2:11211'])
+
+    def test_requires_hosts(self):
+        self.assertRaises(ValueError, memcache_pool.MemcacheClientPool, '')
+
+    def test_clients_are_reused(self):
+        created = []
+
+        class CountingPool(memcache_pool.MemcacheClientPool):
+            def _create_client(self):
+                client = super(CountingPool, self)._create_client()
+                client.get = lambda key: None
+                created.append(client)
+                return client
+
+        pool = CountingPool(HOSTS, pool_size=4)
+        for _i in range(10):
+            self.assertIsNone(pool.get('tokens/abc'))
+        self.assertEqual(len(created), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
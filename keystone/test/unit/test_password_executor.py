@@ -0,0 +1,79 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest2 as unittest
+
+import eventlet
+
+from keystone.backends import backendutils
+from keystone.logic.types import fault
+
+
+def _slow_hash(seconds):
+    time.sleep(seconds)
+    return 'hashed'
+
+
+class TestPasswordExecutor(unittest.TestCase):
+    def tearDown(self):
+        backendutils.configure_executor('inline')
+
+    def test_hashes_on_each_executor(self):
+        for kind in sorted(backendutils.EXECUTORS):
+            executor = backendutils.configure_executor(kind, workers=2)
+            hashed = executor.run(backendutils._encrypt, 'secret')
+            self.assertTrue(executor.run(backendutils._verify, 'secret',
+                                         hashed), kind)
+            self.assertFalse(executor.run(backendutils._verify, 'wrong',
+                                          hashed), kind)
+
+    def test_unknown_executor(self):
+        self.assertRaises(ValueError, backendutils.configure_executor,
+                          'gpu')
+
+    def test_hub_keeps_running(self):
+        executor = backendutils.configure_executor('threads', workers=1)
+        ticks = []
+
+        def tick():
+            for _i in range(5):
+                ticks.append(time.time())
+                eventlet.sleep(0.01)
+        ticker = eventlet.spawn(tick)
+        eventlet.sleep(0)
+        started = time.time()
+        self.assertEqual(executor.run(_slow_hash, 0.1), 'hashed')
+        finished = time.time()
+        ticker.wait()
+        # a blocked hub would only have ticked again once run() returned
+        self.assertGreaterEqual(
+            len([t for t in ticks if started < t < finished]), 2)
+
+    def test_full_queue_is_refused(self):
+        executor = backendutils.configure_executor('threads', workers=1,
+                                                   queue_size=1)
+        threads = [eventlet.spawn(executor.run, _slow_hash, 0.05)
+                   for _i in range(2)]
+        eventlet.sleep(0)
+        self.assertRaises(fault.ServiceUnavailableFault, executor.run,
+                          _slow_hash, 0)
+        for thread in threads:
+            self.assertEqual(thread.wait(), 'hashed')
+        self.assertEqual(executor.pending, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
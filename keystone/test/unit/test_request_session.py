@@ -0,0 +1,83 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2 as unittest
+
+from sqlalchemy import event
+
+from keystone import backends
+from keystone import config
+import keystone.backends.api as api
+import keystone.backends.sqlalchemy as db
+from keystone.frontends import request_session
+from keystone import models
+from keystone.test import KeystoneTest
+
+CONF = config.CONF
+
+
+class TestRequestSession(unittest.TestCase):
+    def setUp(self):
+        kt = KeystoneTest()
+        kt.config_name = "sql.conf.template"
+        kt.construct_temp_conf_file()
+        CONF.reset()
+        CONF(config_files=[kt.conf_fp.name])
+        db.unregister_models()
+        reload(db)
+        backends.configure_backends()
+
+        self.checkouts = []
+        # pylint: disable=W0212
+        event.listen(db._DRIVER._engine.pool, 'checkout',
+                     lambda *args: self.checkouts.append(None))
+
+    def tearDown(self):
+        db.unregister_models()
+        reload(db)
+
+    def _calls(self):
+        tenant = api.TENANT.create(models.Tenant(name="scoped",
+                                                 enabled=True))
+        user = api.USER.create(models.User(name="scoped-user",
+                                           tenant_id=tenant.id,
+                                           enabled=True))
+        self.assertEqual(api.USER.get(user.id).tenant_id, tenant.id)
+        api.USER.delete(user.id)
+        api.TENANT.delete(tenant.id)
+
+    def test_one_checkout_per_request(self):
+        self._calls()
+        self.assertTrue(len(self.checkouts) > 1)
+
+        del self.checkouts[:]
+        with backends.request_scope():
+            self._calls()
+        self.assertEqual(len(self.checkouts), 1)
+
+    def test_filter(self):
+        def app(env, start_response):
+            self._calls()
+            start_response('200 OK', [])
+            return ['done']
+        body = request_session.filter_factory({})(app)({}, lambda *a: None)
+        self.assertEqual(body, ['done'])
+        self.assertEqual(len(self.checkouts), 1)
+        self.assertIsNone(getattr(db._REQUEST,  # pylint: disable=W0212
+                                  'connections', None))
+
+
+if __name__ == '__main__':
+    unittest.main()
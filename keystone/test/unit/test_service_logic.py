@@ -1,9 +1,12 @@
 import datetime as dt
+import json
+from lxml import etree
 import unittest2 as unittest
 
 import keystone.logic.service as service
 from keystone.test.unit.base import ServiceAPITest, AdminAPITest
-from keystone.logic.types.fault import ItemNotFoundFault, UnauthorizedFault
+from keystone.logic.types.fault import BadRequestFault, ItemNotFoundFault, \
+        UnauthorizedFault
 from keystone.logic.types.auth import ValidateData
 
 
@@ -49,6 +52,40 @@ class TestServiceLogic(AdminAPITest):
         data = self.api.validate_token(self.admin_token_id, self.auth_token_id)
         self.assertTrue(isinstance(data, ValidateData))
 
+    def test_check_token(self):
+        def get_validate_data(*args, **kwargs):
+            self.fail("HEAD should not build the validation response")
+        self.api.get_validate_data = get_validate_data
+        self.assertIsNone(self.api.check_token(self.admin_token_id,
+                                               self.auth_token_id))
+        self.assertRaises(ItemNotFoundFault, self.api.check_token,
+                self.admin_token_id, "nonexistent")
+        self.assertRaises(UnauthorizedFault, self.api.check_token,
+                self.admin_token_id, self.auth_token_id, "another_tenant")
+
+    def test_validate_tokens(self):
+        batch = self.api.validate_tokens(self.admin_token_id,
+                [(self.auth_token_id, None), ("nonexistent", None),
+                 (self.auth_token_id, "another_tenant")])
+        results = [result for _token_id, result in batch.results]
+        self.assertEqual(results[0].to_json(), self.api.validate_token(
+                self.admin_token_id, self.auth_token_id).to_json())
+        self.assertTrue(isinstance(results[1], ItemNotFoundFault))
+        self.assertTrue(isinstance(results[2], UnauthorizedFault))
+
+        tokens = json.loads(batch.to_json())["tokens"]
+        self.assertEqual([token["id"] for token in tokens],
+                [self.auth_token_id, "nonexistent", self.auth_token_id])
+        self.assertIn("access", tokens[0])
+        self.assertEqual(tokens[1]["itemNotFound"]["code"], "404")
+        self.assertEqual(len(etree.fromstring(batch.to_xml())), 3)
+
+    def test_validate_tokens_limit(self):
+        self.assertRaises(BadRequestFault, self.api.validate_tokens,
+                self.admin_token_id, [("any_id", None)] * 101)
+        self.assertRaises(UnauthorizedFault, self.api.validate_tokens,
+                self.auth_token_id, [(self.auth_token_id, None)])
+
     def test_remove_role_from_user(self):
         auth_userid = self.auth_user["id"]
         regular_role_id = self.role_fixtures[0]["id"]
@@ -0,0 +1,63 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest2 as unittest
+
+from keystone import backends
+from keystone import config
+import keystone.backends.sqlalchemy as db
+from keystone.controllers import tenant
+from keystone.controllers import token
+from keystone.logic import service
+from keystone.test import KeystoneTest
+
+CONF = config.CONF
+
+
+class TestSharedIdentityService(unittest.TestCase):
+    def setUp(self):
+        kt = KeystoneTest()
+        kt.config_name = "sql.conf.template"
+        kt.construct_temp_conf_file()
+        CONF.reset()
+        CONF(config_files=[kt.conf_fp.name])
+        db.unregister_models()
+        reload(db)
+
+    def tearDown(self):
+        db.unregister_models()
+        reload(db)
+
+    def test_backends_are_configured_once(self):
+        backends.configure_backends_once()
+        generation = backends.GENERATION
+        backends.configure_backends_once()
+        service.IdentityService()
+        self.assertEqual(backends.GENERATION, generation)
+
+    def test_controllers_share_the_service(self):
+        identity = service.get_identity_service()
+        self.assertIs(token.TokenController().identity_service, identity)
+        self.assertIs(tenant.TenantController(True).identity_service,
+                      identity)
+
+    def test_reconfiguring_replaces_the_service(self):
+        identity = service.get_identity_service()
+        backends.configure_backends()
+        self.assertIsNot(service.get_identity_service(), identity)
+
+
+if __name__ == '__main__':
+    unittest.main()
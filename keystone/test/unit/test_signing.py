@@ -0,0 +1,133 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest2 as unittest
+
+from keystone import config
+import keystone.backends.sqlalchemy as db
+from keystone.common import signing
+from keystone.logic import service
+from keystone.logic.types import auth
+from keystone.logic.types import fault
+from keystone import models
+from keystone.test import KeystoneTest
+
+CONF = config.CONF
+
+CLAIMS = {'id': 'abc', 'user': {'id': '1', 'name': 'joe'},
+          'tenant': {'id': None, 'name': None}, 'roles': ['Member'],
+          'expires': '2030-01-01T00:00:00'}
+
+
+class TestSigning(unittest.TestCase):
+    def setUp(self):
+        self.keys = signing.KeyRing([('k1', 'secret one')])
+
+    def test_sign_and_verify(self):
+        token = signing.sign(self.keys, CLAIMS)
+        self.assertTrue(signing.is_signed(token))
+        self.assertFalse(signing.is_signed('abc'))
+        self.assertEqual(signing.verify(self.keys, token), CLAIMS)
+
+    def test_tampering_is_detected(self):
+        token = signing.sign(self.keys, CLAIMS)
+        prefix, key_id, payload, mac = token.split('.')
+        forged = signing._b64encode('{"id":"other"}')
+        for bad in ['.'.join([prefix, key_id, forged, mac]),
+                    token[:-2],
+                    token + '.x',
+                    'S1.k1.garbage']:
+            self.assertRaises(signing.InvalidToken, signing.verify,
+                              self.keys, bad)
+        other = signing.KeyRing([('k1', 'another secret')])
+        self.assertRaises(signing.InvalidToken, signing.verify, other, token)
+
+    def test_rotation(self):
+        old = signing.sign(self.keys, CLAIMS)
+        rotated = signing.KeyRing([('k2', 'secret two'),
+                                   ('k1', 'secret one')])
+        new = signing.sign(rotated, CLAIMS)
+        self.assertEqual(new.split('.')[1], 'k2')
+        self.assertEqual(signing.verify(rotated, old), CLAIMS)
+        self.assertRaises(signing.InvalidToken, signing.verify,
+                          self.keys, new)
+
+    def test_key_file_is_reloaded(self):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'w') as f:
+            f.write("# signing keys\nk1 secret one\n")
+        keys = signing.KeyFile(path, reload_interval=0)
+        token = signing.sign(keys, CLAIMS)
+        with open(path, 'w') as f:
+            f.write("k2 secret two\nk1 secret one\n")
+        os.utime(path, (0, 0))
+        self.assertEqual(keys.signing_key(), ('k2', 'secret two'))
+        self.assertEqual(signing.verify(keys, token), CLAIMS)
+
+
+class TestSignedTokens(unittest.TestCase):
+    def setUp(self):
+        kt = KeystoneTest()
+        kt.config_name = "sql.conf.template"
+        kt.construct_temp_conf_file()
+        CONF.reset()
+        CONF(config_files=[kt.conf_fp.name])
+        db.unregister_models()
+        reload(db)
+        self.identity = service.get_identity_service()
+        self.identity.token_manager.signing_keys = signing.KeyRing(
+            [('k1', 'secret')])
+        tenant = self.identity.tenant_manager.create(models.Tenant(
+            name='signed-tenant', enabled=True))
+        role = self.identity.role_manager.create(models.Role(
+            name='signed-role'))
+        user = self.identity.user_manager.create(models.User(
+            name='signed-user', password='secret', tenant_id=tenant.id,
+            enabled=True))
+        self.identity.user_manager.user_role_add(models.UserRoleAssociation(
+            user_id=user.id, role_id=role.id, tenant_id=tenant.id))
+
+    def tearDown(self):
+        self.identity.token_manager.signing_keys = None
+        db.unregister_models()
+        reload(db)
+
+    def test_signed_token_carries_claims(self):
+        auth_data = self.identity.authenticate(
+            auth.AuthWithPasswordCredentials('signed-user', 'secret'))
+        token_id = auth_data.token.id
+        claims = signing.verify(self.identity.token_manager.signing_keys,
+                                token_id)
+        self.assertEqual(claims['user']['name'], 'signed-user')
+        self.assertEqual(claims['tenant']['name'], 'signed-tenant')
+        self.assertEqual(claims['roles'], ['signed-role'])
+
+        # the stored token keeps its short id, and is found by either
+        dtoken = self.identity.token_manager.get(token_id)
+        self.assertEqual(dtoken.id, claims['id'])
+        token, user = self.identity._validate_token(token_id)
+        self.assertEqual(user.name, 'signed-user')
+
+        self.identity.token_manager.delete(token_id)
+        self.assertIsNone(self.identity.token_manager.get(claims['id']))
+        self.assertRaises(fault.UnauthorizedFault,
+                          self.identity._validate_token, token_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
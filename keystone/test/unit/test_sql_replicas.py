@@ -0,0 +1,116 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest2 as unittest
+
+from sqlalchemy import create_engine
+
+from keystone import backends
+from keystone import config
+import keystone.backends.api as api
+import keystone.backends.sqlalchemy as db
+from keystone.backends.sqlalchemy import models as sql_models
+from keystone.backends.sqlalchemy import replicas
+from keystone import models
+from keystone.test import KeystoneTest
+
+CONF = config.CONF
+GROUP = 'keystone.backends.sqlalchemy'
+
+
+class TestReadMethods(unittest.TestCase):
+    def test_classification(self):
+        for name in ('get', 'get_by_name', 'get_all_endpoints',
+                     'list_global_roles_for_user', 'users_get_page',
+                     'rolegrant_get_by_ids', 'endpoint_get_by_tenant',
+                     'user_roles_by_tenant', 'uid_to_id', 'check_password'):
+            self.assertTrue(replicas.is_read_method(name), name)
+        for name in ('create', 'update', 'delete', 'delete_expired',
+                     'endpoint_add', 'endpoint_delete', 'rolegrant_delete',
+                     'user_role_add'):
+            self.assertFalse(replicas.is_read_method(name), name)
+
+
+class TestReplicaRouting(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        replica = 'sqlite:///%s' % os.path.join(self.tmpdir, 'replica.db')
+        sql_models.Base.metadata.create_all(create_engine(replica))
+        down = 'sqlite:///%s' % os.path.join(self.tmpdir, 'gone', 'x.db')
+
+        kt = KeystoneTest()
+        kt.config_name = "sql.conf.template"
+        kt.construct_temp_conf_file()
+        CONF.reset()
+        CONF(config_files=[kt.conf_fp.name])
+        CONF.set_override('sql_read_connections', '%s,%s' % (down, replica),
+                          group=GROUP)
+        db.unregister_models()
+        reload(db)
+        backends.configure_backends()
+        # pylint: disable=W0212
+        self.replica_engine = db._DRIVER.replicas.replicas[1].engine
+
+    def tearDown(self):
+        CONF.set_override('sql_read_connections', None, group=GROUP)
+        db.unregister_models()
+        reload(db)
+        shutil.rmtree(self.tmpdir)
+
+    def test_reads_use_the_replica(self):
+        self.replica_engine.execute(sql_models.Tenant.__table__.insert(),
+                                    uid='r1', name='replica-only',
+                                    enabled=True)
+        self.assertEqual(api.TENANT.get_by_name('replica-only').id, 'r1')
+
+    def test_writes_use_the_primary(self):
+        tenant = api.TENANT.create(models.Tenant(name='written',
+                                                 enabled=True))
+        rows = self.replica_engine.execute(
+            sql_models.Tenant.__table__.select()).fetchall()
+        self.assertEqual(rows, [])
+        # not replicated yet, so read back from the primary
+        self.assertEqual(api.TENANT.get(tenant.id).name, 'written')
+
+    def test_get_many_finds_the_rest_on_the_primary(self):
+        expires = datetime.datetime.now() + datetime.timedelta(days=1)
+        self.replica_engine.execute(sql_models.Token.__table__.insert(),
+                                    id='replicated', expires=expires)
+        api.TOKEN.create(models.Token(id='just-issued', expires=expires))
+        found = api.TOKEN.get_many(['replicated', 'just-issued', 'bad'])
+        self.assertEqual(sorted(token.id for token in found),
+                         ['just-issued', 'replicated'])
+
+    def test_unreachable_replica_is_skipped(self):
+        api.TENANT.get_by_name('anything')
+        down, up = db._DRIVER.replicas.replicas  # pylint: disable=W0212
+        self.assertFalse(down.up)
+        self.assertTrue(up.up)
+
+    def test_failed_replica_query_is_retried_on_the_primary(self):
+        api.TENANT.create(models.Tenant(name='written', enabled=True))
+        # a replica failing its queries, as with a stale connection
+        sql_models.Base.metadata.drop_all(self.replica_engine)
+        self.assertEqual(api.TENANT.get_by_name('written').name, 'written')
+        for replica in db._DRIVER.replicas.replicas:  # pylint: disable=W0212
+            self.assertFalse(replica.up)
+
+
+if __name__ == '__main__':
+    unittest.main()
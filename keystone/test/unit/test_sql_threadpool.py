@@ -0,0 +1,103 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import unittest2 as unittest
+
+import eventlet
+
+from keystone import backends
+from keystone import config
+import keystone.backends.api as api
+import keystone.backends.sqlalchemy as db
+from keystone.backends.sqlalchemy import threadpool
+from keystone import models
+from keystone.test import KeystoneTest
+
+CONF = config.CONF
+
+
+class SlowAPI(object):
+    """ Blocks the calling thread, as a C database driver would """
+    name = 'slow'
+
+    def query(self, seconds):
+        time.sleep(seconds)
+        return threading.current_thread()
+
+    def nested(self):
+        return threadpool.ThreadPoolAPI(self).query(0)
+
+
+class TestThreadPoolAPI(unittest.TestCase):
+    def setUp(self):
+        self.api = threadpool.ThreadPoolAPI(SlowAPI())
+
+    def test_runs_in_a_native_thread(self):
+        self.assertNotEqual(self.api.query(0), threading.current_thread())
+        self.assertEqual(self.api.name, 'slow')
+
+    def test_hub_keeps_running(self):
+        ticks = []
+
+        def tick():
+            for _i in range(5):
+                ticks.append(time.time())
+                eventlet.sleep(0.01)
+        ticker = eventlet.spawn(tick)
+        eventlet.sleep(0)
+        self.api.query(0.1)
+        ticker.wait()
+        self.assertEqual(len(ticks), 5)
+
+    def test_nested_calls_stay_in_the_thread(self):
+        self.assertIsNotNone(self.api.nested())
+
+
+class TestThreadPoolBackend(unittest.TestCase):
+    def setUp(self):
+        kt = KeystoneTest()
+        kt.config_name = "sql.conf.template"
+        kt.construct_temp_conf_file()
+        CONF.reset()
+        CONF(config_files=[kt.conf_fp.name])
+        CONF.set_override('sql_execution_mode', 'threadpool',
+                          group='keystone.backends.sqlalchemy')
+        db.unregister_models()
+        reload(db)
+        backends.configure_backends()
+
+    def tearDown(self):
+        CONF.set_override('sql_execution_mode', None,
+                          group='keystone.backends.sqlalchemy')
+        db.unregister_models()
+        reload(db)
+
+    def test_backend_apis_are_wrapped(self):
+        self.assertIsInstance(api.TENANT, threadpool.ThreadPoolAPI)
+        tenant = api.TENANT.create(models.Tenant(name="threaded",
+                                                 enabled=True))
+        self.assertEqual(api.TENANT.get(tenant.id).name, "threaded")
+
+    def test_unknown_mode(self):
+        CONF.set_override('sql_execution_mode', 'fibers',
+                          group='keystone.backends.sqlalchemy')
+        self.assertRaises(ValueError, db.Driver,
+                          backends.GroupConf('keystone.backends.sqlalchemy'))
+
+
+if __name__ == '__main__':
+    unittest.main()
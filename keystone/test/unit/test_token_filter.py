@@ -0,0 +1,190 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+import time
+import unittest2 as unittest
+import uuid
+
+import eventlet
+
+from keystone.logic import token_filter
+from keystone.managers import token
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bloom = token_filter.BloomFilter(1000, 0.01)
+        ids = [uuid.uuid4().hex for _i in range(1000)]
+        for token_id in ids:
+            bloom.add(token_id)
+        for token_id in ids:
+            self.assertIn(token_id, bloom)
+        bloom.add(u'unicode-\xe9')
+        self.assertIn(u'unicode-\xe9', bloom)
+
+    def test_false_positive_rate_and_memory(self):
+        bloom = token_filter.BloomFilter(1000, 0.01)
+        for _i in range(1000):
+            bloom.add(uuid.uuid4().hex)
+        false_positives = sum(uuid.uuid4().hex in bloom
+                              for _i in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertLess(bloom.false_positive_rate(), 0.03)
+        # about 9.6 bits per id at 1%
+        self.assertLess(bloom.memory, 1300)
+
+
+class FakeTokenDriver(object):
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, token_id):
+        self.calls += 1
+
+
+class TestTokenFilter(unittest.TestCase):
+    def setUp(self):
+        self.tokens = {}
+        self.loads = []
+        self.filter = token_filter.TokenFilter(capacity=100,
+                                               sync_interval=60,
+                                               loader=self.loader)
+        self.addCleanup(self.filter.clear)
+
+    def loader(self, created_after):
+        self.loads.append(created_after)
+        return [(token_id, created) for token_id, created in
+                self.tokens.items() if created_after is None or
+                created >= created_after]
+
+    def _create(self, created=None):
+        token_id = uuid.uuid4().hex
+        self.tokens[token_id] = created or datetime.now()
+        return token_id
+
+    @staticmethod
+    def _issued_ago(seconds):
+        return '%x-%s' % (int((time.time() - seconds) * 1000),
+                          uuid.uuid4().hex)
+
+    def test_disabled(self):
+        disabled = token_filter.TokenFilter(capacity=0, loader=self.loader)
+        self.assertTrue(disabled.might_exist('anything'))
+        self.assertEqual(self.loads, [])
+
+    def test_issued_at(self):
+        before = time.time()
+        issued = token_filter.issued_at(token_filter.new_token_id())
+        self.assertTrue(before - 0.001 <= issued <= time.time())
+        for token_id in (str(uuid.uuid4()), uuid.uuid4().hex, 'x-y',
+                         'zz-%s' % uuid.uuid4().hex):
+            self.assertIsNone(token_filter.issued_at(token_id))
+
+    def test_unknown_ids_are_rejected(self):
+        live = self._create()
+        # answers yes until it is built
+        self.assertTrue(self.filter.might_exist('garbage'))
+        self.filter.rebuild()
+        self.assertTrue(self.filter.might_exist(live))
+        self.assertFalse(self.filter.might_exist('garbage'))
+        self.assertEqual(self.filter.stats()['rejected'], 1)
+        self.assertEqual(self.filter.stats()['ids'], 1)
+
+    def test_added_ids_are_known(self):
+        self.filter.rebuild()
+        token_id = uuid.uuid4().hex
+        self.filter.add(token_id)
+        self.assertTrue(self.filter.might_exist(token_id))
+
+    def test_repeated_unknown_ids_make_no_calls(self):
+        self.filter.rebuild()
+        self.addCleanup(setattr, token_filter, 'FILTER', token_filter.FILTER)
+        token_filter.FILTER = self.filter
+        manager = token.Manager.__new__(token.Manager)
+        manager.driver = FakeTokenDriver()
+        manager.signing_keys = None
+        for _i in range(100):
+            self.assertIsNone(manager.get(uuid.uuid4().hex))
+            self.assertIsNone(manager.get(self._issued_ago(60)))
+        self.assertEqual(manager.driver.calls, 0)
+        self.assertEqual(self.loads, [None])
+        self.assertEqual(self.filter.stats()['rejected'], 200)
+
+    def test_ids_issued_since_the_last_sync_go_to_the_backend(self):
+        self.filter.rebuild()
+        self.assertTrue(self.filter.might_exist(
+            token_filter.new_token_id()))
+        self.assertFalse(self.filter.might_exist(self._issued_ago(60)))
+
+    def test_sync_adds_tokens_created_elsewhere(self):
+        self._create()
+        self.filter.rebuild()
+        newest = max(self.tokens.values())
+        elsewhere = self._create()
+        self.assertFalse(self.filter.might_exist(elsewhere))
+        self.filter.sync()
+        self.assertTrue(self.filter.might_exist(elsewhere))
+        self.assertEqual(self.loads,
+                         [None, newest - token_filter.SYNC_OVERLAP])
+
+    def test_only_a_successful_sync_rejects_older_ids(self):
+        self.filter.rebuild()
+        # as if built a minute ago
+        self.filter._synced_at -= 60  # pylint: disable=W0212
+        issued = self._issued_ago(30)
+        self.assertTrue(self.filter.might_exist(issued))
+
+        def loader(created_after):
+            raise IOError()
+        self.filter.loader = loader
+        self.filter.sync()
+        self.assertTrue(self.filter.might_exist(issued))
+        self.filter.loader = self.loader
+        self.filter.sync()
+        self.assertFalse(self.filter.might_exist(issued))
+
+    def test_syncs_in_the_background(self):
+        self.filter.sync_interval = 0.01
+        self.assertTrue(self.filter.might_exist('garbage'))
+        elsewhere = self._create()
+        eventlet.sleep(0.05)
+        self.assertEqual(self.loads[0], None)
+        self.assertGreater(len(self.loads), 1)
+        self.assertTrue(self.filter.might_exist(elsewhere))
+        self.assertFalse(self.filter.might_exist('garbage'))
+
+    def test_ids_added_during_rebuild_are_kept(self):
+        added = uuid.uuid4().hex
+
+        def loader(created_after):
+            self.filter.add(added)
+            return []
+        self.filter.loader = loader
+        self.filter.rebuild()
+        self.filter.loader = self.loader
+        self.assertTrue(self.filter.might_exist(added))
+
+    def test_backend_without_listing_disables(self):
+        def loader(created_after):
+            raise NotImplementedError()
+        self.filter.loader = loader
+        self.filter.rebuild()
+        self.assertFalse(self.filter.enabled)
+        self.assertTrue(self.filter.might_exist('garbage'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# Copyright (c) 2011 OpenStack, LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import signal
+import time
+import unittest2 as unittest
+import urllib2
+
+import eventlet
+
+from keystone.common import wsgi
+from keystone import server
+
+
+def pid_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(os.getpid())]
+
+
+class PidServer(object):
+    """Stands in for keystone.server.Server, answering with its pid"""
+    def __init__(self):
+        self.socket = eventlet.listen(('127.0.0.1', 0))
+        self.port = self.socket.getsockname()[1]
+        self.server = None
+
+    def start(self, wait=True):  # pylint: disable=W0613
+        self.server = wsgi.Server()
+        self.server.start(pid_app, self.port, sock=self.socket)
+
+
+class TestWorkers(unittest.TestCase):
+    def setUp(self):
+        self.server = PidServer()
+        self.supervisor = os.fork()
+        if self.supervisor == 0:
+            try:
+                server.run_workers([self.server], 2)
+            finally:
+                os._exit(0)  # pylint: disable=W0212
+
+    def tearDown(self):
+        try:
+            os.kill(self.supervisor, signal.SIGKILL)
+            os.waitpid(self.supervisor, 0)
+        except OSError:
+            pass
+        self.server.socket.close()
+
+    def _pids(self, count, timeout=10):
+        """Collects the pids answering until `count` distinct ones do"""
+        pids = set()
+        deadline = time.time() + timeout
+        while len(pids) < count and time.time() < deadline:
+            try:
+                pids.add(int(urllib2.urlopen('http://127.0.0.1:%s/' %
+                                             self.server.port,
+                                             timeout=1).read()))
+            except (urllib2.URLError, IOError):
+                eventlet.sleep(0.05)
+        return pids
+
+    def test_workers_share_the_socket_and_are_replaced(self):
+        pids = self._pids(2)
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(os.getpid(), pids)
+        self.assertNotIn(self.supervisor, pids)
+
+        dead = pids.pop()
+        os.kill(dead, signal.SIGKILL)
+        replaced = self._pids(2) - pids
+        self.assertTrue(replaced)
+        self.assertNotIn(dead, replaced)
+
+    def test_sigterm_stops_the_workers(self):
+        workers = self._pids(2)
+        os.kill(self.supervisor, signal.SIGTERM)
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            pid, _status = os.waitpid(self.supervisor, os.WNOHANG)
+            if pid:
+                break
+            time.sleep(0.05)
+        else:
+            self.fail("supervisor did not exit")
+        for pid in workers:
+            self.assertRaises(OSError, os.kill, pid, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Benchmarks authentication throughput under concurrent load.
+
+Runs the same number of authentications from many greenthreads at once,
+with the sqlalchemy backend in "inline" and then in "threadpool" execution
+mode, and reports the throughput of each. Each statement can be made to
+block the calling thread for a while, standing in for the round trip to a
+database server through a C driver, which eventlet cannot make cooperative.
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import eventlet
+from sqlalchemy import event
+
+# Allow running from a source checkout
+POSSIBLE_TOPDIR = os.path.normpath(os.path.join(os.path.abspath(__file__),
+                                   os.pardir, os.pardir))
+if os.path.exists(os.path.join(POSSIBLE_TOPDIR, 'keystone', '__init__.py')):
+    sys.path.insert(0, POSSIBLE_TOPDIR)
+
+from keystone import backends
+from keystone import config
+import keystone.backends.sqlalchemy as db
+from keystone.logic import service
+from keystone import models as keystone_models
+
+CONF = config.CONF
+
+# Keep the report readable; keystone logs a warning per auth without roles
+logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.ERROR)
+
+CONF_TEXT = """
+[DEFAULT]
+backends = keystone.backends.sqlalchemy
+keystone_admin_role = Admin
+keystone_service_admin_role = KeystoneServiceAdmin
+hash_password = False
+
+[keystone.backends.sqlalchemy]
+sql_connection = %s
+sql_execution_mode = %s
+sql_thread_pool_size = %s
+backend_entities = ['UserRoleAssociation', 'Endpoints', 'Role', 'Tenant',
+                    'User', 'Credentials', 'EndpointTemplates', 'Token',
+                    'Service']
+"""
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument('--users', type=int, default=100,
+    help='number of users to authenticate (default: %(default)s)')
+parser.add_argument('--requests', type=int, default=500,
+    help='authentications per run (default: %(default)s)')
+parser.add_argument('--concurrency', type=int, default=50,
+    help='greenthreads authenticating at once (default: %(default)s)')
+parser.add_argument('--threads', type=int, default=10,
+    help='sql_thread_pool_size for threadpool mode (default: %(default)s)')
+parser.add_argument('--latency', type=float, default=2.0,
+    help='milliseconds each statement blocks, to simulate a database '
+         'server (default: %(default)s)')
+parser.add_argument('--sql-connection',
+    help='empty database to use for each run (default: a temporary '
+         'sqlite file)')
+
+
+def configure(sql_connection, mode, threads):
+    fd, conf_file = tempfile.mkstemp()
+    os.close(fd)
+    with open(conf_file, 'w') as f:
+        f.write(CONF_TEXT % (sql_connection, mode, threads))
+    CONF.reset()
+    CONF(config_files=[conf_file])
+    os.remove(conf_file)
+    db.unregister_models()
+    reload(db)
+    backends.configure_backends()
+
+
+def seed(identity, num_users):
+    tenant = identity.tenant_manager.create(keystone_models.Tenant(
+        name='bench-tenant', enabled=True))
+    users = []
+    for i in xrange(num_users):
+        users.append(identity.user_manager.create(keystone_models.User(
+            name='bench-user-%d' % i, password='secret', enabled=True,
+            email='bench-user-%d@example.com' % i, tenant_id=tenant.id)))
+    return tenant, users
+
+
+def add_latency(latency):
+    # pylint: disable=W0613
+    def before_execute(conn, cursor, statement, parameters, context,
+                       executemany):
+        # a blocking sleep, as time is not monkey patched
+        time.sleep(latency)
+    event.listen(db._DRIVER._engine,  # pylint: disable=W0212
+                 'before_cursor_execute', before_execute)
+
+
+def run(func, users, num_requests, concurrency):
+    pool = eventlet.GreenPool(concurrency)
+    start = time.time()
+    for _i in xrange(num_requests):
+        pool.spawn_n(func, random.choice(users))
+    pool.waitall()
+    return num_requests / (time.time() - start)
+
+
+def main():
+    args = parser.parse_args()
+    # keystone's CONF parses sys.argv too, so hide our own options from it
+    del sys.argv[1:]
+
+    for mode in ('inline', 'threadpool'):
+        tmpdir = None
+        sql_connection = args.sql_connection
+        if sql_connection is None:
+            tmpdir = tempfile.mkdtemp()
+            sql_connection = 'sqlite:///%s' % os.path.join(tmpdir, 'bench.db')
+        try:
+            configure(sql_connection, mode, args.threads)
+            identity = service.IdentityService()
+            tenant, users = seed(identity, args.users)
+            add_latency(args.latency / 1000.0)
+
+            def authenticate(user):
+                # pylint: disable=W0212
+                identity._authenticate(lambda duser: True, user.id,
+                                       tenant.id)
+
+            throughput = run(authenticate, users, args.requests,
+                             args.concurrency)
+            print '%-12s %8.1f authentications/s' % (mode, throughput)
+        finally:
+            db.unregister_models()
+            if tmpdir:
+                shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
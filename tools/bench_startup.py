@@ -0,0 +1,113 @@
+"""
+Benchmarks the startup of bin/keystone.
+
+Starts fresh processes that load and bind the Service API and Admin API
+the way bin/keystone does, from etc/keystone.conf pointed at a temporary
+sqlite database, and reports the time each took, its peak memory and how
+many times the backends were initialized.
+"""
+
+import argparse
+import json
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Allow running from a source checkout
+POSSIBLE_TOPDIR = os.path.normpath(os.path.join(os.path.abspath(__file__),
+                                   os.pardir, os.pardir))
+if os.path.exists(os.path.join(POSSIBLE_TOPDIR, 'keystone', '__init__.py')):
+    sys.path.insert(0, POSSIBLE_TOPDIR)
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument('--runs', type=int, default=5,
+    help='processes to start (default: %(default)s)')
+parser.add_argument('--config-file',
+    default=os.path.join(POSSIBLE_TOPDIR, 'etc', 'keystone.conf'),
+    help='keystone configuration to start from (default: %(default)s)')
+parser.add_argument('--child', metavar='CONFIG_FILE', help=argparse.SUPPRESS)
+
+
+def write_config(source, tmpdir):
+    """Copies the configuration, keeping the database and log in tmpdir"""
+    with open(source) as f:
+        text = f.read()
+    text = re.sub(r'(?m)^sql_connection\s*=.*$', 'sql_connection = '
+                  'sqlite:///%s' % os.path.join(tmpdir, 'keystone.db'), text)
+    text = re.sub(r'(?m)^log_file\s*=.*$', 'log_file = %s' %
+                  os.path.join(tmpdir, 'keystone.log'), text)
+    conf_file = os.path.join(tmpdir, 'keystone.conf')
+    with open(conf_file, 'w') as f:
+        f.write(text)
+    return conf_file
+
+
+def child(conf_file):
+    """Loads and binds both servers, as bin/keystone does"""
+    start = time.time()
+    from keystone import backends
+    from keystone import config
+    from keystone import server
+
+    initializations = []
+    configure_backends = backends.configure_backends
+
+    def counting_configure_backends():
+        initializations.append(None)
+        return configure_backends()
+    backends.configure_backends = counting_configure_backends
+
+    config.CONF(config_files=[conf_file])
+    servers = [server.Server(name="Service API",
+                             config_name='keystone-legacy-auth'),
+               server.Server(name='Admin API', config_name='admin')]
+    for api in servers:
+        api.listen(host='127.0.0.1', port=0)
+    print json.dumps({
+        'seconds': time.time() - start,
+        'maxrss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'initializations': len(initializations)})
+
+
+def main():
+    args = parser.parse_args()
+    if args.child:
+        # keystone's CONF parses sys.argv too, so hide our own options from it
+        del sys.argv[1:]
+        return child(args.child)
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [POSSIBLE_TOPDIR] + filter(None, [env.get('PYTHONPATH')]))
+    results = []
+    for _i in xrange(args.runs):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            conf_file = write_config(args.config_file, tmpdir)
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__),
+                 '--child', conf_file], env=env, cwd=tmpdir,
+                stdout=subprocess.PIPE)
+            output = process.communicate()[0]
+            if process.returncode:
+                sys.exit('benchmark run failed with exit status %d' %
+                         process.returncode)
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    seconds = sorted(result['seconds'] for result in results)
+    print 'startup time        %8.3f s (median of %d)' % (
+        seconds[len(seconds) // 2], len(seconds))
+    print 'peak memory         %8d KB' % max(result['maxrss']
+                                            for result in results)
+    print 'backend initializations %4d' % results[-1]['initializations']
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmarks the token lookup performed on every authentication.
+
+Seeds a SQL backend with a large tokens table, then times the
+authentication path (minus credential checks) with and without the
+tokens table indexes, and reports the latency of both runs.
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+# Allow running from a source checkout
+POSSIBLE_TOPDIR = os.path.normpath(os.path.join(os.path.abspath(__file__),
+                                   os.pardir, os.pardir))
+if os.path.exists(os.path.join(POSSIBLE_TOPDIR, 'keystone', '__init__.py')):
+    sys.path.insert(0, POSSIBLE_TOPDIR)
+
+from keystone import config
+import keystone.backends.sqlalchemy as db
+from keystone.backends.sqlalchemy import models
+from keystone.logic import service
+from keystone import models as keystone_models
+
+CONF = config.CONF
+
+# Keep the report readable; keystone logs a warning per auth without roles
+logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.ERROR)
+
+CONF_TEXT = """
+[DEFAULT]
+backends = keystone.backends.sqlalchemy
+keystone_admin_role = Admin
+keystone_service_admin_role = KeystoneServiceAdmin
+hash_password = False
+
+[keystone.backends.sqlalchemy]
+sql_connection = %s
+backend_entities = ['UserRoleAssociation', 'Endpoints', 'Role', 'Tenant',
+                    'User', 'Credentials', 'EndpointTemplates', 'Token',
+                    'Service']
+"""
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument('--tokens', type=int, default=200000,
+    help='number of token rows to seed (default: %(default)s)')
+parser.add_argument('--users', type=int, default=500,
+    help='number of users owning those tokens (default: %(default)s)')
+parser.add_argument('--iterations', type=int, default=200,
+    help='authentications to time per run (default: %(default)s)')
+parser.add_argument('--sql-connection', default='sqlite://',
+    help='database to seed; it must be empty (default: in-memory sqlite)')
+
+
+def configure(sql_connection):
+    fd, conf_file = tempfile.mkstemp()
+    os.close(fd)
+    with open(conf_file, 'w') as f:
+        f.write(CONF_TEXT % sql_connection)
+    CONF.reset()
+    CONF(config_files=[conf_file])
+    os.remove(conf_file)
+
+
+def seed(identity, num_users, num_tokens):
+    tenant = identity.tenant_manager.create(keystone_models.Tenant(
+        name='bench-tenant', enabled=True))
+    users = []
+    for i in xrange(num_users):
+        users.append(identity.user_manager.create(keystone_models.User(
+            name='bench-user-%d' % i, password='secret', enabled=True,
+            email='bench-user-%d@example.com' % i, tenant_id=tenant.id)))
+
+    tenant_pk = identity.tenant_manager.driver.uid_to_id(tenant.id)
+    user_pks = [identity.user_manager.driver.uid_to_id(u.id) for u in users]
+
+    now = datetime.datetime.now()
+    engine = db._DRIVER._engine  # pylint: disable=W0212
+    batch = []
+    for i in xrange(num_tokens):
+        # mostly expired history, so each user has many rows to sift through
+        batch.append({'id': uuid.uuid4().hex,
+                      'user_id': user_pks[i % num_users],
+                      'tenant_id': tenant_pk,
+                      'expires': now - datetime.timedelta(minutes=i)})
+        if len(batch) == 10000:
+            engine.execute(models.Token.__table__.insert(), batch)
+            batch = []
+    if batch:
+        engine.execute(models.Token.__table__.insert(), batch)
+
+    # one live token per user, which authentication will find and reuse
+    engine.execute(models.Token.__table__.insert(), [
+        {'id': uuid.uuid4().hex, 'user_id': pk, 'tenant_id': tenant_pk,
+         'expires': now + datetime.timedelta(days=1)} for pk in user_pks])
+    return tenant, users
+
+
+def run(func, users, iterations):
+    timings = []
+    for _i in xrange(iterations):
+        user = random.choice(users)
+        start = time.time()
+        func(user)
+        timings.append(time.time() - start)
+    timings.sort()
+    return {'mean': sum(timings) / len(timings),
+            'p50': timings[len(timings) // 2],
+            'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))]}
+
+
+def report(label, result):
+    print '%-16s mean %8.2f ms   p50 %8.2f ms   p99 %8.2f ms' % (label,
+        result['mean'] * 1000, result['p50'] * 1000, result['p99'] * 1000)
+
+
+def main():
+    args = parser.parse_args()
+    # keystone's CONF parses sys.argv too, so hide our own options from it
+    del sys.argv[1:]
+    configure(args.sql_connection)
+    identity = service.IdentityService()
+    engine = db._DRIVER._engine  # pylint: disable=W0212
+
+    print 'Seeding %d tokens for %d users...' % (args.tokens, args.users)
+    tenant, users = seed(identity, args.users, args.tokens)
+
+    def lookup(user):
+        identity.token_manager.find(user.id, tenant.id)
+
+    def authenticate(user):
+        identity._authenticate(lambda duser: True,  # pylint: disable=W0212
+                               user.id, tenant.id)
+
+    indexes = list(models.Token.__table__.indexes)
+    for index in indexes:
+        index.drop(engine)
+    print 'Without tokens indexes:'
+    report('  token lookup', run(lookup, users, args.iterations))
+    report('  authenticate', run(authenticate, users, args.iterations))
+
+    for index in indexes:
+        index.create(engine)
+    print 'With tokens indexes:'
+    report('  token lookup', run(lookup, users, args.iterations))
+    report('  authenticate', run(authenticate, users, args.iterations))
+
+
+if __name__ == '__main__':
+    main()